@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Hook Benchmark - latency, peak RSS and syscall counts for every Python hook.
+Runs each scenario from payloads.py as the hook would be run (a fresh
+interpreter fed its JSON on stdin) and reports p50/p95/p99 wall time, peak
+RSS of the hook's process tree and, with --strace, its syscall count.
+
+Usage:
+  hook-bench.py [--runs 20] [--only tsc-check] [--strace]
+  hook-bench.py --save-baseline          # store results as the baseline
+  hook-bench.py                          # compare against it; exit 1 on regressions
+Scenarios with a budget in payloads.BUDGETS_MS also fail when their p95
+exceeds it, baseline or not.
+
+bench/baseline.json is committed: a reference run with the machine it ran
+on under "_meta". Timings only compare on similar hardware, so on another
+machine save a local baseline first (--baseline elsewhere, or re-save and
+leave it uncommitted) and compare against that; re-save and commit the
+reference when a change moves the numbers on purpose.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import payloads
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Differences below this many ms are noise, not regressions
+NOISE_MS = 2.0
+
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+# Forks and execs the hook, then reports "elapsed_ns peak_rss_kib exit_code"
+# on the fd in argv[2]. Peak RSS on Linux includes the pre-exec image, so the
+# hook is forked from this small -S interpreter rather than from the harness,
+# whose memory would otherwise set the floor for every measurement.
+LAUNCHER = """
+import os, sys, time
+started = time.perf_counter_ns()
+pid = os.fork()
+if pid == 0:
+    os.execv(sys.executable, [sys.executable, sys.argv[1]])
+_, status, usage = os.wait4(pid, 0)
+elapsed = time.perf_counter_ns() - started
+rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+os.write(int(sys.argv[2]), f"{elapsed} {rss} {os.waitstatus_to_exitcode(status)}".encode())
+"""
+
+
+def run_once(case, env: dict, cwd: str) -> tuple:
+    """Run the hook once. Returns (seconds, peak RSS in KiB or None, exit code)."""
+    stdin = case.stdin() if callable(case.stdin) else case.stdin
+    script = str(payloads.HOOKS_DIR / case.script)
+    if not hasattr(os, "fork"):
+        started = time.perf_counter()
+        proc = subprocess.run([sys.executable, script], input=stdin, capture_output=True, env=env, cwd=cwd)
+        return (time.perf_counter() - started, None, proc.returncode)
+    read_fd, write_fd = os.pipe()
+    try:
+        subprocess.run(
+            [sys.executable, "-S", "-c", LAUNCHER, script, str(write_fd)],
+            input=stdin,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            cwd=cwd,
+            pass_fds=(write_fd,),
+        )
+        os.close(write_fd)
+        write_fd = None
+        with os.fdopen(read_fd, "rb") as report:
+            read_fd = None
+            elapsed, rss, code = report.read().split()
+        return (int(elapsed) / 1e9, int(rss), int(code))
+    finally:
+        for fd in (read_fd, write_fd):
+            if fd is not None:
+                os.close(fd)
+
+
+def count_syscalls(case, env: dict, cwd: str):
+    """Total syscalls of one run under `strace -f -c`, or None without strace."""
+    if not shutil.which("strace"):
+        return None
+    stdin = case.stdin() if callable(case.stdin) else case.stdin
+    with tempfile.NamedTemporaryFile("r", suffix=".strace") as out:
+        subprocess.run(
+            ["strace", "-f", "-c", "-o", out.name, sys.executable, str(payloads.HOOKS_DIR / case.script)],
+            input=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, cwd=cwd,
+        )
+        for line in out.read().splitlines():
+            if line.rstrip().endswith(" total"):
+                return int(line.split()[3])
+    return None
+
+
+def bench(name: str, case, root: Path, runs: int, warmup: int, strace: bool) -> dict:
+    home = root / "home"
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home))
+    env.update(case.env)
+    cwd = case.env.get("CLAUDE_PROJECT_DIR", str(root))
+    times, peaks, codes = [], [], set()
+    for i in range(warmup + runs):
+        if case.reset:
+            case.reset()
+        elapsed, rss, code = run_once(case, env, cwd)
+        if i >= warmup:
+            times.append(elapsed * 1000)
+            codes.add(code)
+            if rss is not None:
+                peaks.append(rss)
+    if case.reset:
+        case.reset()
+    return {
+        "p50": round(percentile(times, 0.50), 2),
+        "p95": round(percentile(times, 0.95), 2),
+        "p99": round(percentile(times, 0.99), 2),
+        "rss_kb": max(peaks) if peaks else None,
+        "syscalls": count_syscalls(case, env, cwd) if strace else None,
+        "exit_codes": sorted(codes),
+    }
+
+
+def regressions(result: dict, base: dict, threshold: float) -> list:
+    """Metrics in `result` worse than `base` by more than `threshold` (a fraction)."""
+    worse = []
+    for metric in ("p50", "p95"):
+        if base.get(metric) and result[metric] - base[metric] > max(NOISE_MS, base[metric] * threshold):
+            worse.append(f"{metric} {base[metric]:.1f}->{result[metric]:.1f}ms")
+    for metric in ("rss_kb", "syscalls"):
+        if base.get(metric) and result.get(metric) and result[metric] > base[metric] * (1 + threshold):
+            worse.append(f"{metric} {base[metric]}->{result[metric]}")
+    return worse
+
+
+def machine(runs: int) -> dict:
+    """What a baseline's numbers depend on, stored under "_meta"."""
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "runs": runs,
+        "saved": time.strftime("%Y-%m-%d"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the Python hooks")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", default="", help="run scenarios whose name contains this")
+    parser.add_argument("--packages", type=int, default=50, help="packages in the synthetic monorepo")
+    parser.add_argument("--strace", action="store_true", help="also count syscalls (needs strace)")
+    parser.add_argument("--root", help="fixture dir, kept between runs (default: a temp dir)")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction")
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    root = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix="hook-bench-"))
+    root.mkdir(parents=True, exist_ok=True)
+    try:
+        baseline = json.loads(Path(args.baseline).read_text())
+    except (OSError, ValueError):
+        baseline = {}
+    meta = baseline.get("_meta")
+    if meta and not args.save_baseline:
+        here = machine(args.runs)
+        print(f"Baseline: {meta.get('platform')}, Python {meta.get('python')}, {meta.get('cpus')} CPUs, "
+              f"saved {meta.get('saved')}")
+        if (meta.get("python"), meta.get("cpus")) != (here["python"], here["cpus"]):
+            print("Note: recorded on a different machine; timings may not compare (see --save-baseline)")
+
+    results, failed = {}, []
+    print(f"{'scenario':42} {'p50':>8} {'p95':>8} {'p99':>8} {'rss MiB':>8} {'syscalls':>9}")
+    try:
+        for name, build in payloads.scenarios(root, args.packages).items():
+            if args.only and args.only not in name:
+                continue
+            result = bench(name, build(), root, args.runs, args.warmup, args.strace)
+            results[name] = result
+            rss = f"{result['rss_kb'] / 1024:.1f}" if result["rss_kb"] else "-"
+            calls = str(result["syscalls"]) if result["syscalls"] is not None else "-"
+            line = f"{name:42} {result['p50']:8.1f} {result['p95']:8.1f} {result['p99']:8.1f} {rss:>8} {calls:>9}"
+            worse = [] if args.save_baseline else regressions(result, baseline.get(name, {}), args.threshold)
+            budget = payloads.BUDGETS_MS.get(name)
+            if budget and result["p95"] > budget:
+                worse.append(f"p95 {result['p95']:.1f}ms over its {budget}ms budget")
+            if worse:
+                failed.append(name)
+                line += "  REGRESSION: " + ", ".join(worse)
+            print(line, flush=True)
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        baseline.update(results)
+        baseline["_meta"] = machine(args.runs)
+        Path(args.baseline).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+    if failed:
+        print(f"\n{len(failed)} scenario(s) regressed beyond {args.threshold:.0%} or over budget: {', '.join(failed)}")
+        return 1
+    elif not any(name != "_meta" for name in baseline):
+        print("\nNo baseline yet; run with --save-baseline to store one")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
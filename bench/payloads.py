@@ -0,0 +1,258 @@
+"""
+Synthetic hook payloads and fixtures for hook-bench.py.
+Each scenario builds what its hook needs under a scratch root (a monorepo of
+N packages, service git repos, transcripts of a given size, a fake `npx` that
+prints tsc errors) and returns a Case: the script to run, its stdin (bytes,
+or a callable for input that changes per run), extra environment, and an
+optional reset run before every iteration.
+"""
+import json
+import os
+import shutil
+import stat
+import subprocess
+from collections import namedtuple
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+
+Case = namedtuple("Case", "script stdin env reset")
+
+# Absolute p95 limits in ms, checked with or without a baseline, for hooks
+# whose cost must not grow with the size of their input
+BUDGETS_MS = {
+    "improve-prompt/large": 250,
+    "improve-prompt/pasted-log": 250,
+}
+
+SERVICES = ["email", "exports", "form", "frontend", "projects", "uploads", "users", "utilities", "events", "database"]
+
+
+def fake_npx(root: Path, errors: int) -> Path:
+    """A bin dir whose `npx` prints `errors` tsc diagnostics and fails if any."""
+    bin_dir = root / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    npx = bin_dir / "npx"
+    npx.write_text(
+        "#!/bin/sh\n"
+        f"i=0; while [ $i -lt {errors} ]; do "
+        'echo "src/index.ts($i,1): error TS2322: Type \'string\' is not assignable to type \'number\'."; '
+        "i=$((i+1)); done\n"
+        f"[ {errors} -eq 0 ]\n"
+    )
+    npx.chmod(npx.stat().st_mode | stat.S_IEXEC)
+    return bin_dir
+
+
+def monorepo(root: Path, packages: int) -> Path:
+    """A pnpm-style workspace of `packages` packages, each depending on the previous one."""
+    project = root / "monorepo"
+    if project.exists():
+        return project
+    (project / "packages").mkdir(parents=True)
+    (project / "package.json").write_text(json.dumps({"name": "root", "private": True, "workspaces": ["packages/*"]}))
+    for i in range(packages):
+        pkg = project / "packages" / f"pkg{i}"
+        (pkg / "src").mkdir(parents=True)
+        deps = {f"@bench/pkg{i - 1}": "workspace:*"} if i else {}
+        (pkg / "package.json").write_text(json.dumps({"name": f"@bench/pkg{i}", "dependencies": deps}))
+        (pkg / "tsconfig.json").write_text('{"compilerOptions": {"strict": true}}')
+        (pkg / "src" / "index.ts").write_text(f"export const value{i}: number = {i};\n")
+    return project
+
+
+def transcript(root: Path, name: str, messages: int, huge_result: int = 0) -> Path:
+    """A transcript JSONL of alternating user/assistant turns. `huge_result`
+    bytes of tool output are put in one tool_result line every 1000 turns."""
+    path = root / f"{name}.jsonl"
+    if path.exists():
+        return path
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(messages):
+            if huge_result and i % 1000 == 1:
+                content = [{"type": "tool_result", "tool_use_id": f"t{i}", "content": "x" * huge_result}]
+                entry = {"type": "user", "message": {"role": "user", "content": content}}
+            elif i % 2:
+                content = [
+                    {"type": "text", "text": f"I updated module {i}."},
+                    {"type": "tool_use", "id": f"t{i}", "name": "Edit", "input": {"file_path": f"/src/m{i}.ts"}},
+                ]
+                entry = {"type": "assistant", "message": {"role": "assistant", "content": content}}
+            else:
+                entry = {"type": "user", "message": {"role": "user", "content": f"please change module {i}"}}
+            f.write(json.dumps(entry) + "\n")
+    return path
+
+
+def services(root: Path, dirty: int) -> Path:
+    """The ten service git repos trigger-build-resolver.py checks, `dirty` of them modified."""
+    project = root / "services"
+    if project.exists():
+        return project
+    for i, name in enumerate(SERVICES):
+        repo = project / name
+        repo.mkdir(parents=True)
+        for j in range(200):
+            (repo / f"file{j}.ts").write_text(f"export const x = {j};\n")
+        git = ["git", "-c", "user.email=bench@example.com", "-c", "user.name=bench"]
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        subprocess.run(["git", "add", "."], cwd=repo, check=True)
+        subprocess.run(git + ["commit", "-qm", "init"], cwd=repo, check=True)
+        if i < dirty:
+            (repo / "file0.ts").write_text("export const x = 'changed';\n")
+    return project
+
+
+def edit_event(file_path, session="bench", tool="Edit") -> bytes:
+    return json.dumps({"session_id": session, "tool_name": tool, "tool_input": {"file_path": str(file_path)}}).encode()
+
+
+def _status_input(tokens: int) -> bytes:
+    usage = {"input_tokens": 2000, "output_tokens": 800, "cache_read_input_tokens": tokens, "cache_creation_input_tokens": 1500}
+    return json.dumps({
+        "session_id": "bench",
+        "model": {"display_name": "Bench"},
+        "workspace": {"current_dir": "/bench/project"},
+        "output_style": {"name": "default"},
+        "context_window": {"context_window_size": 200000, "current_usage": usage},
+    }).encode()
+
+
+def _todos(count: int) -> bytes:
+    statuses = ("completed", "in_progress", "pending")
+    todos = [{"content": f"task {i}", "status": statuses[i % 3], "activeForm": f"doing {i}"} for i in range(count)]
+    return json.dumps({"session_id": "bench", "tool_name": "TodoWrite", "tool_input": {"todos": todos}}).encode()
+
+
+def _stop_session(project: Path, packages: list, tsc_edits: int) -> None:
+    """Write a session journal of `tsc_edits` edits spread over `packages`."""
+    cache = project / ".claude" / "tsc-cache" / "bench"
+    cache.mkdir(parents=True, exist_ok=True)
+    with open(cache / "edits.jsonl", "w", encoding="utf-8") as f:
+        for i in range(tsc_edits):
+            pkg = packages[i % len(packages)]
+            path = project / pkg / "src" / "index.ts"
+            cmd = f"cd {project / pkg} && npx tsc --noEmit"
+            f.write(json.dumps({"ts": 0, "file": str(path), "repo": pkg, "commands": {"build": "", "tsc": cmd}}) + "\n")
+
+
+def scenarios(root: Path, packages: int = 50) -> dict:
+    """name -> zero-argument builder returning a Case."""
+    root = Path(root)
+
+    def clear(path):
+        return lambda: shutil.rmtree(path, ignore_errors=True)
+
+    def improve_prompt(size):
+        def build():
+            prompt = ("fix the flaky api test and debug the login route " * size).strip()
+            return Case("improve-prompt.py", json.dumps({"session_id": "bench", "prompt": prompt}).encode(),
+                        {"CLAUDE_PROJECT_DIR": str(root / "empty")}, None)
+        return build
+
+    def pasted_log(lines):
+        def build():
+            log = "\n".join(f"2026-01-01T12:00:{i % 60:02d} ERROR api route handler failed to create the test "
+                            f"component after {i}ms at Object.<anonymous> (/src/routes/user.ts:{i}:5)" for i in range(lines))
+            # Plus one minified response body, the long-line case
+            body = json.dumps([{"id": i, "route": f"/api/users/{i}", "status": "error"} for i in range(lines)])
+            prompt = "why does this fail? debug it\n" + log + "\n" + body
+            return Case("improve-prompt.py", json.dumps({"session_id": "bench", "prompt": prompt}).encode(),
+                        {"CLAUDE_PROJECT_DIR": str(root / "empty")}, None)
+        return build
+
+    def tracker():
+        project = monorepo(root, packages)
+        return Case("post-tool-use-tracker.py", edit_event(project / "packages" / "pkg0" / "src" / "index.ts"),
+                    {"CLAUDE_PROJECT_DIR": str(project)}, clear(project / ".claude" / "tsc-cache" / "bench"))
+
+    def tsc_check(errors, cold):
+        def build():
+            project = monorepo(root, packages)
+            env = {"CLAUDE_PROJECT_DIR": str(project), "PATH": f"{fake_npx(root / f'npx{errors}', errors)}{os.pathsep}{os.environ.get('PATH', '')}"}
+            reset = clear(project / ".claude" / "tsc-cache") if cold else None
+            return Case("tsc-check.py", edit_event(project / "packages" / f"pkg{packages - 1}" / "src" / "index.ts"), env, reset)
+        return build
+
+    def stop_check(errors, edited):
+        def build():
+            project = monorepo(root, packages)
+            pkgs = [f"packages/pkg{i}" for i in range(edited)]
+            env = {"CLAUDE_PROJECT_DIR": str(project), "PATH": f"{fake_npx(root / f'npx{errors}', errors)}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+            def reset():
+                shutil.rmtree(project / ".claude" / "tsc-cache", ignore_errors=True)
+                _stop_session(project, pkgs, edited * 4)
+            return Case("stop-build-check-enhanced.py", b'{"session_id": "bench"}', env, reset)
+        return build
+
+    def trigger(dirty):
+        def build():
+            project = services(root, dirty)
+            return Case("trigger-build-resolver.py", b'{"session_id": "bench"}',
+                        {"CLAUDE_PROJECT_DIR": str(project), "TEMP": str(root)}, None)
+        return build
+
+    def pipeline(errors, edited, dirty):
+        def build():
+            # The workspace packages plus the service repos, linked in beside them
+            project = monorepo(root, packages)
+            service_root = services(root, dirty)
+            for service in SERVICES:
+                if not (project / service).exists():
+                    (project / service).symlink_to(service_root / service, target_is_directory=True)
+            pkgs = [f"packages/pkg{i}" for i in range(edited)]
+            env = {"CLAUDE_PROJECT_DIR": str(project), "PATH": f"{fake_npx(root / f'npx{errors}', errors)}{os.pathsep}{os.environ.get('PATH', '')}"}
+
+            def reset():
+                shutil.rmtree(project / ".claude" / "tsc-cache", ignore_errors=True)
+                _stop_session(project, pkgs, edited * 4)
+            return Case("stop-pipeline.py", b'{"session_id": "bench"}', env, reset)
+        return build
+
+    def handoff(name, messages, huge=0):
+        def build():
+            path = transcript(root, name, messages, huge)
+            payload = {"session_id": f"bench-{name}", "transcript_path": str(path), "trigger": "auto"}
+            return Case("pre-compact-handoff.py", json.dumps(payload).encode(), {"CLAUDE_PROJECT_DIR": str(root / "empty")}, None)
+        return build
+
+    def status_line(changing):
+        def build():
+            counter = [0]
+            env = {"HOME": str(root / "home"), "USERPROFILE": str(root / "home")}
+            case = Case("status-line.py", _status_input(40000), env, None)
+            if not changing:
+                return case
+
+            # A new input each run, as when usage moves every turn
+            def reset():
+                counter[0] += 1
+            return case._replace(stdin=lambda: _status_input(40000 + counter[0] * 1000), reset=reset)
+        return build
+
+    def taskmaster(count):
+        def build():
+            return Case("taskmaster-sync.py", _todos(count), {"CLAUDE_PROJECT_DIR": str(root / "empty")}, None)
+        return build
+
+    (root / "empty").mkdir(parents=True, exist_ok=True)
+    return {
+        "improve-prompt/small": improve_prompt(1),
+        "improve-prompt/large": improve_prompt(400),
+        "improve-prompt/pasted-log": pasted_log(400),
+        "post-tool-use-tracker/monorepo": tracker,
+        "tsc-check/cached": tsc_check(0, cold=False),
+        "tsc-check/cold-50-errors": tsc_check(50, cold=True),
+        "stop-build-check/clean-5": stop_check(0, 5),
+        "stop-build-check/errors-5x2000": stop_check(2000, 5),
+        "trigger-build-resolver/10-services": trigger(3),
+        "stop-pipeline/errors-5x2000-10-services": pipeline(2000, 5, 3),
+        "pre-compact-handoff/small": handoff("small", 100),
+        "pre-compact-handoff/large": handoff("large", 200000),
+        "pre-compact-handoff/pathological": handoff("pathological", 20000, huge=2 * 1024 * 1024),
+        "status-line/unchanged": status_line(False),
+        "status-line/changing": status_line(True),
+        "taskmaster-sync/small": taskmaster(5),
+        "taskmaster-sync/large": taskmaster(2000),
+    }
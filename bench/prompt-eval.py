@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Prompt Eval - how often improve-prompt.py would skip its evaluation wrapper,
+and how often it skips one it should not have.
+The corpus is JSONL of {"prompt": "...", "vague": true|false, "split":
+"tune"|"heldout"}, labelled by hand. Skip rate is the share of all prompts
+scored below the threshold; false-skip rate is the share of vague prompts
+that would be skipped, i.e. reach the model without the wrapper.
+
+The built-in weights were tuned against the "tune" prompts only, and --train
+fits on them alone, so the "heldout" rates are the ones that say whether the
+scorer generalizes; --sweep and --max-false-skip use them. Add new prompts as
+"heldout" and do not adjust weights against them. Lines without a split count
+as "tune".
+
+Usage:
+  prompt-eval.py [--corpus FILE] [--threshold 0.5] [--model FILE] [--misses]
+  prompt-eval.py --sweep                     # rates for thresholds 0.1..0.9
+  prompt-eval.py --train ~/.claude/prompt-scorer.pkl   # fit and save a model
+  prompt-eval.py --max-false-skip 0.05       # exit 1 above this held-out rate
+"""
+import argparse
+import json
+import math
+import os
+import pickle
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from hooklib import vagueness  # noqa: E402
+
+CORPUS = Path(__file__).resolve().parent / "prompt-corpus.jsonl"
+SPLITS = ("tune", "heldout")
+
+
+def load_corpus(path) -> list:
+    """[(prompt, vague, split)] from a labelled JSONL file."""
+    rows = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                split = entry.get("split", "tune")
+                if split not in SPLITS:
+                    raise ValueError(f"unknown split {split!r}")
+                rows.append((entry["prompt"], bool(entry["vague"]), split))
+            except (ValueError, KeyError, AttributeError) as e:
+                sys.exit(f"{path}:{n}: bad corpus line ({e})")
+    if not rows:
+        sys.exit(f"{path}: empty corpus")
+    return rows
+
+
+def rates(scored: list, threshold: float) -> dict:
+    """Skip, false-skip and needless-wrap rates for [(score, vague)]."""
+    skipped = [vague for score, vague in scored if score < threshold]
+    vague_total = sum(1 for _, vague in scored if vague)
+    clear_total = len(scored) - vague_total
+    false_skips = sum(skipped)
+    return {
+        "skip": len(skipped) / len(scored),
+        "false_skip": false_skips / vague_total if vague_total else 0.0,
+        "needless_wrap": (clear_total - (len(skipped) - false_skips)) / clear_total if clear_total else 0.0,
+    }
+
+
+def train(rows: list, epochs: int = 2000, rate: float = 0.5, l2: float = 0.01) -> dict:
+    """Logistic regression by batch gradient descent, starting from the built-in weights."""
+    names = sorted(vagueness.DEFAULT_MODEL["weights"])
+    weights = dict(vagueness.DEFAULT_MODEL["weights"])
+    bias = vagueness.DEFAULT_MODEL["bias"]
+    samples = [(vagueness.features(prompt), 1.0 if vague else 0.0) for prompt, vague, _ in rows]
+    for _ in range(epochs):
+        grad = dict.fromkeys(names, 0.0)
+        grad_bias = 0.0
+        for feats, label in samples:
+            z = bias + sum(weights[name] * feats[name] for name in names)
+            err = 1 / (1 + math.exp(-max(-50.0, min(50.0, z)))) - label
+            grad_bias += err
+            for name in names:
+                grad[name] += err * feats[name]
+        bias -= rate * grad_bias / len(samples)
+        for name in names:
+            weights[name] -= rate * (grad[name] / len(samples) + l2 * weights[name])
+    return {"bias": round(bias, 4), "weights": {name: round(weights[name], 4) for name in names}}
+
+
+parser = argparse.ArgumentParser(description="Evaluate the improve-prompt vagueness scorer")
+parser.add_argument("--corpus", default=str(CORPUS), help="labelled JSONL corpus")
+parser.add_argument("--threshold", type=float, help="default: PROMPT_VAGUE_THRESHOLD or 0.5")
+parser.add_argument("--model", help="pickled model (default: PROMPT_SCORER_MODEL or the built-in weights)")
+parser.add_argument("--sweep", action="store_true", help="show rates for a range of thresholds")
+parser.add_argument("--misses", action="store_true", help="list misclassified prompts")
+parser.add_argument("--train", metavar="OUT", help="fit a model on the tuning prompts and pickle it to OUT")
+parser.add_argument("--max-false-skip", type=float, help="exit 1 if the held-out false-skip rate is above this")
+args = parser.parse_args()
+
+rows = load_corpus(args.corpus)
+threshold = args.threshold if args.threshold is not None else vagueness.threshold()
+
+if args.train:
+    tuning = [row for row in rows if row[2] == "tune"]
+    if not tuning:
+        sys.exit(f"{args.corpus}: no tuning prompts to train on")
+    model = train(tuning)
+    out = Path(args.train).expanduser()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(pickle.dumps(model))
+    os.replace(tmp, out)
+    print(f"Saved model to {out} (bias {model['bias']:+.2f})")
+    for name, weight in sorted(model["weights"].items(), key=lambda item: item[1]):
+        print(f"  {name:14} {weight:+.2f}")
+elif args.model:
+    model = vagueness.load_model(args.model)
+else:
+    model = vagueness.load_model()
+
+scored = {split: [] for split in SPLITS}
+for prompt, vague, split in rows:
+    scored[split].append((vagueness.score(prompt, model), vague))
+# The rates that count; a corpus without held-out prompts falls back to the tuning ones
+judged = "heldout" if scored["heldout"] else "tune"
+print(f"Threshold {threshold:g}")
+
+for split in SPLITS:
+    if not scored[split]:
+        continue
+    vague_total = sum(1 for _, vague in scored[split] if vague)
+    label = "Held-out" if split == "heldout" else "Tuning"
+    print(f"{label}: {len(scored[split])} prompts ({vague_total} vague, {len(scored[split]) - vague_total} clear)")
+    r = rates(scored[split], threshold)
+    print(f"  Skip rate:          {r['skip']:.1%}  (prompts sent without the evaluation wrapper)")
+    print(f"  False-skip rate:    {r['false_skip']:.1%}  (vague prompts that were not wrapped)")
+    print(f"  Needless-wrap rate: {r['needless_wrap']:.1%}  (clear prompts that were still wrapped)")
+if judged == "tune":
+    print("No held-out prompts; these rates are on the prompts the weights were tuned on, so they are optimistic.")
+
+if args.sweep:
+    print(f"Sweep ({'held-out' if judged == 'heldout' else 'tuning'} prompts):")
+    print(f"  {'threshold':>9} {'skip':>7} {'false-skip':>11} {'needless-wrap':>14}")
+    for step in range(1, 10):
+        r = rates(scored[judged], step / 10)
+        print(f"  {step / 10:9.1f} {r['skip']:7.1%} {r['false_skip']:11.1%} {r['needless_wrap']:14.1%}")
+
+if args.misses:
+    for prompt, vague, split in rows:
+        score = vagueness.score(prompt, model)
+        if (score >= threshold) != vague:
+            kind = "false skip" if vague else "needless wrap"
+            print(f"  {score:.2f} {kind:13} {split:7} {prompt[:100]!r}")
+
+if args.max_false_skip is not None and rates(scored[judged], threshold)["false_skip"] > args.max_false_skip:
+    sys.exit(1)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Change Watcher - keeps a live per-repo dirty set for the Stop hooks.
+Usage:
+  python3 change-watcher.py start [project_dir]
+  python3 change-watcher.py stop [project_dir]
+  python3 change-watcher.py status [project_dir]
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+from pathlib import Path
+
+from hooklib import watch
+
+parser = argparse.ArgumentParser(description="Per-project file change watcher")
+parser.add_argument("action", choices=("start", "stop", "status", "serve"))
+parser.add_argument("project", nargs="?", default=os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+args = parser.parse_args()
+
+project_dir = Path(args.project).resolve()
+
+if args.action == "serve":
+    sys.exit(watch.serve(str(project_dir)))
+
+state = watch.load(project_dir)
+
+if args.action == "start":
+    if state is not None:
+        print(f"Already running for {project_dir}")
+    else:
+        watch.spawn(project_dir)
+        print(f"Started change watcher for {project_dir}")
+    sys.exit(0)
+
+if args.action == "stop":
+    if state is None:
+        print("Not running")
+    else:
+        try:
+            os.kill(state["pid"], signal.SIGTERM)
+            print("Stopped")
+        except OSError as e:
+            print(f"Could not stop pid {state['pid']}: {e}")
+    sys.exit(0)
+
+if state is None:
+    print("Not running")
+    sys.exit(1)
+summary = {
+    "project": str(project_dir),
+    "pid": state["pid"],
+    "backend": state["backend"],
+    "dirty": sorted(watch.dirty_repos(state)),
+    "files": {repo: len(info["files"]) for repo, info in sorted(state["repos"].items()) if info["files"]},
+}
+print(json.dumps(summary, indent=2))
+sys.exit(0)
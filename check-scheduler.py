@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Check Scheduler - background, debounced type-checks for tsc-check.py.
+Usage:
+  python3 check-scheduler.py start [project_dir]
+  python3 check-scheduler.py stop [project_dir]
+  python3 check-scheduler.py status [project_dir]
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+from hooklib import check_scheduler
+
+parser = argparse.ArgumentParser(description="Per-project background type-check scheduler")
+parser.add_argument("action", choices=("start", "stop", "status", "serve"))
+parser.add_argument("project", nargs="?", default=os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+args = parser.parse_args()
+
+project_dir = Path(args.project).resolve()
+
+if args.action == "serve":
+    sys.exit(check_scheduler.serve(str(project_dir)))
+
+if args.action == "start":
+    if check_scheduler.is_running(project_dir):
+        print(f"Already running for {project_dir}")
+    else:
+        check_scheduler.spawn(project_dir)
+        print(f"Started check scheduler for {project_dir}")
+    sys.exit(0)
+
+if args.action == "stop":
+    reply = check_scheduler.request(project_dir, {"op": "stop"})
+    print("Stopped" if reply else "Not running")
+    sys.exit(0)
+
+reply = check_scheduler.request(project_dir, {"op": "status"})
+print(json.dumps(reply, indent=2) if reply else "Not running")
+sys.exit(0 if reply else 1)
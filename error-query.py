@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Error Query - look up the type-check errors the hooks saved, without reading
+all of last-errors.txt. Identical errors (same code and message) are merged.
+Usage:
+  python3 error-query.py summary
+  python3 error-query.py file PATH [PATH ...]
+  python3 error-query.py codes [--limit N]
+  python3 error-query.py files [--code CODE] [--limit N]
+  python3 error-query.py groups [--code CODE] [--limit N]
+Reads the newest errors.db of any session unless --session or --db is given.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from hooklib import error_index
+
+# Locations listed per merged error before the rest are counted
+MAX_LOCATIONS = 8
+
+parser = argparse.ArgumentParser(description="Query the indexed type-check errors")
+parser.add_argument("action", choices=("summary", "file", "codes", "files", "groups"))
+parser.add_argument("paths", nargs="*", help="files, for `file` (project-relative, absolute or a path suffix)")
+parser.add_argument("--code", help="only this error code, for `files` and `groups`")
+parser.add_argument("--limit", type=int, default=20)
+parser.add_argument("--session", help="session id (default: the most recent errors)")
+parser.add_argument("--db", help="errors.db to read")
+parser.add_argument("--project", default=os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd()))
+args = parser.parse_args()
+
+# The Stop hooks keep errors in the project, tsc-check.py in the home directory
+home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+cache_roots = [Path(args.project) / ".claude" / "tsc-cache", Path(home_dir) / ".claude" / "tsc-cache"]
+
+if args.db:
+    db_path = Path(args.db)
+elif args.session:
+    db_path = next((root / args.session / error_index.DB_NAME for root in cache_roots
+                    if (root / args.session / error_index.DB_NAME).exists()), None)
+else:
+    db_path = error_index.latest(*cache_roots)
+if db_path is None or not db_path.exists():
+    print("No saved errors found", file=sys.stderr)
+    sys.exit(1)
+
+conn = error_index.connect(db_path)
+
+
+def locations(pairs: list) -> str:
+    shown = ", ".join(f"{line}:{col}" for line, col in pairs[:MAX_LOCATIONS])
+    more = len(pairs) - MAX_LOCATIONS
+    return f"{shown} (+{more} more)" if more > 0 else shown
+
+
+if args.action == "summary":
+    count, distinct, files = error_index.totals(conn)
+    print(f"{count} errors ({distinct} distinct) in {files} files — {db_path}")
+    for c in error_index.top_codes(conn, 5):
+        print(f"  {c.code}: {c.count}")
+
+elif args.action == "file":
+    if not args.paths:
+        parser.error("file needs at least one path")
+    for path in args.paths:
+        matches = error_index.match_files(conn, path)
+        if not matches:
+            print(f"{path}: no errors")
+            continue
+        for file in matches:
+            errors = error_index.file_errors(conn, file)
+            print(f"{file}: {sum(len(e.locations) for e in errors)} errors ({len(errors)} distinct)")
+            for e in errors:
+                print(f"  {e.code} at {locations(e.locations)}: {e.message}")
+
+elif args.action == "codes":
+    for c in error_index.top_codes(conn, args.limit):
+        print(f"{c.count:>7}  {c.code}  ({c.messages} distinct messages)")
+
+elif args.action == "files":
+    for f in error_index.files_by_count(conn, args.limit, args.code):
+        print(f"{f.count:>7}  {f.file}  ({f.distinct} distinct)")
+
+else:
+    for g in error_index.groups(conn, args.limit, args.code):
+        where = ", ".join(f"{file}:{line}" for file, line in g.locations)
+        more = f", +{g.count - len(g.locations)} more" if g.count > len(g.locations) else ""
+        print(f"{g.count:>7}  {g.code}: {g.message}")
+        print(f"         in {g.files} files: {where}{more}")
+sys.exit(0)
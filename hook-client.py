@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Hook Client - forwards a hook event to the resident hook host.
+Usage in settings.json:  python3 -S <hooks>/hook-client.py <hook-name>
+Passes stdin, environment and cwd to hook-host.py and replays the handler's
+stdout, stderr and exit code. When no host is running, the host is busy
+with another event or it does not answer within HOOK_CLIENT_CONNECT_TIMEOUT
+seconds, the hook script is run in-process instead (HOOK_HOST_AUTOSTART=1
+also starts a host for the next event). A handler the host has started is
+given HOOK_CLIENT_TIMEOUT seconds (default 60); after that the hook gives up
+with a warning rather than run a second time here. Only builtin modules are
+imported on the fast path.
+"""
+import _socket
+import os
+import struct
+import sys
+
+hooks_dir = os.path.dirname(os.path.abspath(__file__))
+hook = sys.argv[1] if len(sys.argv) > 1 else ""
+home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+host_dir = os.path.join(home_dir, ".claude", "hook-host")
+
+
+def recv_exact(conn, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError("connection closed")
+        data += chunk
+    return data
+
+
+def recv_frame(conn) -> bytes:
+    (size,) = struct.unpack(">I", recv_exact(conn, 4))
+    return recv_exact(conn, size)
+
+
+def send_frame(conn, data: bytes) -> None:
+    conn.sendall(struct.pack(">I", len(data)) + data)
+
+
+def forward(payload: bytes):
+    """Run the hook in the host. Returns (exit code, stdout, stderr), or None
+    when it should run here. The header layout matches hooklib.host.encode_header()."""
+    # Connecting plus the host's HOOK_HOST_QUEUE wait for a running handler
+    connect_timeout = float(os.environ.get("HOOK_CLIENT_CONNECT_TIMEOUT", "5"))
+    reply_timeout = float(os.environ.get("HOOK_CLIENT_TIMEOUT", "60"))
+    try:
+        if hasattr(_socket, "AF_UNIX"):
+            conn = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+            address = os.path.join(host_dir, "host.sock")
+        else:
+            with open(os.path.join(host_dir, "host.port")) as f:
+                address = ("127.0.0.1", int(f.read()))
+            conn = _socket.socket(_socket.AF_INET, _socket.SOCK_STREAM)
+        try:
+            conn.settimeout(connect_timeout)
+            conn.connect(address)
+            fields = ["run", hook, os.getcwd()] + [f"{k}={v}" for k, v in os.environ.items()]
+            send_frame(conn, "\0".join(fields).encode("utf-8", "surrogateescape"))
+            send_frame(conn, payload)
+            # "busy" or "unknown hook": the host did not take the event
+            if recv_frame(conn) != b"run":
+                return None
+            conn.settimeout(reply_timeout)
+            try:
+                code = int(recv_frame(conn))
+                return (code, recv_frame(conn), recv_frame(conn))
+            except (OSError, ValueError, EOFError):
+                # The handler has started in the host; running it again here
+                # could apply its side effects twice
+                warning = f"hook-client: no reply from the hook host for {hook} within {reply_timeout:g}s\n"
+                return (0, b"", warning.encode())
+        finally:
+            conn.close()
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+payload = sys.stdin.buffer.read()
+result = forward(payload)
+
+if result is None:
+    # No host: run the hook script here, exactly as settings.json used to
+    import io
+    import runpy
+
+    if os.environ.get("HOOK_HOST_AUTOSTART", "") == "1":
+        from hooklib import host
+        host.spawn()
+    script = os.path.join(hooks_dir, f"{hook}.py")
+    sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+    sys.argv = [script]
+    runpy.run_path(script, run_name="__main__")
+    sys.exit(0)
+
+code, out, err = result
+if os.linesep != "\n":
+    out = out.replace(b"\n", os.linesep.encode())
+    err = err.replace(b"\n", os.linesep.encode())
+sys.stdout.buffer.write(out)
+sys.stderr.buffer.write(err)
+sys.stdout.flush()
+sys.stderr.flush()
+sys.exit(code)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Hook Host - resident process that runs the Python hooks for hook-client.py.
+Usage:
+  python3 hook-host.py start | stop | status
+"""
+import json
+import sys
+
+from hooklib import host
+
+action = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+if action == "serve":
+    sys.exit(host.serve())
+
+if action == "start":
+    if host.call("status", timeout=2.0):
+        print("Hook host already running")
+    else:
+        host.spawn()
+        print("Started hook host")
+    sys.exit(0)
+
+if action == "stop":
+    print("Stopped" if host.call("stop", timeout=5.0) else "Not running")
+    sys.exit(0)
+
+if action == "status":
+    reply = host.call("status", timeout=5.0)
+    print(json.dumps(reply, indent=2) if reply else "Not running")
+    sys.exit(0 if reply else 1)
+
+print(__doc__.strip(), file=sys.stderr)
+sys.exit(1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Hook Stats - per-hook, per-phase timing from the HOOK_SPANS=1 metrics file.
+Usage:
+  python3 hook-stats.py [--hook NAME] [--since HOURS] [--file PATH]
+"""
+import argparse
+import json
+import math
+import sys
+import time
+from collections import defaultdict
+
+from hooklib import spans
+
+# Histogram buckets: upper bounds in ms, doubling from 1 ms
+BUCKETS = [2 ** i for i in range(0, 17)]
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def bucket_label(i: int) -> str:
+    upper = BUCKETS[i]
+    return f"<{upper}ms" if upper < 1000 else f"<{upper / 1000:g}s"
+
+
+def histogram(values: list, width: int = 30) -> list:
+    """Rows of (label, count, bar) over the power-of-two buckets that are used."""
+    counts = [0] * (len(BUCKETS) + 1)
+    for v in values:
+        counts[next((i for i, upper in enumerate(BUCKETS) if v < upper), len(BUCKETS))] += 1
+    used = [i for i, c in enumerate(counts) if c]
+    peak = max(counts)
+    rows = []
+    for i in range(used[0], used[-1] + 1):
+        label = bucket_label(i) if i < len(BUCKETS) else f">={BUCKETS[-1] / 1000:g}s"
+        rows.append((label, counts[i], "#" * max(1 if counts[i] else 0, counts[i] * width // peak)))
+    return rows
+
+
+parser = argparse.ArgumentParser(description="Summarize hook timing spans")
+parser.add_argument("--hook", help="only this hook")
+parser.add_argument("--since", type=float, help="only spans from the last N hours")
+parser.add_argument("--file", help="metrics file (default: HOOK_SPANS_FILE or ~/.claude/hook-metrics/spans.jsonl)")
+parser.add_argument("--no-histograms", action="store_true")
+args = parser.parse_args()
+
+path = args.file or str(spans.spans_file())
+cutoff = time.time() - args.since * 3600 if args.since else 0
+
+# hook -> phase -> [ms]; phases timed inside another phase
+phases = defaultdict(lambda: defaultdict(list))
+nested = set()
+for name in (f"{path}.1", path):
+    try:
+        f = open(name, encoding="utf-8")
+    except OSError:
+        continue
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("ts", 0) < cutoff or (args.hook and entry.get("hook") != args.hook):
+                continue
+            phases[entry.get("hook", "?")][entry.get("phase", "?")].append(entry.get("ms", 0.0))
+            if entry.get("nested"):
+                nested.add((entry.get("hook", "?"), entry.get("phase", "?")))
+
+if not phases:
+    print(f"No spans in {path} (set HOOK_SPANS=1 to record them)")
+    sys.exit(1)
+
+for hook in sorted(phases):
+    total = sum(sum(values) for phase, values in phases[hook].items() if (hook, phase) not in nested)
+    print(f"\n{hook}  ({total / 1000:.1f}s recorded)")
+    print(f"  {'phase':24} {'n':>6} {'p50':>9} {'p95':>9} {'max':>9} {'total':>9} {'share':>6}")
+    for phase, values in sorted(phases[hook].items(), key=lambda item: -sum(item[1])):
+        # Nested phases are part of another phase's time, so have no share of their own
+        share = "-" if (hook, phase) in nested else f"{sum(values) / total * 100 if total else 0:5.1f}%"
+        label = f"  {phase}" if (hook, phase) in nested else phase
+        print(f"  {label:24} {len(values):6} {percentile(values, 0.5):8.1f}ms {percentile(values, 0.95):8.1f}ms "
+              f"{max(values):8.1f}ms {sum(values) / 1000:8.1f}s {share:>6}")
+        if not args.no_histograms:
+            for bucket, count, bar in histogram(values):
+                print(f"      {bucket:>9} {count:6} {bar}")
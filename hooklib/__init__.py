@@ -0,0 +1,5 @@
+"""
+Shared helpers for the Claude Code hook scripts.
+The hook scripts are run as `python3 <hooks>/<script>.py`, so this package is
+importable from them without any install step.
+"""
@@ -0,0 +1,359 @@
+"""
+Background, debounced type-check scheduler for tsc-check.py.
+With TSC_CHECK_BACKGROUND=1 the hook only tells a per-project scheduler
+process which repos are dirty and returns. The scheduler waits until a
+repo's edits have been quiet for TSC_CHECK_DEBOUNCE seconds, runs at most
+one check per repo at a time, and kills a running check as soon as a newer
+edit to its repo arrives. Finished checks are stored in the result cache
+under the fingerprint the Stop hook computes, so it replays them instead of
+running tsc again; wait() lets the Stop hook finish a pending check first.
+"""
+import hashlib
+import json
+import os
+import socketserver
+import threading
+import time
+from pathlib import Path
+
+from hooklib import checkers, incremental, ipc, result_cache, shared_store
+from hooklib.diagnostics import DiagnosticCollector, run_streaming
+from hooklib.locking import locked
+from hooklib.proc import kill_tree
+
+# Settings are read per call, like hooklib.spans, so a hook running in the
+# resident host follows the event's environment
+
+
+def debounce_seconds() -> float:
+    """Quiet period after the last edit to a repo before it is checked."""
+    return float(os.environ.get("TSC_CHECK_DEBOUNCE", "1.0"))
+
+
+def max_workers() -> int:
+    """Concurrent checks across repos."""
+    return int(os.environ.get("TSC_CHECK_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def check_timeout() -> float:
+    """Time limit for one check."""
+    return float(os.environ.get("TSC_CHECK_TIMEOUT", "600"))
+
+
+def idle_seconds() -> float:
+    """Seconds without requests or work before the scheduler shuts itself down."""
+    return float(os.environ.get("TSC_SCHEDULER_IDLE", "900"))
+
+
+def scheduler_dir() -> Path:
+    """Directory holding the socket, info and log files of running schedulers."""
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "check-scheduler"
+
+
+def endpoint(project_dir) -> tuple:
+    """Return (socket path, info file) for a project."""
+    key = hashlib.sha1(str(Path(project_dir).resolve()).encode()).hexdigest()[:16]
+    base = scheduler_dir()
+    return (base / f"{key}.sock", base / f"{key}.json")
+
+
+def pending_file(project_dir) -> Path:
+    """Jobs written while no scheduler was answering; drained once it starts."""
+    sock_path, _ = endpoint(project_dir)
+    return sock_path.with_suffix(".pending.jsonl")
+
+
+# ---------------------------------------------------------------------------
+# Client side (used by tsc-check.py and stop-build-check-enhanced.py)
+# ---------------------------------------------------------------------------
+
+def request(project_dir, payload: dict, timeout: float = 5.0):
+    """Send one request to the project's scheduler. Returns the reply or None."""
+    sock_path, info_file = endpoint(project_dir)
+    try:
+        with ipc.connect(sock_path, info_file, timeout) as conn:
+            conn.sendall((json.dumps(payload) + "\n").encode())
+            reply = conn.makefile("r", encoding="utf-8").readline()
+        return json.loads(reply) if reply else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def is_running(project_dir) -> bool:
+    reply = request(project_dir, {"op": "status"}, timeout=2.0)
+    return bool(reply and reply.get("ok"))
+
+
+def spawn(project_dir) -> None:
+    """Start a detached scheduler for a project. Returns immediately."""
+    sock_path, _ = endpoint(project_dir)
+    script = Path(__file__).resolve().parent.parent / "check-scheduler.py"
+    ipc.spawn_detached([str(script), "serve", str(Path(project_dir).resolve())], sock_path.with_suffix(".log"))
+
+
+def enqueue(project_dir, repo: str, repo_path, cmd: str, files, session_id: str = "", kind: str = "tsc") -> None:
+    """Mark a repo's `kind` check (see hooklib.checkers) dirty. Never waits
+    for the check; starts a scheduler if none is answering, handing it the
+    job through the pending file."""
+    job = {"op": "dirty", "repo": repo, "repo_path": str(Path(repo_path).resolve()), "cmd": cmd,
+           "files": list(files), "session": session_id, "kind": kind}
+    if request(project_dir, job, timeout=2.0):
+        return
+    path = pending_file(project_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with locked(path):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(job) + "\n")
+    spawn(project_dir)
+
+
+def wait(project_dir, repo_path, timeout: float = 600.0):
+    """Run a repo's queued checks now and wait for all of them to finish.
+    Returns the scheduler's reply, or None when no scheduler is running (the
+    usual case when background mode is off, and cheap: one failed read)."""
+    payload = {"op": "wait", "repo_path": str(Path(repo_path).resolve()), "timeout": timeout}
+    return request(project_dir, payload, timeout=timeout + 5)
+
+
+# ---------------------------------------------------------------------------
+# Server side (run via `check-scheduler.py serve`)
+# ---------------------------------------------------------------------------
+
+class Job:
+    """Scheduling state of one checker in one repo."""
+
+    def __init__(self, repo: str, repo_path: str, kind: str):
+        self.repo = repo
+        self.repo_path = repo_path
+        self.kind = kind
+        self.cmd = ""
+        self.session = ""
+        self.files = []
+        self.dirty = False
+        self.flush = False  # a waiter wants it checked without the debounce
+        self.last_edit = 0.0
+        self.proc = None
+        self.running = False
+        self.cancelled = False
+        self.last_result = None
+
+    def status(self) -> dict:
+        return {"repo": self.repo, "kind": self.kind, "dirty": self.dirty, "running": self.running,
+                "result": self.last_result}
+
+
+class Scheduler:
+    def __init__(self, project_dir: str):
+        self.project_dir = project_dir
+        self.output_dir = Path(project_dir) / ".claude" / "tsc-cache" / "scheduler"
+        self.cond = threading.Condition()
+        self.jobs = {}
+        self.running = 0
+        self.last_activity = time.monotonic()
+        self.stopping = False
+
+    def mark_dirty(self, req: dict) -> None:
+        """Apply one "dirty" request (see enqueue())."""
+        kind = req.get("kind", "tsc")
+        with self.cond:
+            job = self.jobs.get((req["repo_path"], kind))
+            if job is None:
+                job = self.jobs[(req["repo_path"], kind)] = Job(req["repo"], req["repo_path"], kind)
+            job.cmd = req["cmd"]
+            job.session = req.get("session", "")
+            job.files += [f for f in req.get("files", []) if f not in job.files]
+            job.dirty = True
+            job.last_edit = time.monotonic()
+            self.last_activity = job.last_edit
+            # The running check is already stale: stop it and go again after the debounce
+            if job.running:
+                job.cancelled = True
+                if job.proc is not None:
+                    kill_tree(job.proc)
+            self.cond.notify_all()
+
+    def drain_pending(self) -> None:
+        path = pending_file(self.project_dir)
+        if not path.exists():
+            return
+        with locked(path):
+            try:
+                lines = path.read_text(encoding="utf-8").splitlines()
+                path.unlink()
+            except OSError:
+                return
+        for line in lines:
+            try:
+                self.mark_dirty(json.loads(line))
+            except (ValueError, KeyError):
+                continue
+
+    def wait_idle(self, repo_path: str, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        with self.cond:
+            jobs = [job for job in self.jobs.values() if job.repo_path == repo_path]
+            if not jobs:
+                return {"ok": True, "state": "unknown"}
+            for job in jobs:
+                job.flush = True
+            self.cond.notify_all()
+            while any(job.dirty or job.running for job in jobs) and not self.stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return {"ok": False, "state": "timeout"}
+                self.cond.wait(remaining)
+            return {"ok": True, "state": "idle", "results": {job.kind: job.last_result for job in jobs}}
+
+    def run_job(self, job: Job, files: list) -> None:
+        """Check one repo and publish the result unless it was superseded."""
+        checker = checkers.CHECKERS[job.kind]
+        stem = hashlib.sha1(job.repo_path.encode()).hexdigest()[:16]
+        output = self.output_dir / f"{stem}.{job.kind}.out"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        collector = DiagnosticCollector(output, preview_size=10, parse=checker.parse)
+        result = None
+        try:
+            states = {}
+            fp = result_cache.fingerprint(self.project_dir, job.repo_path, job.cmd, files, checker.inputs,
+                                          shared_store.source_state(self.project_dir, job.repo, states))
+            key = None
+            cached = result_cache.lookup_entry(self.project_dir, job.repo_path, fp)
+            if cached is None:
+                # Another session or worktree may have checked the same content
+                key = shared_store.tree_key(self.project_dir, job.repo, job.cmd, states)
+                cached = shared_store.lookup(key)
+                if cached is not None:
+                    result_cache.store_file(self.project_dir, job.repo_path, fp, cached[0], cached[1])
+            if cached is not None:
+                collector.close()
+                result = {"cached": True}
+            else:
+                def started(proc):
+                    with self.cond:
+                        job.proc = proc
+                        if job.cancelled:
+                            kill_tree(proc)
+
+                run = incremental.IncrementalRun(self.project_dir, job.repo, job.cmd, job.session)
+                returncode = None
+                try:
+                    returncode, elapsed, timed_out = run_streaming(
+                        run.command, job.repo_path, collector, timeout=check_timeout(), on_start=started
+                    )
+                finally:
+                    with self.cond:
+                        superseded = job.cancelled
+                    counts = run.finish(not superseded and returncode is not None)
+                if timed_out:
+                    result = {"timed_out": True}
+                # Publish only if nothing tsc read changed while it ran
+                elif not superseded and result_cache.fingerprint(
+                        self.project_dir, job.repo_path, job.cmd, files, checker.inputs,
+                        shared_store.source_state(self.project_dir, job.repo)) == fp:
+                    success = returncode == 0 and collector.count == 0
+                    result_cache.store_file(self.project_dir, job.repo_path, fp, success, output)
+                    shared_store.store(key, success, output, job.repo)
+                    result = {"success": success, "errors": collector.count, "seconds": round(elapsed, 2)}
+                    if counts:
+                        result["rechecked"], result["files"] = counts
+        except Exception as e:
+            collector.close()
+            result = {"error": str(e)}
+        finally:
+            with self.cond:
+                job.running = False
+                job.proc = None
+                if job.cancelled:
+                    # Superseded: its files go into the next run
+                    job.cancelled = False
+                    job.files = files + [f for f in job.files if f not in files]
+                elif result is not None:
+                    job.last_result = result
+                self.running -= 1
+                self.last_activity = time.monotonic()
+                self.cond.notify_all()
+
+    def loop(self) -> None:
+        """Start checks for repos whose edits have settled, until idle or stopped."""
+        while True:
+            self.drain_pending()
+            with self.cond:
+                if self.stopping:
+                    return
+                now = time.monotonic()
+                next_due = now + 1.0
+                for job in self.jobs.values():
+                    if not job.dirty or job.running:
+                        continue
+                    due = now if job.flush else job.last_edit + debounce_seconds()
+                    if due > now:
+                        next_due = min(next_due, due)
+                        continue
+                    if self.running >= max_workers():
+                        break
+                    files, job.files = job.files, []
+                    job.dirty = job.flush = False
+                    job.running = True
+                    self.running += 1
+                    threading.Thread(target=self.run_job, args=(job, files), daemon=True).start()
+                busy = self.running or any(job.dirty for job in self.jobs.values())
+                if not busy and now - self.last_activity > idle_seconds():
+                    return
+                self.cond.wait(max(0.01, next_due - now))
+
+    def stop(self) -> None:
+        with self.cond:
+            self.stopping = True
+            for job in self.jobs.values():
+                if job.proc is not None:
+                    job.cancelled = True
+                    kill_tree(job.proc)
+            self.cond.notify_all()
+
+
+def serve(project_dir: str) -> int:
+    """Run the scheduler and answer requests until idle or stopped."""
+    project_dir = str(Path(project_dir).resolve())
+    sock_path, info_file = endpoint(project_dir)
+    scheduler = Scheduler(project_dir)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                req = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            with scheduler.cond:
+                scheduler.last_activity = time.monotonic()
+            op = req.get("op")
+            if op == "dirty":
+                scheduler.mark_dirty(req)
+                reply = {"ok": True}
+            elif op == "wait":
+                reply = scheduler.wait_idle(req.get("repo_path", ""), float(req.get("timeout", 600)))
+            elif op == "status":
+                with scheduler.cond:
+                    jobs = [job.status() for job in scheduler.jobs.values()]
+                reply = {"ok": True, "project": project_dir, "pid": os.getpid(), "jobs": jobs}
+            elif op == "stop":
+                scheduler.stop()
+                reply = {"ok": True}
+            else:
+                reply = {"ok": False, "error": f"unknown op: {op}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+    # Two hooks can spawn a scheduler at once; only one may bind
+    with locked(info_file):
+        if is_running(project_dir):
+            return 0
+        server = ipc.make_server(sock_path, info_file, Handler, {"project": project_dir})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        scheduler.loop()
+    finally:
+        scheduler.stop()
+        server.shutdown()
+        server.server_close()
+        ipc.remove_endpoint(sock_path, info_file)
+    return 0
@@ -0,0 +1,232 @@
+"""
+Pluggable type checkers for tsc-check.py and the Stop hook.
+A Checker names the source files it covers, the marker files that make a
+directory its project, how to build its command from the repo's discovery
+facts, how to parse one output line into a Diagnostic, and which config
+files go into the result-cache fingerprint. Everything downstream (result
+cache, shared store, scheduler, parallel Stop checks, error summaries)
+treats every checker alike.
+
+TypeScript repos keep their existing detection (workspace graph and known
+directories); other files are owned by the nearest enclosing directory with
+one of the checker's markers, except that Rust files belong to their cargo
+workspace root, which is where cargo's paths are relative to. A checker
+whose tool is not installed is skipped rather than reported as a failure.
+"""
+import fnmatch
+import os
+import re
+import shutil
+from collections import namedtuple
+from pathlib import Path
+
+from hooklib import discovery, project_graph
+from hooklib.diagnostics import ANSI, Diagnostic, parse_line
+
+Checker = namedtuple("Checker", "name extensions markers command parse inputs")
+
+PYTHON_INPUTS = ("pyproject.toml", "setup.cfg", "mypy.ini", ".mypy.ini", "pyrightconfig.json",
+                 "requirements*.txt", "poetry.lock", "uv.lock")
+
+
+def _parser(pattern: str, default_code: str):
+    """Line parser for a regex with file/line/col/code/message groups."""
+    regex = re.compile(pattern)
+
+    def parse(line: str):
+        m = regex.match(ANSI.sub("", line).strip())
+        if not m:
+            return None
+        return Diagnostic(
+            m.group("file").strip(),
+            int(m.group("line")),
+            int(m.group("col") or 0),
+            m.group("code") or default_code,
+            m.group("message"),
+        )
+    return parse
+
+
+def _tsc_command(facts: dict) -> str:
+    return discovery.tsc_command(facts)
+
+
+def _pyright_command(facts: dict) -> str:
+    if facts["python_checker"] == "pyright":
+        return "pyright" if shutil.which("pyright") else ""
+    if facts["python_checker"] == "" and shutil.which("pyright"):
+        return "pyright"
+    return ""
+
+
+def _mypy_command(facts: dict) -> str:
+    configured = facts["python_checker"] == "mypy"
+    if configured or (facts["python_checker"] == "" and not shutil.which("pyright") and shutil.which("mypy")):
+        return "mypy --show-column-numbers --no-error-summary --no-color-output --no-pretty ."
+    return ""
+
+
+def _cargo_command(facts: dict) -> str:
+    if facts["cargo"] and shutil.which("cargo"):
+        return "cargo check --workspace --quiet --message-format short"
+    return ""
+
+
+def _dotnet_command(facts: dict) -> str:
+    if facts["dotnet_project"] and shutil.which("dotnet"):
+        return f'dotnet build "{facts["dotnet_project"]}" --nologo -v:q -clp:NoSummary'
+    return ""
+
+
+CHECKERS = {
+    checker.name: checker
+    for checker in (
+        Checker("tsc", (".ts", ".tsx", ".js", ".jsx"), ("tsconfig.json",), _tsc_command, parse_line, None),
+        # /abs/path/a.py:12:5 - error: Message (reportGeneralTypeIssues)
+        Checker("pyright", (".py", ".pyi"), discovery.PYTHON_MARKERS, _pyright_command, _parser(
+            r"^(?P<file>.+?):(?P<line>\d+):(?P<col>\d+) - error: (?P<message>.*?)(?: \((?P<code>report\w+)\))?$",
+            "pyright"), PYTHON_INPUTS),
+        # a.py:12:5: error: Message  [code]
+        Checker("mypy", (".py", ".pyi"), discovery.PYTHON_MARKERS, _mypy_command, _parser(
+            r"^(?P<file>(?:[A-Za-z]:)?[^:]+?):(?P<line>\d+):(?:(?P<col>\d+):)? error: (?P<message>.*?)"
+            r"(?:\s+\[(?P<code>[\w-]+)\])?$",
+            "mypy"), PYTHON_INPUTS),
+        # src/main.rs:3:5: error[E0308]: mismatched types
+        Checker("cargo", (".rs",), ("Cargo.toml",), _cargo_command, _parser(
+            r"^(?P<file>(?:[A-Za-z]:)?[^:]+?):(?P<line>\d+):(?P<col>\d+): error(?:\[(?P<code>E\d+)\])?: (?P<message>.*)$",
+            "rustc"), ("Cargo.toml", "Cargo.lock")),
+        # Assets/Player.cs(12,5): error CS0103: The name 'x' does not exist [Game.csproj]
+        Checker("dotnet", (".cs",), ("*.csproj", "*.sln"), _dotnet_command, _parser(
+            r"^(?P<file>[^(]+)\((?P<line>\d+),(?P<col>\d+)(?:,\d+,\d+)?\): error (?P<code>[A-Z]+\d+): (?P<message>.*?)"
+            r"(?: \[[^\]]+\])?$",
+            "dotnet"), ("*.sln", "*.csproj", "Directory.Build.props", "Directory.Packages.props", "packages.lock.json")),
+    )
+}
+
+EXTENSIONS = tuple(sorted({ext for checker in CHECKERS.values() for ext in checker.extensions}))
+
+
+def is_checked(file_path: str) -> bool:
+    return file_path.lower().endswith(EXTENSIONS)
+
+
+def label(repo: str, kind: str) -> str:
+    """Display name of a check: the repo for tsc, "repo (kind)" otherwise."""
+    return repo if kind == "tsc" else f"{repo} ({kind})"
+
+
+def file_stem(repo: str, kind: str) -> str:
+    """Flat file-name stem for a check's output files."""
+    stem = "root" if repo == "." else repo.replace("/", "__")
+    return stem if kind == "tsc" else f"{stem}.{kind}"
+
+
+def _cargo_workspace(project_dir: str, path: str) -> str:
+    """The directory of the workspace Cargo.toml above `path`, within the
+    project, or `path` itself. Cargo prints every member's paths relative to
+    the workspace root."""
+    current = path
+    while current == project_dir or current.startswith(project_dir + os.sep):
+        try:
+            with open(os.path.join(current, "Cargo.toml"), encoding="utf-8") as f:
+                if re.search(r"^\s*\[workspace\]", f.read(), re.M):
+                    return current
+        except OSError:
+            pass
+        current = os.path.dirname(current)
+    return path
+
+
+def for_file(project_dir, file_path: str):
+    """(repo, checker name, command) for a non-TypeScript source file, found
+    by walking up to the nearest project with that checker's markers, or None."""
+    ext = os.path.splitext(file_path)[1].lower()
+    candidates = [c for c in CHECKERS.values() if c.name != "tsc" and ext in c.extensions]
+    if not candidates:
+        return None
+    project_dir = os.path.abspath(project_dir)
+    current = os.path.dirname(os.path.abspath(file_path))
+    while current == project_dir or current.startswith(project_dir + os.sep):
+        try:
+            names = os.listdir(current)
+        except OSError:
+            names = []
+        owners = [c for c in candidates if any(fnmatch.filter(names, marker) for marker in c.markers)]
+        if owners:
+            for checker in owners:
+                root = _cargo_workspace(project_dir, current) if checker.name == "cargo" else current
+                repo = os.path.relpath(root, project_dir).replace("\\", "/")
+                cmd = checker.command(discovery.repo_facts(project_dir, repo))
+                if cmd:
+                    return (repo, checker.name, cmd)
+            return None
+        current = os.path.dirname(current)
+    return None
+
+
+# Top-level directories that are repos of their own when no workspace project owns a file
+KNOWN_REPOS = {
+    "frontend", "client", "web", "app", "ui",
+    "backend", "server", "api", "src", "services",
+    "database", "prisma", "migrations"
+}
+
+
+def detect_repo(project_dir, file_path: str) -> str:
+    """Detect repo from file path: the enclosing workspace project, or a
+    known top-level directory."""
+    owner = project_graph.load(project_dir).owner(project_dir, file_path)
+    if owner:
+        return owner
+
+    try:
+        relative_path = os.path.relpath(file_path, project_dir).replace("\\", "/")
+    except ValueError:
+        return "unknown"
+
+    parts = relative_path.split("/")
+    if not parts:
+        return "unknown"
+
+    repo = parts[0]
+    if repo in KNOWN_REPOS:
+        return repo
+
+    # Package/monorepo structure
+    if repo in ("packages", "examples") and len(parts) > 1:
+        return f"{repo}/{parts[1]}"
+
+    # Root file
+    if "/" not in relative_path:
+        return "root"
+
+    return "unknown"
+
+
+def repo_for_file(project_dir, file_path: str):
+    """The repo an edit to `file_path` is checked under, as commands_for_file()
+    keys it, or None when no repo owns it."""
+    owned = for_file(project_dir, file_path)
+    if owned:
+        return owned[0]
+    repo = detect_repo(project_dir, file_path)
+    return None if repo == "unknown" or not repo else repo
+
+
+def commands_for_file(project_dir, file_path: str):
+    """(repo, {kind: command}) for an edited file, as post-tool-use-tracker.py
+    journals it, or None when no repo owns it. Python, Rust and C# sources
+    belong to the nearest project their checker recognizes; everything else
+    goes through the TypeScript repo detection."""
+    owned = for_file(project_dir, file_path)
+    if owned:
+        repo, kind, cmd = owned
+        return (repo, {kind: f"cd {Path(project_dir) / repo} && {cmd}"})
+    repo = detect_repo(project_dir, file_path)
+    if repo == "unknown" or not repo:
+        return None
+    build = discovery.build_command(discovery.repo_facts(project_dir, repo), repo)
+    return (repo, {
+        "build": f"cd {Path(project_dir) / repo} && {build}" if build else "",
+        "tsc": discovery.repo_tsc_command(project_dir, repo),
+    })
@@ -0,0 +1,138 @@
+"""
+Streaming check output parsing.
+Reads a check process's output line by line and turns each diagnostic into
+a compact record (tsc by default; hooklib.checkers has the other parsers). Memory stays flat however much tsc prints: only running
+counts and a bounded preview are kept, while raw output and records are
+spilled to disk as they arrive.
+"""
+import json
+import re
+import subprocess
+import threading
+import time
+from collections import Counter, namedtuple
+
+from hooklib.proc import kill_tree, popen_group
+
+Diagnostic = namedtuple("Diagnostic", "file line column code message")
+
+# `src/a.ts(12,5): error TS2322: msg` (--pretty false) and
+# `src/a.ts:12:5 - error TS2322: msg` (--pretty)
+TSC_LINE = re.compile(
+    r"^(?P<file>[^\s(][^(]*?)(?:\((?P<line>\d+),(?P<col>\d+)\)|:(?P<line2>\d+):(?P<col2>\d+))"
+    r"\s*[:-]\s*error\s+(?P<code>TS\d+):\s*(?P<message>.*)$"
+)
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+def parse_line(line: str):
+    """Parse one tsc output line. Returns a Diagnostic or None."""
+    m = TSC_LINE.match(ANSI.sub("", line).strip())
+    if not m:
+        return None
+    return Diagnostic(
+        m.group("file").strip(),
+        int(m.group("line") or m.group("line2")),
+        int(m.group("col") or m.group("col2")),
+        m.group("code"),
+        m.group("message"),
+    )
+
+
+class DiagnosticCollector:
+    """Running counts, a bounded preview and optional on-disk spill files.
+    `parse` turns one output line into a Diagnostic or None."""
+
+    def __init__(self, raw_path=None, records_path=None, preview_size: int = 10, parse=None):
+        self.parse = parse or parse_line
+        self.count = 0
+        self.by_code = Counter()
+        self.by_file = Counter()
+        self.preview = []
+        self.preview_size = preview_size
+        # Set when the run was stopped early and the counts are a lower bound
+        self.truncated = False
+        self.raw = open(raw_path, "w", encoding="utf-8") if raw_path else None
+        self.records = open(records_path, "w", encoding="utf-8") if records_path else None
+
+    def feed(self, line: str):
+        """Consume one output line. Returns its Diagnostic, if any."""
+        if self.raw:
+            self.raw.write(line if line.endswith("\n") else line + "\n")
+        diag = self.parse(line)
+        if diag is None:
+            return None
+        self.count += 1
+        self.by_code[diag.code] += 1
+        self.by_file[diag.file] += 1
+        if len(self.preview) < self.preview_size:
+            self.preview.append(line.rstrip("\n"))
+        if self.records:
+            self.records.write(json.dumps(diag._asdict(), separators=(",", ":")) + "\n")
+        return diag
+
+    def close(self) -> None:
+        for f in (self.raw, self.records):
+            if f:
+                f.close()
+
+
+def feed_file(path, collector: DiagnosticCollector) -> None:
+    """Replay saved output through a collector, line by line."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                collector.feed(line)
+    finally:
+        collector.close()
+
+
+def feed_text(text: str, collector: DiagnosticCollector) -> None:
+    for line in text.splitlines():
+        collector.feed(line)
+    collector.close()
+
+
+def run_streaming(cmd: str, cwd: str, collector: DiagnosticCollector, timeout=None, stop_when=None, on_start=None) -> tuple:
+    """Run a check command, feeding merged stdout/stderr to `collector` as it arrives.
+    Returns (returncode, elapsed, timed_out); on timeout the process group is
+    killed and returncode is None. `stop_when` is called after each diagnostic;
+    once it returns true the process group is killed and the collector is
+    marked truncated. `on_start` is called with the Popen, so another thread
+    can cancel the run with kill_tree()."""
+    started = time.monotonic()
+    proc = popen_group(
+        cmd,
+        cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    if on_start:
+        on_start(proc)
+    timed_out = False
+    timer = None
+    if timeout:
+        def expire():
+            nonlocal timed_out
+            timed_out = True
+            kill_tree(proc)
+
+        timer = threading.Timer(timeout, expire)
+        timer.start()
+    try:
+        for line in proc.stdout:
+            if collector.feed(line) and stop_when and stop_when():
+                collector.truncated = True
+                kill_tree(proc)
+                break
+        proc.wait()
+    finally:
+        proc.stdout.close()
+        if timer:
+            timer.cancel()
+        collector.close()
+    return (None if timed_out else proc.returncode, time.monotonic() - started, timed_out)
@@ -0,0 +1,96 @@
+"""
+Rolling per-session digest for the compaction handoff.
+The UserPromptSubmit and PostToolUse hooks fold each event into a small
+JSON file of bounded ring buffers (recent requests, recently edited files,
+latest todo status) at <project>/.claude/session-digest/<session_id>.json.
+pre-compact-handoff.py only has to serialize it, so the handoff costs the
+same however long the session is.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+from hooklib.locking import locked
+
+DIGEST_VERSION = 1
+MAX_REQUESTS = 10
+MAX_FILES = 30
+MAX_TODOS = 20
+
+
+def digest_path(project_dir, session_id: str) -> Path:
+    return Path(project_dir) / ".claude" / "session-digest" / f"{session_id}.json"
+
+
+def empty() -> dict:
+    return {
+        "version": DIGEST_VERSION,
+        "requests": [],
+        "files": [],
+        "todos": {"in_progress": [], "pending": [], "completed": []},
+        "updated": 0,
+    }
+
+
+def _read(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == DIGEST_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return empty()
+
+
+def load(project_dir, session_id: str):
+    """The session's digest, or None if no event has been recorded yet."""
+    path = digest_path(project_dir, session_id)
+    return _read(path) if path.exists() else None
+
+
+def _update(project_dir, session_id: str, mutate) -> None:
+    """Apply `mutate` to the digest under its lock and replace the file atomically."""
+    path = digest_path(project_dir, session_id)
+    try:
+        with locked(path):
+            data = _read(path)
+            mutate(data)
+            data["updated"] = int(time.time())
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def _push(ring: list, item, size: int) -> None:
+    """Append to a ring buffer, moving an existing equal item to the end."""
+    if item in ring:
+        ring.remove(item)
+    ring.append(item)
+    del ring[:-size]
+
+
+def record_request(project_dir, session_id: str, prompt: str) -> None:
+    """Remember a user request (long pastes are not requests worth keeping)."""
+    prompt = prompt.strip()
+    if prompt and len(prompt) < 500:
+        _update(project_dir, session_id, lambda d: _push(d["requests"], prompt[:200], MAX_REQUESTS))
+
+
+def record_edit(project_dir, session_id: str, tool_name: str, file_path: str) -> None:
+    _update(project_dir, session_id, lambda d: _push(d["files"], f"{tool_name} {file_path}", MAX_FILES))
+
+
+def record_todos(project_dir, session_id: str, todos: list) -> None:
+    """Replace the todo status with the latest TodoWrite list."""
+    def mutate(data):
+        status = {"in_progress": [], "pending": [], "completed": []}
+        for todo in todos:
+            bucket = status.get(todo.get("status"))
+            if bucket is not None and len(bucket) < MAX_TODOS:
+                bucket.append(str(todo.get("content", ""))[:200])
+        data["todos"] = status
+
+    _update(project_dir, session_id, mutate)
@@ -0,0 +1,218 @@
+"""
+Project discovery index: per-repo toolchain facts for the edit hooks.
+The project is scanned once and the facts (package manager, build script,
+tsconfig variants, Prisma schema, and the Python, Cargo and .NET project
+files hooklib.checkers needs) are kept in .claude/tsc-cache/discovery.json.
+An entry is trusted while the mtimes of the repo dir, package.json,
+tsconfig.json, prisma/, pyproject.toml and setup.cfg are unchanged; adding
+or removing a lockfile or config file changes the repo dir's mtime. Within
+one process, facts checked in the last DISCOVERY_TTL seconds are reused
+without touching the filesystem at all.
+"""
+import json
+import os
+import time
+from pathlib import Path
+
+INDEX_VERSION = 2
+TSCONFIG_VARIANTS = ("tsconfig.json", "tsconfig.app.json", "tsconfig.build.json", "tsconfig.src.json")
+# Files that make a directory a Python project
+PYTHON_MARKERS = ("pyproject.toml", "setup.py", "setup.cfg", "pyrightconfig.json", "mypy.ini", ".mypy.ini")
+# Lockfile -> package manager, in detection priority order
+LOCKFILES = (("pnpm-lock.yaml", "pnpm"), ("package-lock.json", "npm"), ("yarn.lock", "yarn"))
+# Directories whose children are scanned as packages
+PACKAGE_PARENTS = ("packages", "apps", "examples", "services", "libs")
+
+
+def ttl_seconds() -> float:
+    """Seconds a probed repo's facts are reused without a stat, read per call
+    so hooks in the resident host follow the event's environment."""
+    return float(os.environ.get("DISCOVERY_TTL", "2"))
+
+
+# (project_dir, repo) -> (checked at, facts); project_dir -> (index file mtime, index)
+_memo = {}
+_indexes = {}
+
+
+def index_path(project_dir) -> Path:
+    return Path(project_dir) / ".claude" / "tsc-cache" / "discovery.json"
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _stamp(repo_path: str) -> list:
+    return [
+        _mtime(repo_path),
+        _mtime(os.path.join(repo_path, "package.json")),
+        _mtime(os.path.join(repo_path, "tsconfig.json")),
+        _mtime(os.path.join(repo_path, "prisma")),
+        _mtime(os.path.join(repo_path, "pyproject.toml")),
+        _mtime(os.path.join(repo_path, "setup.cfg")),
+    ]
+
+
+def probe(repo_path: str) -> dict:
+    """Collect a repo's toolchain facts with one directory listing."""
+    try:
+        names = {entry.name for entry in os.scandir(repo_path)}
+    except OSError:
+        names = set()
+    facts = {
+        "package_json": "package.json" in names,
+        "build_script": False,
+        "package_manager": next((pm for lock, pm in LOCKFILES if lock in names), ""),
+        "tsconfigs": [name for name in TSCONFIG_VARIANTS if name in names],
+        "tsconfig_references": False,
+        "prisma_schema": "schema.prisma" in names
+        or ("prisma" in names and os.path.exists(os.path.join(repo_path, "prisma", "schema.prisma"))),
+        "python_project": any(name in names for name in PYTHON_MARKERS),
+        "python_checker": _python_checker(repo_path, names),
+        "cargo": "Cargo.toml" in names,
+        # A solution file is preferred over a single project file
+        "dotnet_project": (sorted(n for n in names if n.endswith(".sln"))
+                           + sorted(n for n in names if n.endswith(".csproj")) + [""])[0],
+    }
+    if facts["package_json"]:
+        try:
+            with open(os.path.join(repo_path, "package.json"), encoding="utf-8") as f:
+                facts["build_script"] = "build" in json.load(f).get("scripts", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+    if "tsconfig.json" in names:
+        try:
+            with open(os.path.join(repo_path, "tsconfig.json"), encoding="utf-8") as f:
+                facts["tsconfig_references"] = '"references"' in f.read()
+        except OSError:
+            pass
+    return facts
+
+
+def _python_checker(repo_path: str, names: set) -> str:
+    """"pyright" or "mypy" when the repo configures one, else ""."""
+    if "pyrightconfig.json" in names:
+        return "pyright"
+    if "mypy.ini" in names or ".mypy.ini" in names:
+        return "mypy"
+    texts = {}
+    for name in ("pyproject.toml", "setup.cfg"):
+        if name in names:
+            try:
+                with open(os.path.join(repo_path, name), encoding="utf-8") as f:
+                    texts[name] = f.read()
+            except OSError:
+                pass
+    if "[tool.pyright]" in texts.get("pyproject.toml", ""):
+        return "pyright"
+    if "[tool.mypy]" in texts.get("pyproject.toml", "") or "[mypy]" in texts.get("setup.cfg", ""):
+        return "mypy"
+    return ""
+
+
+def _load(project_dir: str) -> dict:
+    # Another process (or a cache cleanup) may have rewritten or removed the file
+    mtime = _mtime(str(index_path(project_dir)))
+    cached = _indexes.get(project_dir)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    try:
+        index = json.loads(index_path(project_dir).read_text())
+        if index.get("version") != INDEX_VERSION:
+            raise ValueError("stale index")
+    except (OSError, ValueError):
+        index = scan(project_dir)
+    _indexes[project_dir] = (_mtime(str(index_path(project_dir))), index)
+    return index
+
+
+def _save(project_dir: str, index: dict) -> None:
+    path = index_path(project_dir)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index))
+        os.replace(tmp, path)
+        _indexes[project_dir] = (_mtime(str(path)), index)
+    except OSError:
+        pass
+
+
+def scan(project_dir: str) -> dict:
+    """Probe every top-level dir and package under PACKAGE_PARENTS once."""
+    index = {"version": INDEX_VERSION, "repos": {}}
+    candidates = []
+    try:
+        for entry in os.scandir(project_dir):
+            if entry.is_dir() and not entry.name.startswith(".") and entry.name != "node_modules":
+                candidates.append(entry.name)
+                if entry.name in PACKAGE_PARENTS:
+                    candidates += [f"{entry.name}/{child.name}" for child in os.scandir(entry.path) if child.is_dir()]
+    except OSError:
+        pass
+    for repo in candidates:
+        repo_path = os.path.join(project_dir, repo)
+        facts = probe(repo_path)
+        if facts["package_json"] or facts["tsconfigs"] or facts["python_project"] or facts["cargo"] or facts["dotnet_project"]:
+            index["repos"][repo] = {"stamp": _stamp(repo_path), "facts": facts}
+    _save(project_dir, index)
+    return index
+
+
+def repo_facts(project_dir, repo: str) -> dict:
+    """Return cached toolchain facts for a repo, re-probing only if it changed."""
+    project_dir = str(project_dir)
+    key = (project_dir, repo)
+    now = time.monotonic()
+    memo = _memo.get(key)
+    if memo and now - memo[0] < ttl_seconds():
+        return memo[1]
+
+    index = _load(project_dir)
+    repo_path = os.path.join(project_dir, repo)
+    stamp = _stamp(repo_path)
+    entry = index["repos"].get(repo)
+    if not entry or entry["stamp"] != stamp:
+        entry = {"stamp": stamp, "facts": probe(repo_path)}
+        index["repos"][repo] = entry
+        _save(project_dir, index)
+    _memo[key] = (now, entry["facts"])
+    return entry["facts"]
+
+
+def tsc_command(facts: dict) -> str:
+    """The tsc invocation for a repo, run from the repo dir, or "" without a tsconfig."""
+    tsconfigs = facts["tsconfigs"]
+    if not tsconfigs:
+        return ""
+    if "tsconfig.app.json" in tsconfigs:
+        return "npx tsc --project tsconfig.app.json --noEmit"
+    if "tsconfig.build.json" in tsconfigs:
+        return "npx tsc --project tsconfig.build.json --noEmit"
+    if "tsconfig.json" in tsconfigs and facts["tsconfig_references"]:
+        if "tsconfig.src.json" in tsconfigs:
+            return "npx tsc --project tsconfig.src.json --noEmit"
+        return "npx tsc --build --noEmit"
+    return "npx tsc --noEmit"
+
+
+def build_command(facts: dict, repo: str) -> str:
+    """The build invocation for a repo, run from the repo dir, or ""."""
+    if facts["build_script"]:
+        return {"pnpm": "pnpm build", "yarn": "yarn build"}.get(facts["package_manager"], "npm run build")
+    if "prisma" in repo or repo == "database":
+        if facts["prisma_schema"]:
+            return "npx prisma generate"
+    return ""
+
+
+def repo_tsc_command(project_dir, repo: str) -> str:
+    """`cd <repo> && <tsc>` for repos with a tsconfig.json, else ""."""
+    facts = repo_facts(project_dir, repo)
+    if "tsconfig.json" not in facts["tsconfigs"]:
+        return ""
+    return f"cd {Path(project_dir) / repo} && {tsc_command(facts)}"
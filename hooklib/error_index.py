@@ -0,0 +1,196 @@
+"""
+Indexed diagnostics for the auto-error-resolver.
+When a check fails, its parsed diagnostics (the collector's .jsonl records)
+are loaded into errors.db, an SQLite file next to last-errors.txt. Each
+diagnostic is keyed by repo, project-relative file and error code, and
+identical errors (same code and message) share one row in `groups` with a
+count, so the resolver can ask for one file's errors, merged, instead of
+reading every repo's output. error-query.py is the command line for it.
+"""
+import json
+import os
+import sqlite3
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+DB_NAME = "errors.db"
+# Rows per executemany batch while loading, so memory stays flat
+BATCH = 5000
+
+# An error in one file, with every (line, column) it occurs at
+FileError = namedtuple("FileError", "code message locations")
+CodeCount = namedtuple("CodeCount", "code count messages")
+FileCount = namedtuple("FileCount", "file count distinct")
+# A distinct error: how often it occurs, in how many files, and where first
+Group = namedtuple("Group", "code message count files locations")
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE groups (id INTEGER PRIMARY KEY, code TEXT NOT NULL, message TEXT NOT NULL, count INTEGER NOT NULL);
+CREATE TABLE diagnostics (repo TEXT NOT NULL, kind TEXT NOT NULL, file TEXT NOT NULL,
+                          line INTEGER, col INTEGER, group_id INTEGER NOT NULL);
+"""
+# Built after the rows are in, which is faster than maintaining them per insert
+INDEXES = """
+CREATE INDEX diagnostics_file ON diagnostics (file, line, col);
+CREATE INDEX diagnostics_repo ON diagnostics (repo, file);
+CREATE INDEX diagnostics_group ON diagnostics (group_id);
+CREATE INDEX groups_code ON groups (code);
+"""
+
+
+def project_path(project_dir, repo: str, file: str) -> str:
+    """A diagnostic's file relative to the project root, with forward slashes.
+    Checkers run inside the repo, so relative paths are relative to it."""
+    if os.path.isabs(file):
+        path = os.path.relpath(file, project_dir)
+    else:
+        path = os.path.join(repo, file)
+    return os.path.normpath(path).replace("\\", "/")
+
+
+def build(db_path, project_dir, sources) -> int:
+    """Replace db_path with the diagnostics of `sources`, an iterable of
+    (repo, checker name, records path). Returns the number of diagnostics."""
+    db_path = Path(db_path)
+    tmp = db_path.with_name(f".{db_path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    group_ids = {}
+    paths = {}
+    total = 0
+    try:
+        # A scratch file until the rename: no journal, no fsync
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+        insert = "INSERT INTO diagnostics VALUES (?, ?, ?, ?, ?, ?)"
+        rows = []
+        for repo, kind, records in sources:
+            try:
+                f = open(records, encoding="utf-8", errors="replace")
+            except OSError:
+                continue
+            with f:
+                for line in f:
+                    try:
+                        diag = json.loads(line)
+                        key = (diag["code"], diag["message"])
+                        file = paths.get((repo, diag["file"]))
+                        if file is None:
+                            file = paths[(repo, diag["file"])] = project_path(project_dir, repo, diag["file"])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    group = group_ids.get(key)
+                    if group is None:
+                        group = group_ids[key] = [len(group_ids) + 1, 0]
+                    group[1] += 1
+                    rows.append((repo, kind, file, diag.get("line"), diag.get("column"), group[0]))
+                    if len(rows) >= BATCH:
+                        conn.executemany(insert, rows)
+                        total += len(rows)
+                        rows = []
+        conn.executemany(insert, rows)
+        total += len(rows)
+        conn.executemany("INSERT INTO groups VALUES (?, ?, ?, ?)",
+                         ((gid, code, message, count) for (code, message), (gid, count) in group_ids.items()))
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [("project_dir", str(project_dir))])
+        conn.executescript(INDEXES)
+        conn.commit()
+    except BaseException:
+        conn.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp, db_path)
+    return total
+
+
+def connect(db_path) -> sqlite3.Connection:
+    """Open an index read-only."""
+    return sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+
+
+def latest(*cache_roots):
+    """The most recently built errors.db in any session dir under the roots, or None."""
+    found = []
+    for root in cache_roots:
+        for path in Path(root).glob(f"*/{DB_NAME}"):
+            try:
+                found.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+    return max(found)[1] if found else None
+
+
+def indexed_project(conn: sqlite3.Connection):
+    """The project directory the index was built for."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'project_dir'").fetchone()
+    return row[0] if row else None
+
+
+def match_files(conn: sqlite3.Connection, path: str) -> list:
+    """Stored files matching `path`: project-relative or absolute paths match
+    exactly, anything else (a repo-relative path, a bare name) as a suffix."""
+    path = path.replace("\\", "/")
+    root = indexed_project(conn)
+    if root and os.path.isabs(path):
+        path = project_path(root, "", path)
+    exact = conn.execute("SELECT 1 FROM diagnostics WHERE file = ? LIMIT 1", (path,)).fetchone()
+    if exact:
+        return [path]
+    pattern = "%/" + path.replace("%", "\\%").replace("_", "\\_")
+    return [row[0] for row in conn.execute(
+        "SELECT DISTINCT file FROM diagnostics WHERE file LIKE ? ESCAPE '\\' ORDER BY file", (pattern,))]
+
+
+def file_errors(conn: sqlite3.Connection, file: str) -> list:
+    """FileErrors of one stored file, identical errors merged, in line order."""
+    merged = OrderedDict()
+    for code, message, line, col in conn.execute(
+            "SELECT g.code, g.message, d.line, d.col FROM diagnostics d JOIN groups g ON g.id = d.group_id "
+            "WHERE d.file = ? ORDER BY d.line, d.col", (file,)):
+        merged.setdefault((code, message), []).append((line, col))
+    return [FileError(code, message, locations) for (code, message), locations in merged.items()]
+
+
+def top_codes(conn: sqlite3.Connection, limit: int = 20) -> list:
+    """CodeCounts, most frequent first; `messages` counts distinct messages."""
+    return [CodeCount(*row) for row in conn.execute(
+        "SELECT code, SUM(count), COUNT(*) FROM groups GROUP BY code ORDER BY SUM(count) DESC, code LIMIT ?",
+        (limit,))]
+
+
+def files_by_count(conn: sqlite3.Connection, limit: int = 20, code=None) -> list:
+    """FileCounts, most errors first, optionally of one error code only."""
+    if code:
+        query = ("SELECT d.file, COUNT(*), COUNT(DISTINCT d.group_id) FROM diagnostics d "
+                 "JOIN groups g ON g.id = d.group_id WHERE g.code = ? "
+                 "GROUP BY d.file ORDER BY COUNT(*) DESC, d.file LIMIT ?")
+        args = (code, limit)
+    else:
+        query = ("SELECT file, COUNT(*), COUNT(DISTINCT group_id) FROM diagnostics "
+                 "GROUP BY file ORDER BY COUNT(*) DESC, file LIMIT ?")
+        args = (limit,)
+    return [FileCount(*row) for row in conn.execute(query, args)]
+
+
+def groups(conn: sqlite3.Connection, limit: int = 20, code=None, examples: int = 3) -> list:
+    """Distinct errors, most frequent first, each with up to `examples`
+    (file, line) locations."""
+    where, args = ("WHERE code = ?", (code, limit)) if code else ("", (limit,))
+    rows = conn.execute(f"SELECT id, code, message, count FROM groups {where} ORDER BY count DESC, id LIMIT ?",
+                        args).fetchall()
+    found = []
+    for gid, *group in rows:
+        files = conn.execute("SELECT COUNT(DISTINCT file) FROM diagnostics WHERE group_id = ?", (gid,)).fetchone()[0]
+        locations = conn.execute("SELECT file, line FROM diagnostics WHERE group_id = ? ORDER BY file, line LIMIT ?",
+                                 (gid, examples)).fetchall()
+        found.append(Group(*group, files, locations))
+    return found
+
+
+def totals(conn: sqlite3.Connection) -> tuple:
+    """(diagnostics, distinct errors, files)."""
+    count, files = conn.execute("SELECT COUNT(*), COUNT(DISTINCT file) FROM diagnostics").fetchone()
+    return (count, conn.execute("SELECT COUNT(*) FROM groups").fetchone()[0], files)
@@ -0,0 +1,207 @@
+"""
+Resident hook host.
+Loads the Python hook scripts once as compiled handlers and runs them for
+events forwarded by hook-client.py, so an event no longer pays interpreter
+startup, imports and module loading. Each handler sees the same stdin, argv,
+environment and working directory it would get when run directly, and its
+stdout, stderr and exit code are returned to the client unchanged.
+
+There is one host per user and handlers run one at a time, so only the short
+hooks are hosted: the Stop checks can run tsc for minutes and are run
+directly. An event that finds the host busy for longer than
+HOOK_HOST_QUEUE seconds (default 1) is sent back to run in its client.
+"""
+import builtins
+import io
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from hooklib import ipc
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+
+# Hook name (as passed to hook-client.py) -> script. The Stop hooks are not
+# here: they hold the host for as long as their checks run
+HANDLERS = {
+    "improve-prompt": "improve-prompt.py",
+    "post-tool-use-tracker": "post-tool-use-tracker.py",
+    "taskmaster-sync": "taskmaster-sync.py",
+    "pre-compact-handoff": "pre-compact-handoff.py",
+}
+
+# Seconds without events before the host exits (0 = never)
+IDLE_SECONDS = float(os.environ.get("HOOK_HOST_IDLE", "28800"))
+
+
+def queue_seconds(env: dict) -> float:
+    """How long an event waits for the running handler before it is sent back."""
+    return float(env.get("HOOK_HOST_QUEUE", "1"))
+
+
+def host_dir() -> Path:
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "hook-host"
+
+
+def endpoint() -> tuple:
+    """Return (socket path, info file) of the host."""
+    return (host_dir() / "host.sock", host_dir() / "host.json")
+
+
+class Handler:
+    """One hook script compiled once; recompiled if the file changes."""
+
+    def __init__(self, script: Path):
+        self.script = script
+        self.mtime = None
+        self.code = None
+
+    def load(self):
+        mtime = self.script.stat().st_mtime_ns
+        if mtime != self.mtime:
+            self.code = compile(self.script.read_bytes(), str(self.script), "exec")
+            self.mtime = mtime
+        return self.code
+
+    def run(self, stdin: bytes, env: dict, cwd: str) -> tuple:
+        """Run the script as __main__. Returns (exit code, stdout, stderr)."""
+        stdout = io.StringIO(newline="\n")
+        stderr = io.StringIO(newline="\n")
+        saved = (sys.stdin, sys.stdout, sys.stderr, sys.argv, dict(os.environ), os.getcwd())
+        sys.stdin = io.TextIOWrapper(io.BytesIO(stdin), encoding="utf-8")
+        sys.stdout, sys.stderr = stdout, stderr
+        sys.argv = [str(self.script)]
+        os.environ.clear()
+        os.environ.update(env)
+        code = 0
+        try:
+            os.chdir(cwd)
+            exec(self.load(), {"__name__": "__main__", "__file__": str(self.script), "__builtins__": builtins})
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdin, sys.stdout, sys.stderr, sys.argv = saved[:4]
+            os.environ.clear()
+            os.environ.update(saved[4])
+            os.chdir(saved[5])
+        return (code, stdout.getvalue(), stderr.getvalue())
+
+
+def serve() -> int:
+    """Answer hook events until idle or stopped."""
+    import socketserver
+
+    sock_path, info_file = endpoint()
+    handlers = {name: Handler(HOOKS_DIR / script) for name, script in HANDLERS.items()}
+    # Handlers swap process-wide state (std streams, env, cwd), so run one at a time
+    run_lock = threading.Lock()
+    last_event = [time.time()]
+
+    class Connection(socketserver.StreamRequestHandler):
+        def handle(self):
+            last_event[0] = time.time()
+            try:
+                header = decode_header(ipc.recv_frame(self.rfile))
+                stdin = ipc.recv_frame(self.rfile)
+            except (EOFError, ValueError):
+                return
+            op = header["op"]
+            if op == "status":
+                reply = {"ok": True, "pid": os.getpid(), "hooks": sorted(handlers)}
+                ipc.send_frame(self.connection, json.dumps(reply).encode())
+                return
+            if op == "stop":
+                ipc.send_frame(self.connection, json.dumps({"ok": True}).encode())
+                threading.Thread(target=server.shutdown, daemon=True).start()
+                return
+            handler = handlers.get(header["hook"])
+            if handler is None:
+                ipc.send_frame(self.connection, b"unknown hook")
+                return
+            # Rather than queue behind another event, let the client run it
+            if not run_lock.acquire(timeout=queue_seconds(header["env"])):
+                ipc.send_frame(self.connection, b"busy")
+                return
+            try:
+                ipc.send_frame(self.connection, b"run")
+                code, out, err = handler.run(stdin, header["env"], header["cwd"] or os.getcwd())
+            finally:
+                run_lock.release()
+            ipc.send_frame(self.connection, str(code).encode())
+            ipc.send_frame(self.connection, out.encode("utf-8"))
+            ipc.send_frame(self.connection, err.encode("utf-8", "replace"))
+
+    server = ipc.make_server(sock_path, info_file, Connection, {})
+    if not ipc.USE_UNIX:
+        # Plain-text port for hook-client.py, which avoids importing json
+        (host_dir() / "host.port").write_text(str(server.server_address[1]))
+
+    def watchdog():
+        while not IDLE_SECONDS or time.time() - last_event[0] < IDLE_SECONDS:
+            time.sleep(30)
+        server.shutdown()
+
+    threading.Thread(target=watchdog, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        ipc.remove_endpoint(sock_path, info_file)
+        try:
+            (host_dir() / "host.port").unlink()
+        except OSError:
+            pass
+    return 0
+
+
+def encode_header(op: str, hook: str = "", cwd: str = "", env=None) -> bytes:
+    """Header frame: NUL-separated op, hook, cwd, then KEY=VALUE env pairs.
+    Kept json-free so hook-client.py starts without importing json."""
+    fields = [op, hook, cwd] + [f"{k}={v}" for k, v in (env or {}).items()]
+    return "\0".join(fields).encode("utf-8", "surrogateescape")
+
+
+def decode_header(data: bytes) -> dict:
+    fields = data.decode("utf-8", "surrogateescape").split("\0")
+    if len(fields) < 3:
+        raise ValueError("bad header")
+    env = dict(f.split("=", 1) for f in fields[3:] if "=" in f)
+    return {"op": fields[0], "hook": fields[1], "cwd": fields[2], "env": env}
+
+
+def call(op: str, hook: str = "", stdin: bytes = b"", env=None, cwd: str = "", timeout: float = 600.0):
+    """Send one request to the host. Returns None when the host is not running
+    (or, for run, did not take the event). status/stop return the decoded
+    reply; run returns (exit code, stdout, stderr)."""
+    sock_path, info_file = endpoint()
+    try:
+        with ipc.connect(sock_path, info_file, timeout) as conn:
+            ipc.send_frame(conn, encode_header(op, hook, cwd, env))
+            ipc.send_frame(conn, stdin)
+            stream = conn.makefile("rb")
+            first = ipc.recv_frame(stream)
+            if op != "run":
+                return json.loads(first)
+            if first != b"run":
+                return None
+            return (int(ipc.recv_frame(stream)), ipc.recv_frame(stream), ipc.recv_frame(stream))
+    except (OSError, ValueError, KeyError, EOFError):
+        return None
+
+
+def spawn() -> None:
+    ipc.spawn_detached([str(HOOKS_DIR / "hook-host.py"), "serve"], host_dir() / "host.log")
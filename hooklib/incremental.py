@@ -0,0 +1,261 @@
+"""
+Incremental type-checks through tsc's build-info file.
+With TSC_INCREMENTAL=1 a one-shot `tsc --noEmit` gets `--incremental
+--tsBuildInfoFile <file>`, where the file lives under
+.claude/tsc-cache/buildinfo/<scope>/ and the scope is the current git branch
+(TSC_INCREMENTAL_SCOPE=session keys it by session instead). tsc then only
+re-checks what changed since the last run in that scope.
+
+tsc runs against a private copy of the build info, which replaces the shared
+file only when the run completed, so a killed or concurrent run never leaves
+a truncated file behind. Comparing the file before and after gives the
+number of files tsc re-checked.
+
+`tsc --build` keeps its build info next to each referenced project's output
+(tsBuildInfoFile, or outDir/<config>.tsbuildinfo) and has no option to move
+it, so build-mode commands run as they are and are not scoped: the build info
+of the root project and every project it references, transitively, is read
+before and after the run for the re-checked count.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from hooklib.project_graph import load_jsonc
+
+
+def max_age_days() -> float:
+    """Scope directories unused for this many days are removed by cleanup()."""
+    return float(os.environ.get("TSC_BUILDINFO_MAX_AGE_DAYS", "14"))
+
+
+# Private copies older than this belong to crashed runs
+ORPHAN_SECONDS = 3600
+PRIVATE_COPY = re.compile(r"\.\d+-\d+\.tsbuildinfo$")
+
+
+def enabled() -> bool:
+    return os.environ.get("TSC_INCREMENTAL", "") == "1"
+
+
+def buildinfo_root(project_dir) -> Path:
+    return Path(project_dir) / ".claude" / "tsc-cache" / "buildinfo"
+
+
+def _git_branch(project_dir) -> str:
+    """Current branch read from .git/HEAD (worktrees included), or ""."""
+    path = Path(project_dir).resolve()
+    for parent in [path] + list(path.parents):
+        git = parent / ".git"
+        try:
+            if git.is_file():
+                git = (parent / git.read_text().split("gitdir:", 1)[1].strip()).resolve()
+            head = (git / "HEAD").read_text().strip()
+        except (OSError, IndexError):
+            continue
+        if head.startswith("ref: refs/heads/"):
+            return head[len("ref: refs/heads/"):]
+        return "detached"
+    return ""
+
+
+def scope(project_dir, session_id: str) -> str:
+    """Directory name the build info is kept under."""
+    name = ""
+    if os.environ.get("TSC_INCREMENTAL_SCOPE", "branch") != "session":
+        name = _git_branch(project_dir)
+        name = f"branch-{name}" if name else ""
+    name = name or f"session-{session_id or 'default'}"
+    return re.sub(r"[^\w.-]", "_", name)
+
+
+def is_build_mode(cmd: str) -> bool:
+    return bool(re.search(r"(?:^|\s)(?:--build|-b)(?:\s|$)", cmd.split("&&")[-1]))
+
+
+def is_tsc(cmd: str) -> bool:
+    return bool(re.search(r"(?:^|\s)tsc(?:\s|$)", cmd.split("&&")[-1]))
+
+
+def _config_path(path: Path) -> Path:
+    return path / "tsconfig.json" if path.is_dir() or path.suffix != ".json" else path
+
+
+def _compiler_options(config: Path, depth: int = 0) -> tuple:
+    """(compilerOptions with extends applied, references) of a tsconfig. Path
+    options are made absolute against the config that sets them; only
+    relative `extends` are followed."""
+    try:
+        data = load_jsonc(config.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return ({}, [])
+    if not isinstance(data, dict):
+        return ({}, [])
+    options = {}
+    base = data.get("extends")
+    if isinstance(base, str) and base.startswith(".") and depth < 8:
+        base_path = config.parent / base
+        if not base_path.suffix:
+            base_path = base_path.with_suffix(".json")
+        options.update(_compiler_options(base_path, depth + 1)[0])
+    for key, value in (data.get("compilerOptions") or {}).items():
+        if key in ("tsBuildInfoFile", "outDir", "outFile", "rootDir") and isinstance(value, str):
+            value = str((config.parent / value).resolve())
+        options[key] = value
+    return (options, data.get("references") or [])
+
+
+def buildinfo_path(config: Path, options: dict) -> Path:
+    """Where tsc writes a project's build info, following tsc's own rules."""
+    if options.get("tsBuildInfoFile"):
+        return Path(options["tsBuildInfoFile"])
+    if options.get("outFile"):
+        return Path(options["outFile"]).with_suffix(".tsbuildinfo")
+    name = f"{config.stem}.tsbuildinfo"
+    if not options.get("outDir"):
+        return config.parent / name
+    out_dir = Path(options["outDir"])
+    if options.get("rootDir"):
+        out_dir = out_dir / os.path.relpath(config.parent.resolve(), options["rootDir"])
+    return out_dir / name
+
+
+def build_buildinfo_files(repo_path, cmd: str) -> list:
+    """Build-info files of a `tsc --build` command's projects and every project
+    they reference, transitively."""
+    args = cmd.split("&&")[-1].split()
+    start = next((i for i, a in enumerate(args) if a in ("--build", "-b")), len(args)) + 1
+    roots = [a for a in args[start:] if not a.startswith("-")] or ["tsconfig.json"]
+    pending = [_config_path(Path(repo_path) / root).resolve() for root in roots]
+    seen, files = set(), []
+    while pending:
+        config = pending.pop()
+        if config in seen:
+            continue
+        seen.add(config)
+        options, refs = _compiler_options(config)
+        files.append(buildinfo_path(config, options))
+        for ref in refs:
+            if isinstance(ref, dict) and isinstance(ref.get("path"), str):
+                pending.append(_config_path(config.parent / ref["path"]).resolve())
+    return files
+
+
+def read_buildinfo(path) -> dict:
+    """file name -> (version, signature, direct imports) from a .tsbuildinfo,
+    or {}. Handles both the 4.x layout (fileInfos and referencedMap keyed by
+    name) and the 5.x one (fileNames plus id-based fileInfos/referencedMap)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    program = data.get("program", data)
+    names = program.get("fileNames", [])
+    infos = program.get("fileInfos") or {}
+    refs = program.get("referencedMap") or {}
+    if isinstance(infos, dict):
+        items = infos.items()
+    else:
+        items = zip(names, infos)
+    if isinstance(refs, dict):
+        imports = refs
+    else:
+        # [[file id, list id], ...] with 1-based ids into fileNames / fileIdsList
+        lists = program.get("fileIdsList", [])
+        imports = {}
+        for pair in refs:
+            try:
+                imports[names[pair[0] - 1]] = [names[i - 1] for i in lists[pair[1] - 1]]
+            except (IndexError, TypeError):
+                continue
+    files = {}
+    for name, info in items:
+        if isinstance(info, dict):
+            version = info.get("version", "")
+            signature = info.get("signature", version)
+        else:
+            version = signature = str(info)
+        files[name] = (version, signature, imports.get(name, ()))
+    return files
+
+
+def rechecked_files(before: dict, after: dict) -> int:
+    """Files tsc had to check again: new or changed ones, and the importers of
+    every file whose declaration signature changed."""
+    changed = {name for name, info in after.items() if name not in before or before[name][0] != info[0]}
+    new_shape = {name for name in changed if name not in before or before[name][1] != after[name][1]}
+    importers = {name for name, info in after.items() if new_shape.intersection(info[2])}
+    return len(changed | importers)
+
+
+class IncrementalRun:
+    """One tsc run with a build-info file.
+    `command` is what to run; finish() publishes the build info and returns
+    (rechecked files, total files), or None when nothing could be measured.
+    A build-mode run keeps tsc's own build info and is only measured."""
+
+    def __init__(self, project_dir, repo: str, cmd: str, session_id: str = ""):
+        self.command = cmd
+        self.target = self.work = None
+        self.before = {}
+        self.build_files = []
+        if not enabled() or not is_tsc(cmd):
+            return
+        if is_build_mode(cmd):
+            self.build_files = build_buildinfo_files(Path(project_dir) / repo, cmd)
+            self.before = {path: read_buildinfo(path) for path in self.build_files}
+            return
+        scope_dir = buildinfo_root(project_dir) / scope(project_dir, session_id)
+        self.target = scope_dir / f"{repo.replace('/', '__') or 'root'}.tsbuildinfo"
+        self.work = self.target.with_name(f"{self.target.stem}.{os.getpid()}-{threading.get_ident()}.tsbuildinfo")
+        scope_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            shutil.copyfile(self.target, self.work)
+            self.before = read_buildinfo(self.work)
+        except OSError:
+            pass
+        os.utime(scope_dir)  # mark the scope as recently used for cleanup()
+        self.command = f'{cmd} --incremental --tsBuildInfoFile "{self.work}"'
+
+    def finish(self, completed: bool):
+        if self.build_files:
+            if not completed:
+                return None
+            counts = [(rechecked_files(self.before[path], after), len(after))
+                      for path, after in ((path, read_buildinfo(path)) for path in self.build_files)]
+            return (sum(r for r, _ in counts), sum(t for _, t in counts))
+        if self.work is None:
+            return None
+        try:
+            if not completed or not self.work.exists():
+                return None
+            after = read_buildinfo(self.work)
+            os.replace(self.work, self.target)
+        finally:
+            self.work.unlink(missing_ok=True)
+        return (rechecked_files(self.before, after), len(after))
+
+
+def cleanup(project_dir, keep=()) -> None:
+    """Remove scopes unused for max_age_days() and private copies left by crashed runs."""
+    root = buildinfo_root(project_dir)
+    now = time.time()
+    try:
+        scopes = list(root.iterdir())
+    except OSError:
+        return
+    for scope_dir in scopes:
+        try:
+            if scope_dir.name not in keep and now - scope_dir.stat().st_mtime > max_age_days() * 86400:
+                shutil.rmtree(scope_dir, ignore_errors=True)
+                continue
+            for orphan in scope_dir.glob("*.tsbuildinfo"):
+                if PRIVATE_COPY.search(orphan.name) and now - orphan.stat().st_mtime > ORPHAN_SECONDS:
+                    orphan.unlink()
+        except OSError:
+            continue
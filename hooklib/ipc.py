@@ -0,0 +1,87 @@
+"""
+Local socket plumbing shared by the resident hook servers.
+Uses a Unix socket where available and a loopback TCP port otherwise; an
+info file next to the socket tells clients which one to connect to.
+"""
+import json
+import os
+import socket
+import struct
+import subprocess
+import sys
+from pathlib import Path
+
+USE_UNIX = hasattr(socket, "AF_UNIX")
+
+
+def connect(sock_path: Path, info_file: Path, timeout: float) -> socket.socket:
+    """Connect to a server. Raises OSError/ValueError/KeyError if none is listening."""
+    info = json.loads(info_file.read_text())
+    if info.get("family") == "unix":
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = str(sock_path)
+    else:
+        conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", int(info["port"]))
+    conn.settimeout(timeout)
+    try:
+        conn.connect(address)
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def make_server(sock_path: Path, info_file: Path, handler, info: dict):
+    """Bind a threading server and publish its address in `info_file`."""
+    import socketserver
+
+    sock_path.parent.mkdir(parents=True, exist_ok=True)
+    if USE_UNIX:
+        if sock_path.exists():
+            sock_path.unlink()
+        server = socketserver.ThreadingUnixStreamServer(str(sock_path), handler)
+        info = dict(info, family="unix", path=str(sock_path))
+    else:
+        server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), handler)
+        info = dict(info, family="inet", port=server.server_address[1])
+    server.daemon_threads = True
+    info_file.write_text(json.dumps(dict(info, pid=os.getpid())))
+    return server
+
+
+def remove_endpoint(sock_path: Path, info_file: Path) -> None:
+    for path in (sock_path, info_file):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+def spawn_detached(args: list, log_path: Path) -> None:
+    """Start a background process that outlives the calling hook."""
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, "a") as log:
+        subprocess.Popen([sys.executable] + args, stdin=subprocess.DEVNULL, stdout=log, stderr=log, **kwargs)
+
+
+def send_frame(conn, data: bytes) -> None:
+    """Write one length-prefixed frame."""
+    conn.sendall(struct.pack(">I", len(data)) + data)
+
+
+def recv_frame(stream) -> bytes:
+    """Read one length-prefixed frame from a file-like socket stream."""
+    header = stream.read(4)
+    if len(header) < 4:
+        raise EOFError("connection closed")
+    (size,) = struct.unpack(">I", header)
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("connection closed")
+    return data
@@ -0,0 +1,171 @@
+"""
+Append-only per-session edit journal.
+post-tool-use-tracker.py appends one JSON record per edit to
+<session cache>/edits.jsonl; readers get "affected repos", "files per repo"
+and "commands per repo" from a small index that replays only the records
+appended since it was last saved.
+
+Framing: one JSON object per line. A record counts only once its trailing
+newline is on disk, so a torn write at the end of the file is skipped until
+it is complete, and an unparseable line is ignored.
+"""
+import json
+import os
+from pathlib import Path
+
+from hooklib.locking import locked
+
+JOURNAL_NAME = "edits.jsonl"
+INDEX_NAME = "edits.idx.json"
+# <reader>.mark: the journal offset a reader got to, for files_since_mark()
+MARK_SUFFIX = ".mark"
+
+# In-process indexes, keyed by journal path (reused by the resident hook host):
+# journal path -> (index file mtime, JournalIndex)
+_indexes = {}
+
+
+def fsync_policy() -> str:
+    """HOOK_JOURNAL_FSYNC: "never" (default, OS buffered) or "always"."""
+    return os.environ.get("HOOK_JOURNAL_FSYNC", "never")
+
+
+def append(cache_dir, record: dict) -> None:
+    """Append one record under the journal lock."""
+    path = Path(cache_dir) / JOURNAL_NAME
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    with locked(path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            if fsync_policy() == "always":
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class JournalIndex:
+    """Compact view of a journal: dict lookups for every question the Stop hook asks."""
+
+    def __init__(self, data=None):
+        data = data or {}
+        self.offset = data.get("offset", 0)
+        # Dicts keep first-seen order and give O(1) membership
+        self.repos = dict.fromkeys(data.get("repos", []))
+        self.files = {repo: dict.fromkeys(paths) for repo, paths in data.get("files", {}).items()}
+        self.commands = data.get("commands", {})
+
+    def add(self, record: dict) -> None:
+        repo = record.get("repo")
+        if not repo:
+            return
+        self.repos.setdefault(repo)
+        if record.get("file"):
+            self.files.setdefault(repo, {}).setdefault(record["file"])
+        for kind, cmd in record.get("commands", {}).items():
+            if cmd:
+                self.commands.setdefault(repo, {})[kind] = cmd
+
+    def affected_repos(self) -> list:
+        return list(self.repos)
+
+    def repo_files(self, repo: str) -> list:
+        return list(self.files.get(repo, ()))
+
+    def command(self, repo: str, kind: str) -> str:
+        return self.commands.get(repo, {}).get(kind, "")
+
+    def to_dict(self) -> dict:
+        return {
+            "offset": self.offset,
+            "repos": list(self.repos),
+            "files": {repo: list(paths) for repo, paths in self.files.items()},
+            "commands": self.commands,
+        }
+
+
+def _mtime(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def exists(cache_dir) -> bool:
+    return (Path(cache_dir) / JOURNAL_NAME).exists()
+
+
+def files_since_mark(cache_dir, reader: str) -> list:
+    """Files of the records appended since `reader` last called this, which
+    moves its mark to the end of the journal. A Stop hook uses it for the
+    edits of the turn that just ended."""
+    path = Path(cache_dir) / JOURNAL_NAME
+    mark_path = Path(cache_dir) / f"{reader}{MARK_SUFFIX}"
+    try:
+        offset = int(mark_path.read_text())
+    except (OSError, ValueError):
+        offset = 0
+    files = []
+    try:
+        with open(path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # journal was truncated or recreated
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # incomplete tail record
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get("file"):
+                    files.append(record["file"])
+        tmp = mark_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(str(offset))
+        os.replace(tmp, mark_path)
+    except OSError:
+        pass
+    return files
+
+
+def load_index(cache_dir) -> JournalIndex:
+    """Return the session's index, replaying only records appended since it was built."""
+    path = Path(cache_dir) / JOURNAL_NAME
+    index_path = Path(cache_dir) / INDEX_NAME
+    # The in-process copy is only good while the index file it was saved as
+    # is still there: a Stop cleanup removes the session dir, and a journal
+    # recreated there must be read from its start
+    cached = _indexes.get(str(path))
+    if cached is not None and cached[0] == _mtime(index_path):
+        index = cached[1]
+    else:
+        try:
+            index = JournalIndex(json.loads(index_path.read_text()))
+        except (OSError, ValueError):
+            index = JournalIndex()
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return index
+    if size < index.offset:
+        index = JournalIndex()  # journal was truncated or recreated
+    if size > index.offset:
+        with open(path, "rb") as f:
+            f.seek(index.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # incomplete tail record
+                index.offset += len(line)
+                try:
+                    record = json.loads(line)
+                    # Any JSON value parses; only objects are records
+                    if isinstance(record, dict):
+                        index.add(record)
+                except (ValueError, AttributeError, TypeError):
+                    continue
+        tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index.to_dict()))
+        os.replace(tmp, index_path)
+    _indexes[str(path)] = (_mtime(index_path), index)
+    return index
@@ -0,0 +1,54 @@
+"""
+Subprocess helpers for the check hooks.
+Commands run in their own process group so a timeout kills the whole
+`npx tsc` tree, not just the shell that started it.
+"""
+import os
+import signal
+import subprocess
+import time
+
+
+def popen_group(cmd: str, cwd: str, **kwargs) -> subprocess.Popen:
+    """Start a shell command as the leader of a new process group."""
+    if os.name == "nt":
+        kwargs.setdefault("creationflags", subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        kwargs.setdefault("start_new_session", True)
+    return subprocess.Popen(cmd, shell=True, cwd=cwd, **kwargs)
+
+
+def kill_tree(proc: subprocess.Popen) -> None:
+    """Kill a process started by popen_group() and all of its children."""
+    if proc.poll() is not None:
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def run_command(cmd: str, cwd: str, timeout=None) -> tuple:
+    """Run a shell command. Returns (returncode, output, elapsed, timed_out).
+    On timeout the process group is killed and returncode is None."""
+    started = time.monotonic()
+    proc = popen_group(
+        cmd,
+        cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        kill_tree(proc)
+        stdout, stderr = proc.communicate()
+        return (None, stdout + stderr, time.monotonic() - started, True)
+    return (proc.returncode, stdout + stderr, time.monotonic() - started, False)
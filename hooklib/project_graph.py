@@ -0,0 +1,261 @@
+"""
+Workspace dependency graph: which projects need checking after an edit.
+Projects are the workspace packages declared in the root package.json
+(`workspaces`) or pnpm-workspace.yaml; without either, every top-level dir
+(and package under packages/, apps/, ...) that has a package.json or
+tsconfig.json. Edges come from workspace dependencies in package.json and
+from tsconfig `references`.
+
+The graph is cached in .claude/tsc-cache/project-graph.json. Only manifests
+whose mtimes changed are re-parsed, and workspace globs are re-expanded only
+when the root manifests or a workspace parent dir change.
+"""
+import glob
+import heapq
+import json
+import os
+import re
+import time
+from collections import deque
+from pathlib import Path
+
+from hooklib import discovery
+
+GRAPH_VERSION = 2
+DEP_FIELDS = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+
+# project_dir -> (checked at, ProjectGraph)
+_memo = {}
+
+
+def graph_path(project_dir) -> Path:
+    return Path(project_dir) / ".claude" / "tsc-cache" / "project-graph.json"
+
+
+def _mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def load_jsonc(text: str):
+    """Parse tsconfig-style JSON: comments and trailing commas allowed."""
+    out, i, n, in_str = [], 0, len(text), False
+    while i < n:
+        c = text[i]
+        if in_str:
+            out.append(c)
+            if c == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 1
+            elif c == '"':
+                in_str = False
+        elif c == '"':
+            in_str = True
+            out.append(c)
+        elif text.startswith("//", i):
+            i = text.find("\n", i)
+            if i < 0:
+                break
+            continue
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end < 0 else end + 2
+            continue
+        else:
+            out.append(c)
+        i += 1
+    return json.loads(re.sub(r",(\s*[}\]])", r"\1", "".join(out)))
+
+
+def _workspace_patterns(project_dir: str) -> list:
+    patterns = []
+    try:
+        with open(os.path.join(project_dir, "package.json"), encoding="utf-8") as f:
+            workspaces = json.load(f).get("workspaces", [])
+        if isinstance(workspaces, dict):
+            workspaces = workspaces.get("packages", [])
+        patterns += [p for p in workspaces if isinstance(p, str)]
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        with open(os.path.join(project_dir, "pnpm-workspace.yaml"), encoding="utf-8") as f:
+            in_packages = False
+            for line in f:
+                if re.match(r"^packages\s*:", line):
+                    in_packages = True
+                elif in_packages and re.match(r"^\s*-\s*", line):
+                    patterns.append(line.split("-", 1)[1].strip().strip("'\""))
+                elif in_packages and line.strip() and not line.startswith((" ", "\t", "#")):
+                    in_packages = False
+    except OSError:
+        pass
+    return patterns
+
+
+def _expand(project_dir: str, patterns: list) -> list:
+    """Expand workspace globs to project dirs relative to project_dir.
+    Without workspaces, the scanned JS/TS repos (discovery also finds
+    Python, Cargo and .NET ones, which are not part of this graph)."""
+    if not patterns:
+        index = discovery.scan(project_dir)
+        return sorted(repo for repo, entry in index["repos"].items()
+                      if entry["facts"]["tsconfigs"] or entry["facts"]["package_json"])
+    include, exclude = set(), set()
+    for pattern in patterns:
+        target = exclude if pattern.startswith("!") else include
+        pattern = pattern.lstrip("!").rstrip("/")
+        for match in glob.glob(os.path.join(project_dir, pattern), recursive=True):
+            if os.path.isfile(os.path.join(match, "package.json")) and "node_modules" not in match:
+                target.add(os.path.relpath(match, project_dir).replace("\\", "/"))
+    return sorted(include - exclude)
+
+
+def _layout_stamp(project_dir: str, patterns: list) -> list:
+    """mtimes that change when workspace membership can change."""
+    paths = [os.path.join(project_dir, name) for name in ("package.json", "pnpm-workspace.yaml")]
+    parents = {pattern.lstrip("!").split("*")[0].rstrip("/") for pattern in patterns} or {""}
+    parents |= set(discovery.PACKAGE_PARENTS)
+    paths += [os.path.join(project_dir, parent) for parent in sorted(parents)]
+    return [_mtime(p) for p in paths]
+
+
+def _parse_project(project_dir: str, rel: str) -> dict:
+    """Read one project's package name, dependency names and tsconfig references."""
+    base = os.path.join(project_dir, rel)
+    info = {"name": "", "deps": [], "refs": []}
+    try:
+        with open(os.path.join(base, "package.json"), encoding="utf-8") as f:
+            pkg = json.load(f)
+        info["name"] = pkg.get("name", "")
+        info["deps"] = sorted({dep for field in DEP_FIELDS for dep in pkg.get(field, {}) or {}})
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        with open(os.path.join(base, "tsconfig.json"), encoding="utf-8") as f:
+            refs = load_jsonc(f.read()).get("references", [])
+        for ref in refs:
+            target = os.path.normpath(os.path.join(base, ref.get("path", "")))
+            if target.endswith(".json"):
+                target = os.path.dirname(target)
+            info["refs"].append(os.path.relpath(target, project_dir).replace("\\", "/"))
+    except (OSError, ValueError, AttributeError):
+        pass
+    return info
+
+
+class ProjectGraph:
+    """Projects, their dependencies and reverse dependencies."""
+
+    def __init__(self, projects: dict):
+        self.projects = projects
+        by_name = {info["name"]: rel for rel, info in projects.items() if info["name"]}
+        self.deps = {}
+        self.dependents = {rel: set() for rel in projects}
+        for rel, info in projects.items():
+            deps = {by_name[d] for d in info["deps"] if d in by_name}
+            deps |= {r for r in info["refs"] if r in projects}
+            deps.discard(rel)
+            self.deps[rel] = deps
+            for dep in deps:
+                self.dependents[dep].add(rel)
+
+    def owner(self, project_dir, file_path: str) -> str:
+        """The project containing a file, or "" (nearest enclosing project wins)."""
+        try:
+            rel = os.path.relpath(file_path, project_dir).replace("\\", "/")
+        except ValueError:
+            return ""
+        if rel.startswith(".."):
+            return ""
+        parts = rel.split("/")[:-1]
+        while parts:
+            candidate = "/".join(parts)
+            if candidate in self.projects:
+                return candidate
+            parts.pop()
+        return ""
+
+    def affected(self, project_dir, files) -> list:
+        """Projects to check after editing `files`, dependencies before dependents.
+        Returns [(project, [edited files that can affect it])]."""
+        triggers = {}
+        for f in files:
+            owner = self.owner(project_dir, f)
+            if owner:
+                triggers.setdefault(owner, []).append(f)
+        reached = {}
+        for owner, owned in triggers.items():
+            queue = deque([owner])
+            seen = {owner}
+            while queue:
+                node = queue.popleft()
+                reached.setdefault(node, []).extend(owned)
+                for dependent in self.dependents.get(node, ()):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        queue.append(dependent)
+        return [(node, sorted(set(reached[node]))) for node in self.topological(reached)]
+
+    def topological(self, nodes) -> list:
+        """Order a subset of projects so dependencies come first (Kahn's algorithm)."""
+        nodes = set(nodes)
+        pending = {n: len(self.deps[n] & nodes) for n in nodes}
+        ready = [n for n, count in pending.items() if count == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            node = heapq.heappop(ready)
+            order.append(node)
+            for dependent in self.dependents[node] & nodes:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+        # Cycles: append whatever is left in a stable order
+        order += sorted(nodes - set(order))
+        return order
+
+
+def load(project_dir) -> ProjectGraph:
+    """Return the project graph, re-parsing only manifests that changed."""
+    project_dir = str(project_dir)
+    now = time.monotonic()
+    memo = _memo.get(project_dir)
+    if memo and now - memo[0] < discovery.ttl_seconds():
+        return memo[1]
+
+    path = graph_path(project_dir)
+    try:
+        cached = json.loads(path.read_text())
+        if cached.get("version") != GRAPH_VERSION:
+            raise ValueError("stale graph")
+    except (OSError, ValueError):
+        cached = {"layout": None, "projects": {}}
+
+    patterns = _workspace_patterns(project_dir)
+    layout = _layout_stamp(project_dir, patterns)
+    members = list(cached["projects"]) if cached["layout"] == layout else _expand(project_dir, patterns)
+
+    projects, changed = {}, cached["layout"] != layout
+    for rel in members:
+        base = os.path.join(project_dir, rel)
+        stamp = [_mtime(os.path.join(base, "package.json")), _mtime(os.path.join(base, "tsconfig.json"))]
+        entry = cached["projects"].get(rel)
+        if not entry or entry["stamp"] != stamp:
+            entry = dict(_parse_project(project_dir, rel), stamp=stamp)
+            changed = True
+        projects[rel] = entry
+
+    if changed:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": GRAPH_VERSION, "layout": layout, "projects": projects}))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    graph = ProjectGraph(projects)
+    _memo[project_dir] = (now, graph)
+    return graph
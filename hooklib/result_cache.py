@@ -0,0 +1,231 @@
+"""
+Content-hash cache of type-check results.
+A repo's fingerprint covers its tsconfig files, lockfiles, the check command,
+the current contents of every source file edited in it and the state of the
+whole source tree, so changes made outside the Edit tools (a shell command, a
+checkout, codegen, another session) count too. A fingerprint match means tsc
+would see exactly what it saw last time, so the stored diagnostics are
+returned without running it again.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+LOCKFILES = ("package-lock.json", "pnpm-lock.yaml", "yarn.lock", "bun.lockb")
+# Upper bound on remembered edited sources per repo
+MAX_TRACKED_SOURCES = 2000
+# What makes a tsc-cache directory a session's: a session-id name, or a file
+# only the hooks write there (scheduler/, buildinfo/ and the like have neither)
+SESSION_ID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+SESSION_MARKERS = ("edits.jsonl", "affected-repos.txt", "last-errors.txt", "tsc-commands.txt")
+# Session directories used this recently may belong to a running session
+ACTIVE_SECONDS = 3600
+# Not walked for the source-tree stamp of a repo outside git
+SKIP_DIRS = {".git", ".claude", "node_modules", "dist", "build", "out", "target", "bin", "obj",
+             "__pycache__", ".venv", "venv", ".next", ".turbo", ".cache", "coverage",
+             ".mypy_cache", ".pytest_cache", ".tox"}
+
+
+def cache_root(project_dir) -> Path:
+    return Path(project_dir) / ".claude" / "tsc-cache" / "fingerprints"
+
+
+def repo_dir(project_dir, repo_path) -> Path:
+    key = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:16]
+    return cache_root(project_dir) / key
+
+
+def normalize_command(cmd: str) -> str:
+    """Strip a leading `cd <dir> &&` so both hooks' commands hash the same."""
+    return cmd.split("&&")[-1].strip()
+
+
+def _file_digest(path: Path, memo: dict) -> str:
+    """sha1 of a file's contents, memoized on (size, mtime)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return "missing"
+    stamp = f"{st.st_size}:{st.st_mtime_ns}"
+    cached = memo.get(str(path))
+    if cached and cached[0] == stamp:
+        return cached[1]
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    memo[str(path)] = [stamp, digest]
+    return digest
+
+
+def tree_stamp(repo_path) -> str:
+    """(file count, newest mtime) of a source tree, for repos outside git."""
+    count, newest = 0, 0
+    for dirpath, dirnames, filenames in os.walk(repo_path):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            try:
+                newest = max(newest, os.stat(os.path.join(dirpath, name)).st_mtime_ns)
+            except OSError:
+                continue
+            count += 1
+    return f"{count}:{newest}"
+
+
+def fingerprint(project_dir, repo_path, cmd: str, edited_files, inputs=None, tree=None) -> str:
+    """Fingerprint everything tsc reads.
+    Edited files are remembered per repo, so a later call with fewer files
+    (e.g. the Stop hook after tsc-check.py) still covers all of them.
+    Other checkers pass `inputs`, glob patterns of their config files in the
+    repo dir, instead of the tsconfig and lockfile defaults. `tree` is the
+    repo's shared_store.source_state(); without one (outside git) the file
+    count and newest mtime under the repo stand in for it."""
+    repo_path = Path(repo_path)
+    state_dir = repo_dir(project_dir, repo_path)
+    state_file = state_dir / "sources.json"
+    try:
+        state = json.loads(state_file.read_text())
+    except (OSError, ValueError):
+        state = {"sources": [], "digests": {}}
+
+    # Most recently edited last, so the cap drops the oldest sources first
+    edited = [os.path.abspath(f) for f in edited_files if f]
+    sources = [s for s in state["sources"] if s not in edited] + edited
+    sources = [s for s in sources if os.path.exists(s)][-MAX_TRACKED_SOURCES:]
+    memo = dict(state["digests"])
+
+    h = hashlib.sha256(normalize_command(cmd).encode())
+    h.update(f"tree\0{tree or tree_stamp(repo_path)}\n".encode())
+    if inputs is None:
+        inputs = sorted(repo_path.glob("tsconfig*.json"))
+        inputs += [repo_path / name for name in LOCKFILES]
+        inputs += [Path(project_dir) / name for name in LOCKFILES]
+    else:
+        inputs = sorted({path for pattern in inputs for path in repo_path.glob(pattern)})
+    for path in inputs + [Path(s) for s in sorted(sources)]:
+        h.update(f"{path}\0{_file_digest(path, memo)}\n".encode())
+
+    live = set(sources) | {str(p) for p in inputs}
+    new_state = {"sources": sources, "digests": {k: v for k, v in memo.items() if k in live}}
+    if new_state != state:
+        state_dir.mkdir(parents=True, exist_ok=True)
+        state_file.write_text(json.dumps(new_state))
+    return h.hexdigest()[:32]
+
+
+def lookup_entry(project_dir, repo_path, fp: str):
+    """Return (success, path of the stored output) for a fingerprint, or None."""
+    entry = repo_dir(project_dir, repo_path) / f"{fp}.json"
+    try:
+        data = json.loads(entry.read_text())
+        os.utime(entry)  # mark as recently used for LRU eviction
+    except (OSError, ValueError):
+        return None
+    out = entry.with_suffix(".out")
+    return (data["success"], out) if out.exists() else None
+
+
+def lookup(project_dir, repo_path, fp: str):
+    """Return the stored (success, output) for a fingerprint, or None."""
+    found = lookup_entry(project_dir, repo_path, fp)
+    if found is None:
+        return None
+    return (found[0], found[1].read_text(encoding="utf-8", errors="replace"))
+
+
+def _commit(entry_dir: Path, fp: str, success: bool) -> None:
+    tmp = entry_dir / f"{fp}.json.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps({"success": success}))
+    os.replace(tmp, entry_dir / f"{fp}.json")
+
+
+def store(project_dir, repo_path, fp: str, success: bool, output: str) -> None:
+    entry_dir = repo_dir(project_dir, repo_path)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    tmp = entry_dir / f"{fp}.out.{os.getpid()}.tmp"
+    tmp.write_text(output, encoding="utf-8")
+    os.replace(tmp, entry_dir / f"{fp}.out")
+    _commit(entry_dir, fp, success)
+
+
+def store_file(project_dir, repo_path, fp: str, success: bool, output_path) -> None:
+    """Like store(), but copies the output from a file without loading it."""
+    entry_dir = repo_dir(project_dir, repo_path)
+    entry_dir.mkdir(parents=True, exist_ok=True)
+    tmp = entry_dir / f"{fp}.out.{os.getpid()}.tmp"
+    shutil.copyfile(output_path, tmp)
+    os.replace(tmp, entry_dir / f"{fp}.out")
+    _commit(entry_dir, fp, success)
+
+
+def _tree_usage(path: Path) -> tuple:
+    """Return (total bytes, newest mtime) of a directory tree."""
+    size, newest = 0, path.stat().st_mtime
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                st = os.stat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            size += st.st_size
+            newest = max(newest, st.st_mtime)
+    return (size, newest)
+
+
+def is_session_dir(path: Path) -> bool:
+    return bool(SESSION_ID.match(path.name)) or any((path / marker).exists() for marker in SESSION_MARKERS)
+
+
+def evict(tsc_cache_root, keep=()) -> None:
+    """Trim a tsc-cache root to its size and entry budget, least recently used first.
+    Candidates are cached results and the directories of sessions idle for
+    ACTIVE_SECONDS; paths in `keep` (the current session's) are never
+    removed, and other directories (scheduler output, build info) are left
+    to their owners."""
+    max_bytes = int(float(os.environ.get("TSC_CACHE_MAX_MB", "64")) * 1024 * 1024)
+    max_entries = int(os.environ.get("TSC_CACHE_MAX_ENTRIES", "500"))
+    tsc_cache_root = Path(tsc_cache_root)
+    keep = {Path(k).resolve() for k in keep}
+    now = time.time()
+    candidates = []  # (last used, size, path)
+    try:
+        children = list(tsc_cache_root.iterdir())
+    except OSError:
+        return
+    for child in children:
+        try:
+            if child.name == "fingerprints":
+                for entry in child.glob("*/*.json"):
+                    if entry.name != "sources.json":
+                        st = entry.stat()
+                        out = entry.with_suffix(".out")
+                        size = st.st_size + (out.stat().st_size if out.exists() else 0)
+                        candidates.append((st.st_mtime, size, entry))
+            elif child.is_dir() and child.resolve() not in keep and is_session_dir(child):
+                size, newest = _tree_usage(child)
+                if now - newest > ACTIVE_SECONDS:
+                    candidates.append((newest, size, child))
+        except OSError:
+            continue
+
+    candidates.sort(key=lambda c: c[0])
+    total = sum(c[1] for c in candidates)
+    count = len(candidates)
+    for _, size, path in candidates:
+        if total <= max_bytes and count <= max_entries:
+            break
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                path.unlink()
+                path.with_suffix(".out").unlink(missing_ok=True)
+            except OSError:
+                continue
+        total -= size
+        count -= 1
@@ -0,0 +1,116 @@
+"""
+Service repos of the monorepo and their git status, shared by
+trigger-build-resolver.py and stop-pipeline.py.
+A service edited since the last Stop (per the edit journal) is known to
+have changes; every other service git repo needs a `git status`, which stops
+reading at the first changed path. Edits from earlier turns prove nothing,
+since they may have been reverted or committed since.
+"""
+import asyncio
+import os
+import signal
+import subprocess
+from pathlib import Path
+
+# Service directories to check, in reporting order
+SERVICES = ["email", "exports", "form", "frontend", "projects",
+            "uploads", "users", "utilities", "events", "database"]
+
+GIT_STATUS = ["git", "--no-optional-locks", "status", "--porcelain", "--no-renames"]
+
+
+def max_workers() -> int:
+    """Concurrent git status calls (TRIGGER_BUILD_WORKERS, 1 = one service at a time)."""
+    return int(os.environ.get("TRIGGER_BUILD_WORKERS", "0")) or 16
+
+
+def partition(project_dir, edited_files) -> tuple:
+    """Split the service git repos into (edited in `edited_files`, still to
+    scan, missing), each a list of (service, path) in SERVICES order. Pass
+    only the files edited since the last Stop."""
+    edited, to_scan, missing = [], [], []
+    for service in SERVICES:
+        service_path = Path(project_dir) / service
+        if not (service_path.is_dir() and (service_path / ".git").is_dir()):
+            missing.append((service, service_path))
+            continue
+        prefix = str(service_path) + os.sep
+        if any(f.startswith(prefix) for f in edited_files):
+            edited.append((service, service_path))
+        else:
+            to_scan.append((service, service_path))
+    return (edited, to_scan, missing)
+
+
+def build_instruction(changed: list) -> str:
+    """The resolver instruction for services with changes."""
+    services_list = ", ".join(changed)
+    return f"""
+BUILD CHECK TRIGGERED
+
+Changes detected in: {services_list}
+
+Please use the auto-error-resolver agent to build and fix any errors in these services:
+- Task(subagent_type='auto-error-resolver', description='Fix build errors', prompt='Build and fix errors in: {services_list}')
+
+Focus on these services in the monorepo structure. Each service has its own build process.
+"""
+
+
+def _result(first: str) -> tuple:
+    if first:
+        return (True, [f"  -> Has changes (first: {first})"])
+    return (False, ["  -> No changes"])
+
+
+def git_status(service_path: Path, pathspec=()) -> tuple:
+    """Return (has changes, log lines) for the repo, or only `pathspec` in it.
+    Stops reading at the first changed path.
+    --no-optional-locks keeps concurrent calls from contending on index.lock
+    and makes it safe to stop git early; fsmonitor and the untracked cache
+    are used whenever the repo has them configured."""
+    try:
+        proc = subprocess.Popen(
+            GIT_STATUS + (["--", *pathspec] if pathspec else []),
+            cwd=str(service_path),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+    except OSError as e:
+        return (False, [f"  -> Error checking git: {e}"])
+    first = proc.stdout.readline().rstrip("\n")
+    if first:
+        proc.kill()
+    proc.stdout.close()
+    proc.wait()
+    return _result(first)
+
+
+async def git_status_async(service_path: Path) -> tuple:
+    """git_status() as a subprocess on the running event loop."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *GIT_STATUS,
+            cwd=str(service_path),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError as e:
+        return (False, [f"  -> Error checking git: {e}"])
+    first = (await proc.stdout.readline()).decode("utf-8", "replace").rstrip("\n")
+    if first:
+        try:
+            if os.name == "nt":
+                proc.kill()
+            else:
+                # Process.kill() polls the child first and can reap it under
+                # the event loop's child watcher, which then warns about an
+                # unknown pid; until the watcher reaps it the pid is ours
+                os.kill(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    await proc.wait()
+    return _result(first)
@@ -0,0 +1,200 @@
+"""
+Content-addressed type-check results shared by every session and worktree.
+A repo's key is the git tree of everything its type-check reads: the repo's
+own directory, the workspace projects it depends on, and the loose files
+(package.json, lockfiles, tsconfig.base.json, ...) in the project root and
+each directory above the repo. The key is computed without writing to the
+repository: the index's blob ids (`git ls-files -s`) for files that match
+it, and `git hash-object` (which stores nothing) for modified and untracked
+ones. Two sessions on the same content compute the same key, whatever their
+branch or session id.
+
+Results live in ~/.claude/diagnostic-store/ and stay within
+DIAGNOSTIC_STORE_MAX_MB (default 256), least recently used first.
+Set DIAGNOSTIC_STORE=0 to turn the store off. Ignored files such as
+node_modules are not part of the key; the lockfiles stand in for them.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from hooklib import project_graph
+from hooklib.locking import locked
+from hooklib.result_cache import normalize_command
+
+# Seconds a git step may take before the store is skipped for this check
+GIT_TIMEOUT = 10
+
+
+def enabled() -> bool:
+    return os.environ.get("DIAGNOSTIC_STORE", "1") != "0"
+
+
+def store_root() -> Path:
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "diagnostic-store"
+
+
+def _git(args: list, cwd, input=None) -> str:
+    proc = subprocess.run(
+        ["git", "--no-optional-locks"] + args,
+        cwd=cwd,
+        input=input,
+        stdin=subprocess.DEVNULL if input is None else None,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        timeout=GIT_TIMEOUT,
+    )
+    if proc.returncode != 0:
+        raise OSError(proc.stderr.strip())
+    return proc.stdout
+
+
+def relevant_dirs(project_dir, repo: str) -> list:
+    """The repo and the workspace projects it depends on, transitively."""
+    graph = project_graph.load(project_dir)
+    seen, stack = {repo}, [repo]
+    while stack:
+        for dep in graph.deps.get(stack.pop(), ()):
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    return sorted(seen)
+
+
+def source_state(project_dir, repo: str, memo=None):
+    """Digest of the content a repo's check reads (see above), or None outside
+    a git work tree. Pass the same `memo` dict to reuse it within one run."""
+    memo_key = (str(project_dir), repo)
+    if memo is not None and memo_key in memo:
+        return memo[memo_key]
+    repo_path = Path(project_dir) / repo
+    try:
+        top = Path(_git(["rev-parse", "--show-toplevel"], repo_path).strip())
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    dirs, ancestors = [], {""}
+    for rel in relevant_dirs(project_dir, repo):
+        try:
+            path = os.path.relpath(Path(project_dir) / rel, top).replace("\\", "/")
+        except ValueError:
+            return None
+        if path.startswith(".."):
+            return None
+        path = "" if path == "." else path
+        dirs.append(path)
+        parts = path.split("/")[:-1] if path else []
+        ancestors.update("/".join(parts[:i]) for i in range(1, len(parts) + 1))
+    # Everything in a relevant dir; only the files directly in the dirs above them
+    pathspecs = [d or "." for d in dirs] + [f":(glob){a}/*" if a else ":(glob)*" for a in sorted(ancestors)]
+    # The hooks' own caches are not sources, wherever the project sits
+    pathspecs.append(":(exclude,glob)**/.claude/**")
+
+    try:
+        entries = {}
+        for entry in _git(["ls-files", "-s", "-z", "--"] + pathspecs, top).split("\0"):
+            meta, _, path = entry.partition("\t")
+            if path:
+                entries[path] = meta
+        # Work-tree files that differ from the index, deleted or untracked
+        changed = set(filter(None, _git(["ls-files", "-z", "-m", "-d", "-o", "--exclude-standard", "--"] + pathspecs,
+                                        top).split("\0")))
+        present = sorted(p for p in changed if "\n" not in p and os.path.isfile(top / p))
+        for path in changed.difference(present):
+            entries.pop(path, None)
+        if present:
+            blobs = _git(["hash-object", "--no-filters", "--stdin-paths"], top, input="\n".join(present) + "\n").split()
+            if len(blobs) != len(present):
+                return None
+            entries.update((path, f"worktree {blob}") for path, blob in zip(present, blobs))
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    h = hashlib.sha256(f"{os.path.relpath(repo_path, top)}\n".encode())
+    for path in sorted(entries):
+        h.update(f"{entries[path]}\t{path}\n".encode())
+    state = h.hexdigest()
+    if memo is not None:
+        memo[memo_key] = state
+    return state
+
+
+def tree_key(project_dir, repo: str, cmd: str, memo=None):
+    """Key of the content a repo's check reads, or None outside a git work tree."""
+    if not enabled():
+        return None
+    state = source_state(project_dir, repo, memo)
+    if state is None:
+        return None
+    return hashlib.sha256(f"{normalize_command(cmd)}\0{state}".encode()).hexdigest()[:40]
+
+
+def _entry(key: str) -> Path:
+    return store_root() / key[:2] / f"{key}.json"
+
+
+def lookup(key):
+    """Return (success, path of the stored output) for a key, or None."""
+    if not key:
+        return None
+    entry = _entry(key)
+    try:
+        data = json.loads(entry.read_text())
+        os.utime(entry)  # mark as recently used for eviction
+    except (OSError, ValueError):
+        return None
+    out = entry.with_suffix(".out")
+    return (data["success"], out) if out.exists() else None
+
+
+def store(key, success: bool, output_path, repo: str = "") -> None:
+    """Publish a result: output first, then the entry that makes it visible."""
+    if not key:
+        return
+    entry = _entry(key)
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".out.{os.getpid()}.tmp")
+        shutil.copyfile(output_path, tmp)
+        os.replace(tmp, entry.with_suffix(".out"))
+        tmp = entry.with_suffix(f".json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"success": success, "repo": repo, "stored": int(time.time())}))
+        os.replace(tmp, entry)
+        evict()
+    except OSError:
+        pass
+
+
+def evict() -> None:
+    """Trim the store to DIAGNOSTIC_STORE_MAX_MB, least recently used first.
+    One process evicts at a time; readers never see half-removed entries
+    because the .json goes before its .out."""
+    max_bytes = float(os.environ.get("DIAGNOSTIC_STORE_MAX_MB", "256")) * 1024 * 1024
+    root = store_root()
+    with locked(root / "evict"):
+        entries, total = [], 0
+        for entry in root.glob("*/*.json"):
+            try:
+                st = entry.stat()
+                size = st.st_size + entry.with_suffix(".out").stat().st_size
+            except OSError:
+                continue
+            entries.append((st.st_mtime, size, entry))
+            total += size
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= max_bytes:
+                break
+            try:
+                entry.unlink()
+                entry.with_suffix(".out").unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,267 @@
+"""
+Skill-rule matching for skill-rules.json.
+All keywords of all skills, plus the literal words each intent pattern
+starts with, go into one Aho-Corasick automaton, so a single pass over the
+prompt finds every keyword hit and every intent pattern that could match.
+Only those patterns' precompiled regexes are then run. Matches follow
+skill-activation-prompt.ts: case-insensitive, a keyword hit wins over an
+intent hit, results in rules-file order.
+
+Intent patterns are `.*`-heavy, so a regex costs the square of the text it
+scans. They run line by line (`.` never crosses a newline anyway) on the
+first INTENT_CHARS of the prompt, each line cut to LINE_CHARS, so a pasted
+log adds milliseconds rather than seconds. Keywords are still found in the
+whole prompt.
+
+The built matcher is pickled under ~/.claude/skill-matcher/ and rebuilt when
+the rules file's mtime or size changes; within a process (e.g. the resident
+hook host) it is reused without touching the disk.
+"""
+import hashlib
+import json
+import os
+import pickle
+import re
+from collections import deque, namedtuple
+from pathlib import Path
+
+CACHE_VERSION = 1
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+
+Match = namedtuple("Match", "name match_type config")
+
+# Bounds on the text the intent regexes see
+INTENT_CHARS = 8192
+LINE_CHARS = 1000
+
+# rules path -> (stamp, SkillMatcher)
+_memo = {}
+
+
+def home() -> Path:
+    return Path(os.environ.get("USERPROFILE", os.environ.get("HOME", "")))
+
+
+def rules_path(project_dir=None):
+    """First skill-rules.json found: project .claude/skills, ~/.claude/skills,
+    then the one next to the hooks. Returns None if there is none."""
+    candidates = []
+    if project_dir:
+        candidates.append(Path(project_dir) / ".claude" / "skills" / "skill-rules.json")
+    candidates += [home() / ".claude" / "skills" / "skill-rules.json", HOOKS_DIR / "skill-rules.json"]
+    for path in candidates:
+        if path.is_file():
+            return path
+    return None
+
+
+META = set(".^$*+?{}[]\\|()")
+
+
+def _top_level_alternation(pattern: str) -> bool:
+    depth, i = 0, 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 1
+        elif c == "[":
+            i = pattern.find("]", i + 2)
+            if i < 0:
+                return True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def anchors(pattern: str):
+    """Literals of which at least one must occur in any text the pattern
+    matches: its leading word, or the alternatives of a leading
+    `(?:a|b|c)` group. None when no such literals can be read off."""
+    if _top_level_alternation(pattern):
+        return None
+    if pattern.startswith("(?:"):
+        end = pattern.find(")")
+        if end < 0 or pattern[end + 1:end + 2] in ("?", "*", "{"):
+            return None
+        alternatives = pattern[3:end].split("|")
+        if any(not alt or META & set(alt) for alt in alternatives):
+            return None
+        return [alt.lower() for alt in alternatives]
+    run = ""
+    for i, c in enumerate(pattern):
+        if c in META:
+            if c in "?*{":
+                run = run[:-1]  # last char is optional
+            break
+        run += c
+    return [run.lower()] if len(run) >= 2 else None
+
+
+class Automaton:
+    """Aho-Corasick automaton: every value whose word occurs in a text, in one pass."""
+
+    def __init__(self, words: dict):
+        # words: lowercase word -> set of values reported when it occurs
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [frozenset()]
+        for word, values in words.items():
+            state = 0
+            for ch in word:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(frozenset())
+                state = nxt
+            self.out[state] = self.out[state] | frozenset(values)
+        # Breadth-first failure links; outputs inherit those of their fail state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.out[nxt] = self.out[nxt] | self.out[self.fail[nxt]]
+
+    def search(self, text: str) -> set:
+        """Values of every word occurring in `text` (already lowercased)."""
+        found = set()
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class SkillMatcher:
+    """One automaton over all keywords and intent-pattern anchors of a rules file."""
+
+    def __init__(self, rules: dict):
+        self.names = []
+        self.configs = []
+        # Intent patterns as (skill index, source); those without anchors always run
+        self.patterns = []
+        self.unanchored = []
+        words = {}
+        for index, (name, config) in enumerate(rules.get("skills", {}).items()):
+            self.names.append(name)
+            self.configs.append(config)
+            triggers = config.get("promptTriggers") or {}
+            for kw in triggers.get("keywords", []):
+                if kw:
+                    words.setdefault(kw.lower(), set()).add(("keyword", index))
+            for pattern in triggers.get("intentPatterns", []):
+                try:
+                    re.compile(pattern)
+                except re.error:
+                    continue  # JavaScript-only syntax
+                number = len(self.patterns)
+                self.patterns.append((index, pattern))
+                literals = anchors(pattern)
+                if literals is None:
+                    self.unanchored.append(number)
+                for literal in literals or ():
+                    words.setdefault(literal, set()).add(("intent", number))
+        self.automaton = Automaton(words)
+        self._compiled = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_compiled"] = {}  # compiled patterns do not pickle usefully
+        return state
+
+    def _regex(self, number: int):
+        regex = self._compiled.get(number)
+        if regex is None:
+            regex = self._compiled[number] = re.compile(self.patterns[number][1], re.IGNORECASE)
+        return regex
+
+    def match(self, prompt: str) -> list:
+        """All matching skills as Match(name, "keyword" | "intent", config)."""
+        text = prompt.lower()
+        by_keyword, candidates = set(), set(self.unanchored)
+        for kind, value in self.automaton.search(text):
+            (by_keyword if kind == "keyword" else candidates).add(value)
+        # Regexes run only for skills no keyword matched, and only if an anchor occurs
+        by_intent = set()
+        lines = None
+        for number in sorted(candidates):
+            skill = self.patterns[number][0]
+            if skill in by_keyword or skill in by_intent:
+                continue
+            if lines is None:
+                lines = [line[:LINE_CHARS] for line in text[:INTENT_CHARS].split("\n") if line]
+            regex = self._regex(number)
+            if any(regex.search(line) for line in lines):
+                by_intent.add(skill)
+        matches = []
+        for index, name in enumerate(self.names):
+            if index in by_keyword:
+                matches.append(Match(name, "keyword", self.configs[index]))
+            elif index in by_intent:
+                matches.append(Match(name, "intent", self.configs[index]))
+        return matches
+
+
+def cache_file(path: Path) -> Path:
+    digest = hashlib.sha1(str(path.resolve()).encode()).hexdigest()[:16]
+    return home() / ".claude" / "skill-matcher" / f"{digest}.pickle"
+
+
+def load(path) -> SkillMatcher:
+    """Matcher for a rules file, from memory, the pickle cache, or built fresh."""
+    path = Path(path)
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    memo = _memo.get(str(path))
+    if memo and memo[0] == stamp:
+        return memo[1]
+
+    cached = cache_file(path)
+    matcher = None
+    try:
+        with open(cached, "rb") as f:
+            version, cached_stamp, candidate = pickle.load(f)
+        if version == CACHE_VERSION and tuple(cached_stamp) == stamp:
+            matcher = candidate
+    except Exception:
+        pass
+    if matcher is None:
+        matcher = SkillMatcher(json.loads(path.read_text(encoding="utf-8")))
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((CACHE_VERSION, stamp, matcher), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cached)
+        except OSError:
+            pass
+    _memo[str(path)] = (stamp, matcher)
+    return matcher
+
+
+def match_prompt(prompt: str, project_dir=None) -> list:
+    """Skills matching a prompt under the active rules file ([] if none)."""
+    path = rules_path(project_dir)
+    if path is None:
+        return []
+    try:
+        return load(path).match(prompt)
+    except (OSError, ValueError):
+        return []
@@ -0,0 +1,96 @@
+"""
+Timing spans for hook phases.
+With HOOK_SPANS=1 every `with span(hook, phase):` block, and every
+Laps.lap(phase) in a top-level hook script, appends one JSON line
+({"ts", "hook", "phase", "ms", "pid", and "nested" for span()s) to ~/.claude/hook-metrics/spans.jsonl
+(HOOK_SPANS_FILE overrides). The file is rotated to spans.jsonl.1 once it
+passes HOOK_SPANS_MAX_MB (default 8). hook-stats.py turns it into per-hook,
+per-phase histograms.
+
+Disabled (the default), span() costs one environment lookup and returns a
+shared no-op context manager, and lap() is a flag check. The environment is
+read per call / per Laps so hooks running inside the resident host follow
+the client's setting.
+"""
+import json
+import os
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+_NULL = nullcontext()
+
+
+def enabled() -> bool:
+    return os.environ.get("HOOK_SPANS", "") == "1"
+
+
+def spans_file() -> Path:
+    override = os.environ.get("HOOK_SPANS_FILE")
+    if override:
+        return Path(override)
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "hook-metrics" / "spans.jsonl"
+
+
+def record(hook: str, phase: str, seconds: float, nested: bool = False) -> None:
+    """Append one span with a single O_APPEND write; rotate if the file is full.
+    Nested spans time part of an enclosing phase (e.g. one repo's tsc run
+    inside "checks") and are left out of the hook's total."""
+    path = spans_file()
+    entry = {"ts": round(time.time(), 3), "hook": hook, "phase": phase, "ms": round(seconds * 1000, 3), "pid": os.getpid()}
+    if nested:
+        entry["nested"] = True
+    line = json.dumps(entry, separators=(",", ":"))
+    max_bytes = float(os.environ.get("HOOK_SPANS_MAX_MB", "8")) * 1024 * 1024
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (line + "\n").encode("utf-8"))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > max_bytes:
+            os.replace(path, f"{path}.1")
+    except OSError:
+        pass
+
+
+class _Span:
+    __slots__ = ("hook", "phase", "started")
+
+    def __init__(self, hook: str, phase: str):
+        self.hook = hook
+        self.phase = phase
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.hook, self.phase, time.perf_counter() - self.started, nested=True)
+        return False
+
+
+def span(hook: str, phase: str):
+    """Context manager timing a step within a hook phase (a no-op unless HOOK_SPANS=1)."""
+    if os.environ.get("HOOK_SPANS", "") != "1":
+        return _NULL
+    return _Span(hook, phase)
+
+
+class Laps:
+    """Phase timer for straight-line hook scripts: each lap(phase) records the
+    time since the previous lap (or since the timer was created)."""
+
+    def __init__(self, hook: str):
+        self.hook = hook
+        self.on = enabled()
+        self.last = time.perf_counter() if self.on else 0.0
+
+    def lap(self, phase: str) -> None:
+        if self.on:
+            now = time.perf_counter()
+            record(self.hook, phase, now - self.last)
+            self.last = now
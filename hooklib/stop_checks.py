@@ -0,0 +1,379 @@
+"""
+Session type-checks for the Stop hooks.
+StopChecks collects the checks a session's edits call for: one per repo and
+checker from the edit journal (or the legacy text files), plus the workspace
+projects that depend on edited ones. When a change watcher is running
+(hooklib.watch), files written outside the Edit tools since the session's
+last clean Stop are added the same way. check() runs one of them, behind the
+background scheduler, the result cache and the shared store; record() folds
+its outcome into the totals. report() writes the files auto-error-resolver
+reads (last-errors.txt and its indexed copy, errors.db) and prints the
+error report.
+
+stop-build-check-enhanced.py drives the checks from a thread pool;
+stop-pipeline.py runs them on an asyncio loop next to the service git checks.
+"""
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from hooklib import check_scheduler, checkers, discovery, error_index, incremental, journal, project_graph, result_cache, shared_store, spans, watch
+from hooklib.diagnostics import DiagnosticCollector, feed_file, run_streaming
+
+
+class StopChecks:
+    def __init__(self, project_dir, session_id: str, hook: str):
+        self.project_dir = project_dir
+        self.session_id = session_id
+        self.hook = hook
+        self.cache_dir = Path(project_dir) / ".claude" / "tsc-cache" / session_id
+        self.results_dir = self.cache_dir / "results"
+        self.error_summary_file = self.results_dir / "error-summary.txt"
+
+        # Concurrency cap and per-repo timeout (seconds) for the type-checks
+        self.max_workers = int(os.environ.get("STOP_CHECK_WORKERS", "0")) or os.cpu_count() or 1
+        self.repo_timeout = float(os.environ.get("STOP_CHECK_TIMEOUT", "0")) or None
+        # Opt-in early exit: once this many errors are found across all repos, the
+        # running checks are killed and the partial results reported (0 = off)
+        self.error_threshold = int(os.environ.get("STOP_CHECK_ERROR_THRESHOLD", "0"))
+
+        # One check per (repo, checker), keyed by checkers.label(): just the repo
+        # for tsc, "repo (mypy)" and the like for the other checkers
+        self.targets = {}
+        self.commands = {}
+        self.edited_files = {}
+        self.affected_repos = []
+        # Every file edited this session, checked or not
+        self.session_files = set()
+        # The change watcher's state, or None when no watcher is running
+        self.watch_state = None
+        self.started = time.time()
+
+        # Collectors of every started check, so the threshold sees the running total
+        self.collectors = []
+        # target -> (rechecked files, total files) of incremental runs
+        self.rechecked = {}
+        # (project, repo) -> source state for the caches, computed once per Stop
+        self.source_states = {}
+        self.repo_results = {}
+        # Checks that timed out, raised, were stopped before finding anything
+        # or were skipped: not a pass, so the session cache is kept for the next Stop
+        self.incomplete = []
+        # Checks stopped at the error threshold after finding errors: reported,
+        # but they did not cover the whole repo
+        self.partial = []
+        # Checks never started because the threshold was reached first
+        self.skipped = set()
+        self.total_errors = 0
+        self.has_errors = False
+        self.summed_time = 0.0
+
+    def load(self) -> bool:
+        """Read the session's edits. False when the session has none."""
+        self.watch_state = watch.load(self.project_dir)
+        watched = []
+        if self.watch_state is None:
+            watch.autostart(self.project_dir)
+        else:
+            # Anyone's writes since this session's last clean Stop, not only its own
+            since = watch.since(self.project_dir, self.session_id)
+            watched = [f for f in watch.changed_files(self.watch_state, since) if checkers.is_checked(f)]
+        if not self.cache_dir.exists() and not watched:
+            return False
+        # Edits are read from the session journal; the text files are only
+        # written by the legacy post-tool-use-tracker.sh
+        affected_repos_file = self.cache_dir / "affected-repos.txt"
+        commands_file = self.cache_dir / "commands.txt"
+        use_journal = journal.exists(self.cache_dir)
+        if not use_journal and not affected_repos_file.exists() and not watched:
+            return False
+
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        # Clear previous error summary
+        self.error_summary_file.write_text("")
+
+        if use_journal:
+            index = journal.load_index(self.cache_dir)
+            for repo in index.affected_repos():
+                self.session_files.update(index.repo_files(repo))
+                for kind in checkers.CHECKERS:
+                    cmd = index.command(repo, kind)
+                    if cmd:
+                        target = checkers.label(repo, kind)
+                        self.targets[target] = (repo, kind)
+                        self.commands[target] = cmd
+                        self.edited_files[target] = index.repo_files(repo)
+                        self.affected_repos.append(target)
+        else:
+            if commands_file.exists():
+                for line in commands_file.read_text().strip().split("\n"):
+                    if line and ":tsc:" in line:
+                        parts = line.split(":tsc:", 1)
+                        if len(parts) == 2:
+                            self.commands[parts[0]] = parts[1]
+
+            # Keep first-seen order for a deterministic summary
+            legacy_repos = affected_repos_file.read_text() if affected_repos_file.exists() else ""
+            for repo in legacy_repos.strip().split("\n"):
+                repo = repo.strip()
+                if repo and repo in self.commands and repo not in self.affected_repos:
+                    self.targets[repo] = (repo, "tsc")
+                    self.affected_repos.append(repo)
+
+            # Files edited per repo, for the result-cache fingerprint
+            edited_log = self.cache_dir / "edited-files.log"
+            if edited_log.exists():
+                for line in edited_log.read_text().splitlines():
+                    parts = line.split(":", 1)
+                    if len(parts) == 2 and ":" in parts[1]:
+                        path, repo = parts[1].rsplit(":", 1)
+                        self.edited_files.setdefault(repo, []).append(path)
+                        self.session_files.add(path)
+        self.add_watched(watched)
+        return True
+
+    def add_watched(self, files: list) -> None:
+        """Add checks for files the watcher saw changing that no edit tool touched."""
+        for path in files:
+            if path in self.session_files:
+                continue
+            self.session_files.add(path)
+            owned = checkers.commands_for_file(self.project_dir, path)
+            if owned is None:
+                continue
+            repo, commands = owned
+            for kind, cmd in commands.items():
+                if not cmd or kind not in checkers.CHECKERS:
+                    continue
+                target = checkers.label(repo, kind)
+                if target not in self.targets:
+                    self.targets[target] = (repo, kind)
+                    self.commands[target] = cmd
+                    self.affected_repos.append(target)
+                self.edited_files.setdefault(target, []).append(path)
+
+    def add_dependents(self) -> None:
+        """Add workspace projects that depend on the edited ones, dependencies first."""
+        all_edited = [f for repo in self.affected_repos if self.targets[repo][1] == "tsc"
+                      for f in self.edited_files.get(repo, [])]
+        graph_order = []
+        for project, files in project_graph.load(self.project_dir).affected(self.project_dir, all_edited):
+            if project not in self.commands:
+                tsc_cmd = discovery.repo_tsc_command(self.project_dir, project)
+                if not tsc_cmd:
+                    continue
+                self.commands[project] = tsc_cmd
+                self.targets[project] = (project, "tsc")
+            self.edited_files[project] = sorted(set(self.edited_files.get(project, [])) | set(files))
+            graph_order.append(project)
+        self.affected_repos = graph_order + [repo for repo in self.affected_repos if repo not in graph_order]
+
+    def result_file(self, target: str, suffix: str) -> Path:
+        """Per-check file in results/ (workspace repos like packages/ui are flattened)."""
+        return self.results_dir / f"{checkers.file_stem(*self.targets[target])}{suffix}"
+
+    def threshold_reached(self) -> bool:
+        return bool(self.error_threshold) and sum(c.count for c in self.collectors) >= self.error_threshold
+
+    def check(self, target: str) -> tuple:
+        """Run one repo's checker, or replay a cached result when nothing it
+        reads has changed. Output streams into results/<repo>-errors.txt and
+        parsed diagnostics into results/<repo>-diagnostics.jsonl.
+        Returns (returncode, collector, elapsed, timed_out)."""
+        repo, kind = self.targets[target]
+        checker = checkers.CHECKERS[kind]
+        repo_path = Path(self.project_dir) / repo
+        error_file = self.result_file(target, "-errors.txt")
+        collector = DiagnosticCollector(error_file, self.result_file(target, "-diagnostics.jsonl"), parse=checker.parse)
+        self.collectors.append(collector)
+        # A background check of this repo may still be debouncing or running:
+        # let it finish and replay its result from the cache below
+        with spans.span(self.hook, "scheduler wait"):
+            check_scheduler.wait(self.project_dir, repo_path, timeout=self.repo_timeout or 600)
+        with spans.span(self.hook, "cache lookup"):
+            fp = result_cache.fingerprint(self.project_dir, repo_path, self.commands[target],
+                                          self.edited_files.get(target, []), checker.inputs,
+                                          shared_store.source_state(self.project_dir, repo, self.source_states))
+            cached = result_cache.lookup_entry(self.project_dir, repo_path, fp)
+        if cached is not None:
+            success, output_path = cached
+            feed_file(output_path, collector)
+            return (0 if success else 1, collector, 0.0, False)
+        # Another session or worktree may have checked the same content
+        with spans.span(self.hook, "shared store"):
+            key = shared_store.tree_key(self.project_dir, repo, self.commands[target], self.source_states)
+            shared = shared_store.lookup(key)
+        if shared is not None:
+            success, output_path = shared
+            feed_file(output_path, collector)
+            result_cache.store_file(self.project_dir, repo_path, fp, success, output_path)
+            return (0 if success else 1, collector, 0.0, False)
+        if self.threshold_reached():
+            # Queued behind checks that already crossed the threshold: never started
+            self.skipped.add(target)
+            collector.close()
+            return (None, collector, 0.0, False)
+        run = incremental.IncrementalRun(self.project_dir, repo, self.commands[target], self.session_id)
+        returncode = None
+        try:
+            with spans.span(self.hook, kind):
+                returncode, elapsed, timed_out = run_streaming(
+                    run.command, self.project_dir, collector, timeout=self.repo_timeout, stop_when=self.threshold_reached
+                )
+        finally:
+            counts = run.finish(returncode is not None and not collector.truncated)
+        if counts:
+            self.rechecked[target] = counts
+        if not timed_out and not collector.truncated:
+            result_cache.store_file(self.project_dir, repo_path, fp, returncode == 0, error_file)
+            shared_store.store(key, returncode == 0, error_file, repo)
+        return (returncode, collector, elapsed, timed_out)
+
+    def record(self, target: str, outcome: tuple) -> None:
+        """Fold one check's outcome into the totals."""
+        returncode, collector, elapsed, timed_out = outcome
+        self.summed_time += elapsed
+
+        if target in self.skipped:
+            # Not a partial count: nothing ran, so nothing is known about the repo
+            self.has_errors = True
+            self.repo_results[target] = "skipped"
+            self.incomplete.append(target)
+            return
+        if timed_out or collector.truncated:
+            # Counts are a lower bound; keep whatever output was captured
+            self.has_errors = True
+            self.total_errors += collector.count
+            if timed_out:
+                self.repo_results[target] = "timeout"
+                print(f"⏱ {target}: {self.targets[target][1]} timed out after {self.repo_timeout:.0f}s", file=sys.stderr)
+            else:
+                self.repo_results[target] = f"{collector.count} (truncated)"
+            if timed_out or collector.count == 0:
+                self.incomplete.append(target)
+            else:
+                self.partial.append(target)
+            return
+        elif returncode != 0:
+            self.has_errors = True
+            self.total_errors += collector.count
+            self.repo_results[target] = collector.count
+            return
+        else:
+            self.repo_results[target] = 0
+        # Only failing repos keep their output
+        for suffix in ("-errors.txt", "-diagnostics.jsonl"):
+            self.result_file(target, suffix).unlink(missing_ok=True)
+
+    def fail(self, target: str, error: BaseException) -> None:
+        """A check that raised: reported as unfinished and run again at the next Stop."""
+        self.has_errors = True
+        self.repo_results[target] = "failed"
+        self.incomplete.append(target)
+        print(f"✗ {target}: {self.targets[target][1]} failed: {error}", file=sys.stderr)
+
+    def summarize(self, wall_time: float) -> None:
+        """Write the error summary and print the timing lines."""
+        with open(self.error_summary_file, "a") as f:
+            for repo in self.affected_repos:
+                if repo in self.repo_results:
+                    f.write(f"{repo}:{self.repo_results[repo]}\n")
+
+        if self.skipped or any(c.truncated for c in self.collectors):
+            print(f"⏱ Stopped early after reaching {self.error_threshold} errors (STOP_CHECK_ERROR_THRESHOLD)",
+                  file=sys.stderr)
+        elif len(self.affected_repos) > 1:
+            print(f"⏱ Checked {len(self.affected_repos)} repos in {wall_time:.1f}s "
+                  f"(sequential would be ~{self.summed_time:.1f}s, saved {max(self.summed_time - wall_time, 0):.1f}s)",
+                  file=sys.stderr)
+        if self.rechecked:
+            print(f"⚡ Incremental: rechecked {sum(r for r, _ in self.rechecked.values())} of "
+                  f"{sum(t for _, t in self.rechecked.values())} files in {len(self.rechecked)} repo(s)", file=sys.stderr)
+
+    def report(self, also_build=()) -> int:
+        """Save the errors for the resolver and print the report; returns the
+        exit code. also_build names changed services no check covered, so
+        the one resolver instruction includes building them. Checks that only
+        failed to finish are a warning (exit 0): a missing tool or a check
+        that always times out must not block every Stop; the session cache
+        is kept, so they run again at the next one."""
+        errors_name = "TypeScript" if all(kind == "tsc" for _, kind in self.targets.values()) else "type-check"
+        # Combine all errors into one file, copying rather than loading each one
+        last_errors = self.cache_dir / "last-errors.txt"
+        with open(last_errors, "w", encoding="utf-8") as out:
+            for repo_name in self.affected_repos:
+                error_file = self.result_file(repo_name, "-errors.txt")
+                if not error_file.exists():
+                    continue
+                out.write(f"=== Errors in {repo_name} ===\n")
+                with open(error_file, encoding="utf-8", errors="replace") as f:
+                    shutil.copyfileobj(f, out)
+                out.write("\n\n")
+        # The same errors indexed by file and code, for error-query.py
+        try:
+            error_index.build(self.cache_dir / error_index.DB_NAME, self.project_dir,
+                              [(*self.targets[t], self.result_file(t, "-diagnostics.jsonl")) for t in self.affected_repos])
+        except Exception as e:
+            print(f"⚠ Could not index the errors: {e}", file=sys.stderr)
+
+        # Save TSC commands for the resolver
+        tsc_cmds = [f"{self.targets[t][0]}:{self.targets[t][1]}:{self.commands[t]}" for t in self.affected_repos]
+        (self.cache_dir / "tsc-commands.txt").write_text("\n".join(tsc_cmds))
+        build_note = f" Also build and fix errors in: {', '.join(also_build)}." if also_build else ""
+
+        # Output to stderr
+        if self.total_errors >= 5:
+            print("", file=sys.stderr)
+            print(f"## {errors_name} Build Errors Detected", file=sys.stderr)
+            print("", file=sys.stderr)
+            at_least = "at least " if self.incomplete or any(c.truncated for c in self.collectors) else ""
+            print(f"Found {at_least}{self.total_errors} {errors_name} errors across the following repos:", file=sys.stderr)
+
+            for line in self.error_summary_file.read_text().strip().split("\n"):
+                if ":" in line:
+                    r, c = line.rsplit(":", 1)
+                    count = c.split()[0] if c.strip() else ""
+                    if count.isdigit() and int(count) > 0:
+                        note = " (truncated)" if "truncated" in c else ""
+                        print(f"- {r}: {count} errors{note}", file=sys.stderr)
+
+            print("", file=sys.stderr)
+            print(f"Please use the auto-error-resolver agent to fix these errors systematically.{build_note}", file=sys.stderr)
+            print("The error details have been cached for the resolver to use.", file=sys.stderr)
+        elif self.total_errors == 0:
+            print("", file=sys.stderr)
+            print(f"## {errors_name} Checks Did Not Finish", file=sys.stderr)
+        else:
+            print("", file=sys.stderr)
+            print(f"## Minor {errors_name} Errors", file=sys.stderr)
+            print("", file=sys.stderr)
+            print(f"Found {self.total_errors} {errors_name} error(s). Here are the details:", file=sys.stderr)
+            print("", file=sys.stderr)
+
+            with open(last_errors, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    print(f"  {line.rstrip()}", file=sys.stderr)
+
+            print("", file=sys.stderr)
+            print("Please fix these errors directly in the affected files.", file=sys.stderr)
+            if also_build:
+                print(f"Then use the auto-error-resolver agent to build and fix errors in: {', '.join(also_build)}.",
+                      file=sys.stderr)
+        if self.incomplete:
+            print("", file=sys.stderr)
+            print("These checks did not run to completion, so their repos are not known to be clean:", file=sys.stderr)
+            for target in self.incomplete:
+                print(f"- {target} ({self.repo_results[target]}): {self.commands[target]}", file=sys.stderr)
+            print("Run them to verify; they run again at the next stop.", file=sys.stderr)
+        return 2 if self.total_errors else 0
+
+    def cleanup(self) -> None:
+        """Clean up session cache on success; cached results live outside it."""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        if self.watch_state is not None:
+            # Watched changes up to this Stop are accounted for
+            watch.ack(self.project_dir, self.session_id, self.started)
+        result_cache.evict(Path(self.project_dir) / ".claude" / "tsc-cache", keep=[self.cache_dir])
+        incremental.cleanup(self.project_dir, keep=[incremental.scope(self.project_dir, self.session_id)])
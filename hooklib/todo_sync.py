@@ -0,0 +1,153 @@
+"""
+Per-session todo state for taskmaster-sync.py.
+Each session keeps a small JSON file at
+<project>/.claude/todo-sync/<session_id>.json mapping a key per todo (its id,
+or a hash of its text) to [status, text]: the baseline as of the last sync
+message, and the latest TodoWrite list. A TodoWrite only produces a message
+when the list differs from the baseline and TASKMASTER_SYNC_WINDOW seconds
+(default 30) have passed since the last one, so a burst of TodoWrite calls
+collapses into a single net diff. Finishing every todo is reported at once.
+Lists of MIN_TODOS or fewer, before and after, are not worth a message;
+their changes stay pending until the list grows. Changes still pending when
+the turn ends are flushed by the Stop hook.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from hooklib.locking import locked
+
+STATE_VERSION = 1
+
+# kind: "added", "removed" or "status"; before/after: statuses ("" if absent)
+Change = namedtuple("Change", "kind text before after")
+
+MIN_TODOS = 2
+LABELS = {"in_progress": "in progress", "pending": "pending", "completed": "completed"}
+MAX_LINES = 10
+
+
+def state_path(project_dir, session_id: str) -> Path:
+    return Path(project_dir) / ".claude" / "todo-sync" / f"{session_id}.json"
+
+
+def window() -> float:
+    try:
+        return float(os.environ.get("TASKMASTER_SYNC_WINDOW", "30"))
+    except ValueError:
+        return 30.0
+
+
+def keyed(todos: list) -> dict:
+    """key -> [status, text] for a TodoWrite list."""
+    state = {}
+    for todo in todos:
+        text = str(todo.get("content", "")).strip()[:200]
+        key = str(todo.get("id") or hashlib.sha1(text.encode("utf-8")).hexdigest()[:12])
+        state[key] = [str(todo.get("status", "")), text]
+    return state
+
+
+def diff(before: dict, after: dict) -> list:
+    """Changes from one keyed state to another, in the order of `after`."""
+    changes = []
+    for key, (status, text) in after.items():
+        if key not in before:
+            changes.append(Change("added", text, "", status))
+        elif before[key][0] != status:
+            changes.append(Change("status", text, before[key][0], status))
+    for key, (status, text) in before.items():
+        if key not in after:
+            changes.append(Change("removed", text, status, ""))
+    return changes
+
+
+def _read(path: Path) -> dict:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") == STATE_VERSION:
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "baseline": {}, "latest": {}, "synced": 0}
+
+
+def _write(path: Path, data: dict) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _pending(data: dict) -> list:
+    """Unreported changes, if the list is big enough to report them."""
+    if max(len(data["baseline"]), len(data["latest"])) <= MIN_TODOS:
+        return []
+    return diff(data["baseline"], data["latest"])
+
+
+def record(project_dir, session_id: str, todos: list, now=None):
+    """Store the latest list. Returns (changes since the last sync, latest
+    state) when a sync message is due, else None."""
+    now = time.time() if now is None else now
+    path = state_path(project_dir, session_id)
+    latest = keyed(todos)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with locked(path):
+            data = _read(path)
+            data["latest"] = latest
+            changes = _pending(data)
+            finished = bool(latest) and all(status == "completed" for status, _ in latest.values())
+            due = bool(changes) and (finished or now - data["synced"] >= window())
+            if due:
+                data["baseline"] = latest
+                data["synced"] = now
+            _write(path, data)
+    except OSError:
+        return None
+    return (changes, latest) if due else None
+
+
+def flush(project_dir, session_id: str, now=None):
+    """Report whatever is still pending, whatever the window. Returns
+    (changes, latest state) or None."""
+    path = state_path(project_dir, session_id)
+    if not path.exists():
+        return None
+    try:
+        with locked(path):
+            data = _read(path)
+            changes = _pending(data)
+            if changes:
+                data["baseline"] = data["latest"]
+                data["synced"] = time.time() if now is None else now
+                _write(path, data)
+    except OSError:
+        return None
+    return (changes, data["latest"]) if changes else None
+
+
+def message(changes: list, latest: dict) -> str:
+    """The sync instruction for a set of changes."""
+    text = """
+TASKMASTER SYNC (Optional):
+Todo changes since the last sync; to persist them, consider using TaskMaster MCP
+(mcp__taskmaster-ai__get_tasks, mcp__taskmaster-ai__set_task_status):
+"""
+    for change in changes[:MAX_LINES]:
+        if change.kind == "added":
+            text += f"- Added ({LABELS.get(change.after, change.after)}): {change.text}\n"
+        elif change.kind == "removed":
+            text += f"- Removed ({LABELS.get(change.before, change.before)}): {change.text}\n"
+        else:
+            text += (f"- {LABELS.get(change.before, change.before)} -> "
+                     f"{LABELS.get(change.after, change.after)}: {change.text}\n")
+    if len(changes) > MAX_LINES:
+        text += f"- ... and {len(changes) - MAX_LINES} more\n"
+
+    counts = [sum(1 for status, _ in latest.values() if status == s) for s in LABELS]
+    now = ", ".join(f"{n} {label}" for n, label in zip(counts, LABELS.values()) if n)
+    return text + f"Now: {now or 'no todos'}\n"
@@ -0,0 +1,108 @@
+"""
+Tail-reading transcript summaries.
+Session transcripts are JSONL files that grow for the whole session. The
+summary for a handoff only needs the last few messages, so the file is read
+backwards in fixed-size blocks and scanning stops once enough messages are
+found or a byte budget is spent. Memory and time stay bounded however long
+the session is; a single oversized line (a huge tool result) is skipped
+without being buffered.
+"""
+import json
+import os
+
+BLOCK_SIZE = 64 * 1024
+MAX_LINE = 1024 * 1024
+# Tools whose tool_use input names a file being written
+EDIT_TOOLS = ("Edit", "MultiEdit", "Write", "NotebookEdit")
+
+
+def reverse_lines(path, max_bytes=None, max_line=MAX_LINE):
+    """Yield complete lines (bytes, without newline) from the end of a file
+    backwards. Stops after max_bytes have been read; lines longer than
+    max_line are skipped."""
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        stop = max(0, pos - max_bytes) if max_bytes else 0
+        tail = b""
+        skipping = False
+        while pos > stop:
+            size = min(BLOCK_SIZE, pos - stop)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            lines = block.split(b"\n")
+            if skipping:
+                # Still inside an oversized line: drop up to its start
+                if len(lines) == 1:
+                    continue
+                lines[-1] = b""
+                skipping = False
+            lines[-1] += tail
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line
+            tail = lines[0]
+            if len(tail) > max_line:
+                tail, skipping = b"", True
+        if tail and pos == 0 and not skipping:
+            yield tail
+
+
+def blocks(content) -> list:
+    """A message's content as a list of blocks (plain strings become one text block)."""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    if isinstance(content, list):
+        return [b for b in content if isinstance(b, dict)]
+    return []
+
+
+def summarize(messages) -> dict:
+    """Pull user requests, file edits and created/updated notes out of
+    messages ({"role", "content"} dicts) given in chronological order."""
+    summary = {"user_requests": [], "file_edits": [], "actions": []}
+    for msg in messages:
+        role = msg.get("role", "")
+        content = blocks(msg.get("content", ""))
+        if role == "user":
+            # Tool results come back as user messages; they are not requests
+            if any(b.get("type") == "tool_result" for b in content):
+                continue
+            text = "\n".join(b["text"] for b in content
+                             if b.get("type") == "text" and isinstance(b.get("text"), str)).strip()
+            if text and len(text) < 500:
+                summary["user_requests"].append(text[:200])
+        elif role == "assistant":
+            for b in content:
+                if b.get("type") == "tool_use" and b.get("name") in EDIT_TOOLS:
+                    tool_input = b.get("input")
+                    if not isinstance(tool_input, dict):
+                        continue
+                    path = tool_input.get("file_path") or tool_input.get("notebook_path")
+                    if path:
+                        summary["file_edits"].append(f"{b['name']} {path}")
+                elif b.get("type") == "text" and isinstance(b.get("text"), str):
+                    text = b["text"]
+                    if "created" in text.lower() or "updated" in text.lower():
+                        summary["actions"].append(text[:200])
+    return summary
+
+
+def tail_messages(path, count: int = 20, max_bytes=None) -> list:
+    """The last `count` user/assistant messages of a transcript, oldest first."""
+    found = []
+    for line in reverse_lines(path, max_bytes):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        # Any JSON value parses; only objects are transcript entries
+        if not isinstance(entry, dict):
+            continue
+        message = entry.get("message")
+        if entry.get("type") in ("user", "assistant") and isinstance(message, dict):
+            found.append(message)
+            if len(found) >= count:
+                break
+    found.reverse()
+    return found
@@ -0,0 +1,230 @@
+"""
+Per-repo TypeScript type-check server.
+Keeps a `tsc --watch` program in memory and answers "file changed" requests
+over a local socket, so tsc-check.py does not pay a cold type-check per edit.
+"""
+import hashlib
+import json
+import os
+import re
+import socketserver
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+from hooklib import ipc
+from hooklib.proc import kill_tree, popen_group
+
+
+def settle_seconds() -> float:
+    """Seconds to wait for tsc to notice an edit before answering with the last result."""
+    return float(os.environ.get("TSC_DAEMON_SETTLE", "1.5"))
+
+
+def idle_seconds() -> float:
+    """Seconds without requests before the server shuts itself down."""
+    return float(os.environ.get("TSC_DAEMON_IDLE", "1800"))
+
+
+CYCLE_START = re.compile(r"Starting compilation in watch mode|File change detected\. Starting incremental compilation")
+CYCLE_END = re.compile(r"Found (\d+) errors?\b.*Watching for file changes")
+
+
+def daemon_dir() -> Path:
+    """Directory holding the socket and info files of running servers."""
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "tsc-daemon"
+
+
+def endpoint(repo_path) -> tuple:
+    """Return (socket path, info file) for a repo."""
+    key = hashlib.sha1(str(Path(repo_path).resolve()).encode()).hexdigest()[:16]
+    base = daemon_dir()
+    return (base / f"{key}.sock", base / f"{key}.json")
+
+
+def watch_command(tsc_cmd: str) -> str:
+    """Turn a one-shot tsc command into its watch-mode equivalent."""
+    return f"{tsc_cmd} --watch --preserveWatchOutput --pretty false"
+
+
+# ---------------------------------------------------------------------------
+# Client side (used by tsc-check.py)
+# ---------------------------------------------------------------------------
+
+def request(repo_path, payload: dict, timeout: float = 120.0):
+    """Send one request to the repo's server. Returns the reply or None."""
+    sock_path, info_file = endpoint(repo_path)
+    try:
+        with ipc.connect(sock_path, info_file, timeout) as conn:
+            conn.sendall((json.dumps(payload) + "\n").encode())
+            reply = conn.makefile("r", encoding="utf-8").readline()
+        return json.loads(reply) if reply else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def is_running(repo_path) -> bool:
+    reply = request(repo_path, {"op": "status"}, timeout=2.0)
+    return bool(reply and reply.get("ok"))
+
+
+def check_files(repo_path, files, timeout: float = 120.0):
+    """Ask the server for diagnostics after `files` changed.
+    Returns (success, output) or None when no server is answering."""
+    payload = {"op": "check", "files": list(files), "timeout": timeout - 1}
+    reply = request(repo_path, payload, timeout=timeout)
+    if not reply or not reply.get("ok"):
+        return None
+    return (reply["errors"] == 0, reply["output"])
+
+
+def spawn(repo_path, tsc_cmd: str) -> None:
+    """Start a detached server for a repo. Returns immediately."""
+    sock_path, _ = endpoint(repo_path)
+    script = Path(__file__).resolve().parent.parent / "tsc-daemon.py"
+    ipc.spawn_detached([str(script), "serve", str(repo_path), "--cmd", tsc_cmd], sock_path.with_suffix(".log"))
+
+
+# ---------------------------------------------------------------------------
+# Server side (run via `tsc-daemon.py serve`)
+# ---------------------------------------------------------------------------
+
+class WatchState:
+    """Tracks the compile cycles of one `tsc --watch` process."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.busy = False
+        self.cycle_started = 0.0
+        self.lines = []
+        # Result of the last completed cycle
+        self.done_started = 0.0
+        self.done_output = ""
+        self.done_errors = 0
+        self.done_at = 0.0
+        self.generation = 0
+        self.alive = True
+
+    def feed(self, line: str) -> None:
+        with self.cond:
+            if CYCLE_START.search(line):
+                self.busy = True
+                self.cycle_started = time.time()
+                self.lines = []
+                self.cond.notify_all()
+                return
+            end = CYCLE_END.search(line)
+            if end:
+                self.busy = False
+                self.done_started = self.cycle_started
+                self.done_output = "\n".join(self.lines)
+                self.done_errors = int(end.group(1))
+                self.done_at = time.time()
+                self.generation += 1
+                self.cond.notify_all()
+                return
+            if self.busy and line.strip():
+                self.lines.append(line)
+
+    def wait_for(self, since: float, timeout: float) -> dict:
+        """Wait for the first cycle that started at or after `since`.
+        If tsc stays idle for settle_seconds() the edit did not touch its
+        program, and the last completed result is returned instead."""
+        asked = time.time()
+        deadline = asked + timeout
+        with self.cond:
+            while True:
+                if not self.alive:
+                    return {"ok": False, "error": "tsc exited"}
+                if self.generation and self.done_started >= since:
+                    break
+                now = time.time()
+                if now >= deadline:
+                    return {"ok": False, "error": "timeout"}
+                if self.busy:
+                    self.cond.wait(deadline - now)
+                    continue
+                settle = max(asked, self.done_at) + settle_seconds()
+                if self.generation and now >= settle:
+                    break
+                self.cond.wait(min(settle, deadline) - now)
+            return {
+                "ok": True,
+                "errors": self.done_errors,
+                "output": self.done_output,
+                "generation": self.generation,
+            }
+
+
+def serve(repo_path: str, tsc_cmd: str) -> int:
+    """Run the watch process and answer requests until idle or stopped."""
+    repo_path = str(Path(repo_path).resolve())
+    if is_running(repo_path):
+        return 0
+    sock_path, info_file = endpoint(repo_path)
+
+    proc = popen_group(
+        watch_command(tsc_cmd),
+        repo_path,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    state = WatchState()
+    last_request = [time.time()]
+
+    def pump():
+        for line in proc.stdout:
+            state.feed(line.rstrip("\n"))
+        with state.cond:
+            state.alive = False
+            state.cond.notify_all()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            last_request[0] = time.time()
+            try:
+                req = json.loads(self.rfile.readline())
+            except ValueError:
+                return
+            op = req.get("op")
+            if op == "check":
+                mtimes = []
+                for f in req.get("files", []):
+                    try:
+                        mtimes.append(os.stat(f).st_mtime)
+                    except OSError:
+                        pass
+                since = max(mtimes) if mtimes else time.time()
+                reply = state.wait_for(since, float(req.get("timeout", 120)))
+            elif op == "status":
+                reply = {"ok": state.alive, "repo": repo_path, "pid": os.getpid(),
+                         "busy": state.busy, "generation": state.generation}
+            elif op == "stop":
+                reply = {"ok": True}
+                threading.Thread(target=server.shutdown, daemon=True).start()
+            else:
+                reply = {"ok": False, "error": f"unknown op: {op}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+    server = ipc.make_server(sock_path, info_file, Handler, {"repo": repo_path, "cmd": tsc_cmd})
+
+    def watchdog():
+        while state.alive and time.time() - last_request[0] < idle_seconds():
+            time.sleep(5)
+        server.shutdown()
+
+    threading.Thread(target=pump, daemon=True).start()
+    threading.Thread(target=watchdog, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        kill_tree(proc)
+        ipc.remove_endpoint(sock_path, info_file)
+    return 0
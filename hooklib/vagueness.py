@@ -0,0 +1,141 @@
+"""
+Local vagueness scoring for improve-prompt.py.
+A prompt is reduced to a handful of specificity features (length, file
+paths, identifiers, code, line numbers, error text, vague wording) and a
+linear model turns them into the probability that the prompt is too vague
+to act on. Only prompts scoring at or above PROMPT_VAGUE_THRESHOLD (default
+0.5) get the evaluation wrapper; precise prompts pass through untouched.
+
+The built-in weights are hand-tuned on the "tune" prompts of
+bench/prompt-corpus.jsonl; bench/prompt-eval.py reports how they do on the
+"heldout" prompts, which is the number to watch when changing them. A model
+fitted on your own prompts with `bench/prompt-eval.py --train` is picked up
+from PROMPT_SCORER_MODEL (default ~/.claude/prompt-scorer.pkl): a pickled dict
+of {"weights": {feature: float}, "bias": float}. It is unpickled with every
+class lookup refused, so a tampered file cannot run code.
+"""
+import io
+import math
+import os
+import pickle
+import re
+from pathlib import Path
+
+# Word count at which the length feature saturates
+LENGTH_CAP = 40
+
+PATH = re.compile(
+    r"(?:[\w.-]+/)+[\w.-]+"
+    r"|\b[\w-]+\.(?:py|pyi|ts|tsx|js|jsx|mjs|json|md|rs|cs|go|java|kt|rb|php|sql|css|scss|html|sh|ya?ml|toml|ini|cfg)\b"
+)
+IDENTIFIER = re.compile(
+    r"`[^`\n]+`"
+    r"|\b[a-z]+[A-Z]\w*"
+    r"|\b[A-Z][a-z0-9]+[A-Z]\w*"
+    r"|\b[A-Za-z0-9]+_[A-Za-z0-9_]+\b"
+    r"|\b\w+\(\)"
+)
+LOCATION = re.compile(r"\b(?:line|ln|L)\s?\d+\b|:\d+(?::\d+)?\b|\(\d+,\d+\)", re.IGNORECASE)
+ERROR_TEXT = re.compile(r"\b(?:TS\d{4}|E\d{4}|CS\d{4}|[A-Z]\w*(?:Error|Exception))\b|Traceback|error:|\bstack trace\b")
+URL = re.compile(r"https?://\S+")
+LIST_ITEM = re.compile(r"^\s*(?:[-*]|\d+[.)])\s+", re.MULTILINE)
+VAGUE_TERMS = re.compile(
+    r"\b(?:it|this|that|stuff|things?|something|somehow|better|nicer|cleaner|fix|broken|bug|issue|problem|"
+    r"doesn'?t work|not working|improve|whatever|etc)\b",
+    re.IGNORECASE,
+)
+DEICTIC_START = re.compile(r"^\s*(?:please\s+)?(?:fix\s+)?(?:it|this|that|these|those)\b", re.IGNORECASE)
+
+# Log-odds of a vague prompt
+DEFAULT_MODEL = {
+    "bias": 1.5,
+    "weights": {
+        "length": -4.0,
+        "short": 1.0,
+        "paths": -2.5,
+        "identifiers": -2.0,
+        "code": -2.0,
+        "locations": -1.5,
+        "errors": -2.0,
+        "urls": -1.0,
+        "lists": -1.0,
+        "vague_terms": 1.5,
+        "deictic_start": 1.0,
+    },
+}
+
+_loaded = {}
+
+
+def features(prompt: str) -> dict:
+    """Specificity features of a prompt, each scaled to 0..1."""
+    words = len(prompt.split())
+    prose = re.sub(r"```.*?(?:```|$)", " ", prompt, flags=re.DOTALL)
+    found = {
+        "length": min(words, LENGTH_CAP) / LENGTH_CAP,
+        "paths": min(len(PATH.findall(prompt)), 3) / 3,
+        "identifiers": min(len(IDENTIFIER.findall(prose)), 4) / 4,
+        "code": 1.0 if "```" in prompt or "\n    " in prompt else 0.0,
+        "locations": 1.0 if LOCATION.search(prompt) else 0.0,
+        "errors": 1.0 if ERROR_TEXT.search(prompt) else 0.0,
+        "urls": 1.0 if URL.search(prompt) else 0.0,
+        "lists": min(len(LIST_ITEM.findall(prompt)), 3) / 3,
+        "vague_terms": min(len(VAGUE_TERMS.findall(prose)), 3) / 3,
+        "deictic_start": 1.0 if DEICTIC_START.match(prompt) else 0.0,
+    }
+    # A few words naming nothing concrete
+    anchored = any(found[name] for name in ("paths", "identifiers", "code", "locations", "errors", "urls"))
+    found["short"] = 1.0 if words <= 6 and not anchored else 0.0
+    return found
+
+
+class _DataOnly(pickle.Unpickler):
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"refusing to load {module}.{name}")
+
+
+def model_path() -> Path:
+    configured = os.environ.get("PROMPT_SCORER_MODEL")
+    if configured:
+        return Path(configured)
+    home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+    return Path(home_dir) / ".claude" / "prompt-scorer.pkl"
+
+
+def load_model(path=None) -> dict:
+    """The pickled model at path (default model_path()), else DEFAULT_MODEL.
+    Reloaded only when the file changes, for the resident hook host."""
+    path = Path(path) if path else model_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return DEFAULT_MODEL
+    cached = _loaded.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        model = _DataOnly(io.BytesIO(path.read_bytes())).load()
+        model = {"bias": float(model["bias"]), "weights": {k: float(v) for k, v in model["weights"].items()}}
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, ValueError, AttributeError):
+        model = DEFAULT_MODEL
+    _loaded[path] = (mtime, model)
+    return model
+
+
+def score(prompt: str, model=None) -> float:
+    """Probability (0..1) that the prompt is too vague to act on."""
+    model = model or load_model()
+    weights = model["weights"]
+    z = model["bias"] + sum(weights.get(name, 0.0) * value for name, value in features(prompt).items())
+    return 1 / (1 + math.exp(-max(-50.0, min(50.0, z))))
+
+
+def threshold() -> float:
+    try:
+        return float(os.environ.get("PROMPT_VAGUE_THRESHOLD", "0.5"))
+    except ValueError:
+        return 0.5
+
+
+def is_vague(prompt: str, model=None) -> bool:
+    return score(prompt, model) >= threshold()
@@ -0,0 +1,521 @@
+"""
+Optional change watcher: a live per-repo dirty set in a sidecar file.
+`change-watcher.py start` runs one watcher per project (CHANGE_WATCHER=1 has
+the Stop hooks start it). It follows every write under the project, whether
+it came from the Edit tools, a formatter, codegen or a shell command, using
+inotify on Linux and polling elsewhere or when inotify is out of watches
+(CHANGE_WATCH_BACKEND=poll forces polling).
+
+A "repo" is what the checks call one: the workspace project, known
+directory or checker project that checkers.repo_for_file() assigns a written
+file to, or its top-level directory when no check owns it ("." for files at
+the root). Its dirty flag mirrors `git status` of the repo's directory in the
+git repo enclosing it: it is probed at startup, when a write lands in a
+clean repo (so ignored files do not count) and whenever that git repo's
+.git/index or HEAD changes, so committing or reverting clears it. A
+directory outside git is dirty once anything in it is written. The most
+recent MAX_FILES changed paths per repo are kept with their change time,
+ignored files included.
+
+The watcher sees the project, not sessions: writes by another session, the
+user's editor or a build land in every session's changed files. That is
+deliberate, since a Stop check is about the repos as they are on disk; what
+differs per session is only `since`, when its last clean Stop was.
+
+The state lives in <project>/.claude/watch/state.json, rewritten atomically
+after each burst of changes; the watcher touches it every HEARTBEAT_SECONDS,
+so readers trust it only while its mtime is fresh and otherwise fall back to
+their own git status and the edit journal. Reading it is one small file.
+"""
+import ctypes
+import ctypes.util
+import fnmatch
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import time
+from pathlib import Path
+
+from hooklib import checkers, ipc, project_graph, services
+from hooklib.locking import locked
+
+STATE_VERSION = 2
+# The watcher touches the state file this often; older state is stale
+HEARTBEAT_SECONDS = 5.0
+# Changes are batched for this long before the state is rewritten
+SETTLE_SECONDS = 0.2
+# Changed paths remembered per repo
+MAX_FILES = 500
+# Directories never watched (.git itself is only watched for index/HEAD)
+IGNORED_DIRS = {
+    ".git", ".claude", "node_modules", "dist", "build", "out", "target", "bin", "obj",
+    "__pycache__", ".venv", "venv", ".next", ".turbo", ".cache", "coverage",
+    ".mypy_cache", ".pytest_cache", ".tox",
+}
+GIT_FILES = {"index", "HEAD"}
+# Writing one of these can change which repo owns a path
+OWNER_MARKERS = ({"package.json", "pnpm-workspace.yaml"}
+                 | {marker for checker in checkers.CHECKERS.values() for marker in checker.markers})
+
+
+def watch_dir(project_dir) -> Path:
+    return Path(project_dir) / ".claude" / "watch"
+
+
+def state_path(project_dir) -> Path:
+    return watch_dir(project_dir) / "state.json"
+
+
+def poll_seconds() -> float:
+    return float(os.environ.get("CHANGE_WATCH_POLL", "2"))
+
+
+def lookback_seconds() -> float:
+    """How far back a session's first Stop looks for changes (no ack yet)."""
+    return float(os.environ.get("CHANGE_WATCH_LOOKBACK", "1800"))
+
+
+# ---------------------------------------------------------------------------
+# Reader side (used by the Stop hooks)
+# ---------------------------------------------------------------------------
+
+def load(project_dir):
+    """The watcher's state, or None when no watcher is keeping it fresh."""
+    path = state_path(project_dir)
+    try:
+        if time.time() - path.stat().st_mtime > 3 * HEARTBEAT_SECONDS:
+            return None
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def dirty_repos(state) -> set:
+    """Repos with changes, as `git status` would report them."""
+    return {repo for repo, info in state["repos"].items() if info["dirty"]}
+
+
+def dirty_dirs(state, dirs) -> set:
+    """Those of the project-relative `dirs` (top-level services, say) holding
+    a repo with changes, or being one."""
+    dirty = dirty_repos(state)
+    return {d for d in dirs if any(repo == d or repo.startswith(d + "/") for repo in dirty)}
+
+
+def changed_files(state, since: float) -> list:
+    """Paths changed at or after `since`, across all repos and by anyone,
+    not only the session asking."""
+    return sorted(path for info in state["repos"].values() for path, ts in info["files"].items() if ts >= since)
+
+
+def _ack_path(project_dir, session_id: str) -> Path:
+    return watch_dir(project_dir) / "acks" / f"{session_id}.json"
+
+
+def since(project_dir, session_id: str) -> float:
+    """Start of the changes a session's Stop hook has not accounted for yet."""
+    try:
+        return float(json.loads(_ack_path(project_dir, session_id).read_text())["since"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return time.time() - lookback_seconds()
+
+
+def ack(project_dir, session_id: str, when: float) -> None:
+    """Record that the session's changes up to `when` checked clean."""
+    path = _ack_path(project_dir, session_id)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"since": when}))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def spawn(project_dir) -> None:
+    """Start a detached watcher for a project. Returns immediately."""
+    script = Path(__file__).resolve().parent.parent / "change-watcher.py"
+    ipc.spawn_detached([str(script), "serve", str(Path(project_dir).resolve())],
+                       watch_dir(project_dir) / "watcher.log")
+
+
+def autostart(project_dir) -> None:
+    """With CHANGE_WATCHER=1, start a watcher if none is running."""
+    if os.environ.get("CHANGE_WATCHER", "") == "1" and load(project_dir) is None:
+        spawn(project_dir)
+
+
+# ---------------------------------------------------------------------------
+# Watcher side (run via `change-watcher.py serve`)
+# ---------------------------------------------------------------------------
+
+class DirtySet:
+    """Per-repo dirty flags and recently changed paths."""
+
+    def __init__(self, project_dir: str):
+        self.root = project_dir
+        self.root_is_git = os.path.isdir(os.path.join(project_dir, ".git"))
+        self.repos = {}
+        self.changed = False
+        # Clean git repos written to since the last probe
+        self.to_probe = set()
+        # (directory, extension) -> repo key, and repo key -> enclosing git repo
+        self.owners = {}
+        self.git_roots = {}
+
+    def key(self, path: str):
+        rel = os.path.relpath(path, self.root)
+        if rel == "." or rel.startswith(".."):
+            return None
+        memo = (os.path.dirname(path), os.path.splitext(path)[1].lower())
+        key = self.owners.get(memo)
+        if key is None:
+            key = checkers.repo_for_file(self.root, path)
+            if key is None or key == "root":
+                parts = rel.split(os.sep)
+                key = parts[0] if len(parts) > 1 else "."
+            key = self.owners[memo] = key.replace("\\", "/")
+        return key
+
+    def _repo(self, key: str) -> dict:
+        return self.repos.setdefault(key, {"dirty": False, "files": {}})
+
+    def touch(self, path: str, now: float) -> None:
+        if any(fnmatch.fnmatch(os.path.basename(path), marker) for marker in OWNER_MARKERS):
+            self.owners.clear()
+        key = self.key(path)
+        if key is None:
+            return
+        repo = self._repo(key)
+        files = repo["files"]
+        files.pop(path, None)
+        files[path] = now
+        while len(files) > MAX_FILES:
+            del files[next(iter(files))]
+        if not repo["dirty"]:
+            if self.in_git(key):
+                self.to_probe.add(key)
+            else:
+                repo["dirty"] = True
+        self.changed = True
+
+    def in_git(self, key: str) -> bool:
+        return self.git_root(key) is not None
+
+    def git_root(self, key: str):
+        """The project-relative directory of the git repo enclosing a repo
+        key ("." for the project's own), or None outside git."""
+        if key not in self.git_roots:
+            current = key
+            while current != "." and not os.path.isdir(os.path.join(self.root, current, ".git")):
+                current = os.path.dirname(current) or "."
+            self.git_roots[key] = current if current != "." or self.root_is_git else None
+        return self.git_roots[key]
+
+    def probe(self, key: str) -> None:
+        """Re-sync a repo's dirty flag with `git status`."""
+        git_root = self.git_root(key)
+        if git_root is None:
+            return
+        if key == git_root != ".":
+            dirty, _ = services.git_status(Path(self.root) / key)
+        else:
+            pathspec = ":(glob)*" if key == "." else os.path.relpath(key, git_root).replace("\\", "/")
+            dirty, _ = services.git_status(Path(self.root) / git_root, [pathspec])
+        repo = self._repo(key)
+        if repo["dirty"] != dirty:
+            repo["dirty"] = dirty
+            self.changed = True
+
+    def probe_all(self) -> None:
+        keys = {"."} | set(self.repos) | set(project_graph.load(self.root).projects)
+        keys.update(repo for repo in checkers.KNOWN_REPOS if os.path.isdir(os.path.join(self.root, repo)))
+        try:
+            # Top-level directories are repos of their own unless they only
+            # hold projects (packages/), or are git repos (the services)
+            keys.update(e.name for e in os.scandir(self.root)
+                        if e.is_dir(follow_symlinks=False) and e.name not in IGNORED_DIRS
+                        and (os.path.isdir(os.path.join(e.path, ".git"))
+                             or not any(key.startswith(e.name + "/") for key in keys)))
+        except OSError:
+            pass
+        for key in sorted(keys):
+            self.probe(key)
+
+    def probe_pending(self) -> None:
+        while self.to_probe:
+            self.probe(self.to_probe.pop())
+
+    def probe_git(self, git_dir: str) -> None:
+        """.git/index or HEAD changed: re-probe every repo in that git repo
+        (git_dir is its project-relative directory, "." for the project's)."""
+        self.git_roots.clear()  # the git repo may be new
+        for key in sorted(set(self.repos) | {"."}):
+            if self.git_root(key) == git_dir:
+                self.probe(key)
+
+    def write(self, backend: str) -> None:
+        path = state_path(self.root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({
+            "version": STATE_VERSION,
+            "pid": os.getpid(),
+            "backend": backend,
+            "updated": time.time(),
+            "repos": self.repos,
+        }, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        self.changed = False
+
+
+def _walk(root: str):
+    """(directory, is_git) for every watched directory under root; is_git
+    marks .git directories and their logs/."""
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        yield (current, False)
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.name == ".git":
+                yield (entry.path, True)
+                # logs/HEAD is appended whenever HEAD moves, even when a
+                # commit leaves index and HEAD themselves untouched
+                logs = os.path.join(entry.path, "logs")
+                if os.path.isdir(logs):
+                    yield (logs, True)
+            elif entry.name not in IGNORED_DIRS:
+                stack.append(entry.path)
+
+
+def _git_key(dirty: DirtySet, git_dir: str) -> str:
+    """The project-relative directory of the repo owning a .git (or .git/logs)."""
+    if os.path.basename(git_dir) == "logs":
+        git_dir = os.path.dirname(git_dir)
+    return os.path.relpath(os.path.dirname(git_dir), dirty.root).replace("\\", "/")
+
+
+class InotifyBackend:
+    """Recursive watches through the inotify syscalls (Linux only)."""
+
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    TREE_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    GIT_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_ONLYDIR
+
+    name = "inotify"
+
+    def __init__(self, dirty: DirtySet):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify needs Linux")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirty = dirty
+        # wd -> (path, git key or False for a tree directory)
+        self.watches = {}
+        try:
+            for path, is_git in _walk(dirty.root):
+                self.add(path, _git_key(dirty, path) if is_git else False)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def add(self, path: str, git_key) -> None:
+        mask = self.TREE_MASK if git_key is False else self.GIT_MASK
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (2, 20):  # ENOENT, ENOTDIR: gone already
+                return
+            # ENOSPC means fs.inotify.max_user_watches is exhausted
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        self.watches[wd] = (path, git_key)
+
+    def add_tree(self, path: str, now: float) -> None:
+        """A directory appeared: watch it, and count files written into it
+        before its watch existed."""
+        for sub, is_git in _walk(path):
+            self.add(sub, _git_key(self.dirty, sub) if is_git else False)
+            if is_git:
+                continue
+            try:
+                for entry in os.scandir(sub):
+                    if entry.is_file(follow_symlinks=False):
+                        self.dirty.touch(entry.path, now)
+            except OSError:
+                pass
+
+    def wait(self, timeout: float) -> None:
+        """Apply the events arriving within `timeout` seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return
+        now = time.time()
+        git_keys = set()
+        offset = 0
+        while offset + 16 <= len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+            name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b"\0"))
+            offset += 16 + length
+            if mask & self.IN_Q_OVERFLOW:
+                # Events were dropped; git status is the ground truth
+                git_keys.update(self.dirty.git_root(k) for k in set(self.dirty.repos) | {"."})
+                git_keys.discard(None)
+                continue
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            watched = self.watches.get(wd)
+            if watched is None:
+                continue
+            directory, git_key = watched
+            if git_key is not False:
+                if name in GIT_FILES:
+                    git_keys.add(git_key)
+                elif name == "logs" and mask & self.IN_ISDIR and os.path.basename(directory) == ".git":
+                    # First commit of a new repo
+                    try:
+                        self.add(os.path.join(directory, name), git_key)
+                    except OSError:
+                        pass
+                continue
+            path = os.path.join(directory, name)
+            if mask & self.IN_ISDIR:
+                try:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO) and name == ".git":
+                        self.add(path, _git_key(self.dirty, path))
+                    elif mask & (self.IN_CREATE | self.IN_MOVED_TO) and name not in IGNORED_DIRS:
+                        self.add_tree(path, now)
+                except OSError:
+                    pass
+                continue
+            self.dirty.touch(path, now)
+        for key in git_keys:
+            self.dirty.probe_git(key)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollBackend:
+    """Periodic mtime/size snapshots of the project, every CHANGE_WATCH_POLL seconds."""
+
+    name = "poll"
+
+    def __init__(self, dirty: DirtySet):
+        self.dirty = dirty
+        self.snapshot = self.scan()
+
+    def scan(self) -> dict:
+        files = {}
+        for directory, is_git in _walk(self.dirty.root):
+            names = GIT_FILES if is_git else None
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if names is not None and entry.name not in names:
+                    continue
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        files[entry.path] = (st.st_mtime_ns, st.st_size, is_git)
+                except OSError:
+                    continue
+        return files
+
+    def wait(self, timeout: float) -> None:
+        time.sleep(min(timeout, poll_seconds()))
+        now = time.time()
+        current = self.scan()
+        git_keys = set()
+        for path in current.keys() | self.snapshot.keys():
+            before, after = self.snapshot.get(path), current.get(path)
+            if before == after:
+                continue
+            if (after or before)[2]:
+                git_keys.add(_git_key(self.dirty, os.path.dirname(path)))
+            else:
+                self.dirty.touch(path, now)
+        self.snapshot = current
+        for key in git_keys:
+            self.dirty.probe_git(key)
+
+    def close(self) -> None:
+        pass
+
+
+def serve(project_dir: str) -> int:
+    """Watch the project until stopped or the project directory is gone."""
+    project_dir = str(Path(project_dir).resolve())
+    path = state_path(project_dir)
+    dirty = DirtySet(project_dir)
+    # Two hooks can start a watcher at once; only one may run
+    with locked(path):
+        if load(project_dir) is not None:
+            return 0
+        dirty.write("starting")
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+    backend = None
+    if os.environ.get("CHANGE_WATCH_BACKEND", "") != "poll":
+        try:
+            backend = InotifyBackend(dirty)
+        except OSError as e:
+            print(f"inotify unavailable ({e}); polling every {poll_seconds():g}s", file=sys.stderr)
+    if backend is None:
+        backend = PollBackend(dirty)
+    # Watches exist before the first probe, so no change falls in between
+    dirty.probe_all()
+    dirty.write(backend.name)
+
+    last_write = last_change = time.monotonic()
+    try:
+        while not stopping and os.path.isdir(project_dir):
+            was_changed = dirty.changed
+            backend.wait(SETTLE_SECONDS if dirty.changed else HEARTBEAT_SECONDS)
+            dirty.probe_pending()
+            now = time.monotonic()
+            if dirty.changed and not was_changed:
+                last_change = now
+            if dirty.changed and (now - last_change >= SETTLE_SECONDS or now - last_write >= HEARTBEAT_SECONDS):
+                dirty.write(backend.name)
+                last_write = now
+            elif now - last_write >= HEARTBEAT_SECONDS:
+                try:
+                    os.utime(path)
+                except OSError:
+                    dirty.write(backend.name)
+                last_write = now
+    finally:
+        backend.close()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return 0
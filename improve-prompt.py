@@ -2,10 +2,19 @@
 """
 Claude Code Prompt Improver Hook
 Evaluates prompts for clarity and invokes the prompt-improver skill for vague cases.
+Prompts the local scorer (hooklib.vagueness) rates as specific skip the
+evaluation wrapper; PROMPT_VAGUE_THRESHOLD tunes the cut-off, and 0 wraps
+every prompt as before. Check a change with bench/prompt-eval.py, which
+reports the false-skip rate on held-out prompts the weights were not tuned on.
 """
 import json
+import os
 import sys
 
+from hooklib import digest, skill_matcher, spans, vagueness
+
+laps = spans.Laps("improve-prompt")
+
 # Load input from stdin
 try:
     input_data = json.load(sys.stdin)
@@ -14,6 +23,12 @@ except json.JSONDecodeError as e:
     sys.exit(1)
 
 prompt = input_data.get("prompt", "")
+laps.lap("parse input")
+project_dir = os.environ.get("CLAUDE_PROJECT_DIR", input_data.get("cwd", os.getcwd()))
+
+# Keep the session digest's recent requests current for the compaction handoff
+digest.record_request(project_dir, input_data.get("session_id", "default"), prompt.lstrip("*"))
+laps.lap("digest")
 
 # Escape quotes in prompt for safe embedding
 escaped_prompt = prompt.replace("\\", "\\\\").replace('"', '\\"')
@@ -48,6 +63,20 @@ if prompt.startswith("#"):
     output_json(prompt)
     sys.exit(0)
 
+vague = vagueness.is_vague(prompt)
+laps.lap("score")
+
+# Skills the rules match for this prompt are context for the evaluation
+skills = [m.name for m in skill_matcher.match_prompt(prompt, project_dir) if not m.name.startswith("_")]
+laps.lap("skill match")
+
+if not vague:
+    # Specific enough to act on as is; only the matching skills are added
+    if skills:
+        output_json(f"Skills matching this request: {', '.join(skills)}")
+    laps.lap("output")
+    sys.exit(0)
+
 # Build the evaluation wrapper
 wrapped_prompt = f"""PROMPT EVALUATION
 
@@ -67,5 +96,9 @@ ONLY USE SKILL if genuinely vague (e.g., "fix the bug" with no context):
 
 If clear, proceed with the original request. If vague, invoke the skill."""
 
+if skills:
+    wrapped_prompt += f"\n\nSkills matching this request: {', '.join(skills)}"
+
 output_json(wrapped_prompt)
+laps.lap("output")
 sys.exit(0)
@@ -5,9 +5,14 @@ Automatically saves session context to Serena memory before context compaction.
 This ensures continuity across context windows without manual handoff.
 """
 import json
+import os
 import sys
 from datetime import datetime
 
+from hooklib import digest, spans, transcript
+
+laps = spans.Laps("pre-compact-handoff")
+
 # Load input from stdin
 try:
     input_data = json.load(sys.stdin)
@@ -15,9 +20,13 @@ except json.JSONDecodeError as e:
     print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
     sys.exit(1)
 
-# Extract conversation context
-messages = input_data.get("messages", [])
+laps.lap("parse input")
 session_id = input_data.get("session_id", "unknown")
+project_dir = os.environ.get("CLAUDE_PROJECT_DIR", input_data.get("cwd", os.getcwd()))
+transcript_path = input_data.get("transcript_path", "")
+
+# Bytes read back from the end of the transcript at most
+tail_bytes = int(os.environ.get("HANDOFF_TAIL_BYTES", str(8 * 1024 * 1024)))
 
 def output_json(instructions):
     """Output instructions for Claude to execute"""
@@ -29,24 +38,32 @@ def output_json(instructions):
     }
     print(json.dumps(output))
 
-# Build a summary of recent work
-recent_messages = messages[-20:] if len(messages) > 20 else messages  # Last 20 messages
-
-# Extract key info from messages
-user_requests = []
-assistant_actions = []
+# The rolling digest kept by the prompt and tool hooks is the summary;
+# without one, fall back to the last 20 messages, read backwards from the end
+# of the transcript or taken from an inline messages payload
+def transcript_summary() -> dict:
+    if transcript_path and os.path.isfile(transcript_path):
+        recent_messages = transcript.tail_messages(transcript_path, 20, tail_bytes)
+    else:
+        recent_messages = input_data.get("messages", [])[-20:]
+    return transcript.summarize(recent_messages)
 
-for msg in recent_messages:
-    role = msg.get("role", "")
-    content = msg.get("content", "")
+session_digest = digest.load(project_dir, session_id)
+if session_digest is not None:
+    user_requests = session_digest["requests"]
+    file_edits = session_digest["files"]
+    assistant_actions = [f"Completed: {todo}" for todo in session_digest["todos"]["completed"]]
+    assistant_actions += [f"In progress: {todo}" for todo in session_digest["todos"]["in_progress"]]
+    if not user_requests:
+        # Requests are only recorded when improve-prompt.py is a UserPromptSubmit hook
+        user_requests = transcript_summary()["user_requests"]
+else:
+    summary = transcript_summary()
+    user_requests = summary["user_requests"]
+    file_edits = summary["file_edits"]
+    assistant_actions = summary["actions"]
 
-    if isinstance(content, str):
-        if role == "user" and len(content) < 500:
-            user_requests.append(content[:200])
-        elif role == "assistant":
-            # Look for tool uses or key actions
-            if "created" in content.lower() or "updated" in content.lower():
-                assistant_actions.append(content[:200])
+laps.lap("summary")
 
 # Generate handoff instruction
 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -61,10 +78,12 @@ CONTEXT COMPACTION IMMINENT - AUTO-SAVING SESSION
    - Memory Content:
      - Recent user requests: {user_requests[-5:] if user_requests else 'None captured'}
      - Key actions taken: {assistant_actions[-5:] if assistant_actions else 'None captured'}
+     - Files edited: {file_edits[-10:] if file_edits else 'None captured'}
      - Session ID: {session_id}
 
 3. ACKNOWLEDGE: "Usage logged. Session context saved to Serena. Continuing after compaction..."
 """
 
 output_json(handoff_instruction)
+laps.lap("output")
 sys.exit(0)
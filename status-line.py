@@ -1,13 +1,77 @@
 #!/usr/bin/env python3
 """
 Status Line for Claude Code (PowerShell compatible)
-Shows: Model | Dir | Style | Context% | Tokens
+Shows: Model | Dir | Style | Context% | Tokens | Cache hit | Tokens/min | Turns left
+
+The previous render, its input and a short history of context-usage samples
+live in a sidecar state file per session (~/.claude/status-line/state-<session
+id>.txt), so sessions open side by side keep their own history. When the
+input is byte-identical to last time the cached line is printed without
+parsing anything; json is only imported when the input changed. Run with `python3 -S` to also skip
+site initialization. State files unused for STATE_MAX_DAYS are removed when
+a session writes its first one.
 """
-import json
+import os
 import sys
+import time
+
+# Samples kept for the rate and projection, and the context % at which
+# compaction is expected
+MAX_SAMPLES = 20
+COMPACT_PCT = float(os.environ.get("STATUS_COMPACT_PCT", "80"))
+STATE_MAX_DAYS = 7
+
+state_dir = os.path.join(os.environ.get("USERPROFILE", os.environ.get("HOME", "")), ".claude", "status-line")
+
+
+def session_key(raw: bytes) -> str:
+    """The input's session id, found without parsing the JSON, kept to
+    file-name-safe characters."""
+    start = raw.find(b'"session_id"')
+    if start < 0:
+        return "default"
+    start = raw.find(b'"', raw.find(b":", start) + 1) + 1
+    end = raw.find(b'"', start)
+    if start <= 0 or end < 0:
+        return "default"
+    key = "".join(c for c in raw[start:end].decode("utf-8", "replace") if c.isalnum() or c in "-_")
+    return key[:64] or "default"
+
+
+def prune(now: float) -> None:
+    """Remove other sessions' state files unused for STATE_MAX_DAYS."""
+    try:
+        names = os.listdir(state_dir)
+    except OSError:
+        return
+    for name in names:
+        if name.startswith("state") and name.endswith(".txt"):
+            path = os.path.join(state_dir, name)
+            try:
+                if now - os.stat(path).st_mtime > STATE_MAX_DAYS * 86400:
+                    os.remove(path)
+            except OSError:
+                pass
+
+
+raw = sys.stdin.buffer.read()
+state_file = os.path.join(state_dir, f"state-{session_key(raw)}.txt")
+
+# State file: rendered line, session id, "time:tokens" samples, then the raw
+# input they were computed from
+try:
+    with open(state_file, "rb") as f:
+        state = f.read().split(b"\n", 3)
+except OSError:
+    state = []
+if len(state) == 4 and state[3] == raw:
+    print(state[0].decode("utf-8"))
+    sys.exit(0)
+
+import json
 
 try:
-    input_data = json.load(sys.stdin)
+    input_data = json.loads(raw)
 except:
     print("Claude Code | No data")
     sys.exit(0)
@@ -16,6 +80,7 @@ except:
 model = input_data.get("model", {}).get("display_name", "Claude")
 cwd = input_data.get("workspace", {}).get("current_dir", "")
 style = input_data.get("output_style", {}).get("name", "default")
+session_id = str(input_data.get("session_id", ""))
 
 # Get just the last folder name
 if cwd:
@@ -27,6 +92,13 @@ else:
 usage = input_data.get("context_window", {}).get("current_usage")
 ctx_size = input_data.get("context_window", {}).get("context_window_size", 200000)
 
+samples = []
+if len(state) == 4 and state[1].decode("utf-8") == session_id:
+    for sample in state[2].decode("utf-8").split():
+        t, _, tokens = sample.partition(":")
+        if tokens:
+            samples.append((float(t), int(tokens)))
+
 if usage:
     inp = usage.get("input_tokens", 0)
     out = usage.get("output_tokens", 0)
@@ -40,6 +112,41 @@ if usage:
     out_k = out // 1000
     cache_k = cache // 1000
 
-    print(f"{model} | {dir_name} | {style} | {pct}% ctx | In:{inp_k}k Out:{out_k}k Cache:{cache_k}k")
+    line = f"{model} | {dir_name} | {style} | {pct}% ctx | In:{inp_k}k Out:{out_k}k Cache:{cache_k}k"
+
+    # Share of the prompt served from cache
+    if current:
+        line += f" | Hit:{cache * 100 // current}%"
+
+    # A drop in context means it was compacted or cleared: start over
+    if samples and current < samples[-1][1]:
+        samples = []
+    if not samples or current != samples[-1][1]:
+        samples.append((time.time(), current))
+    samples = samples[-MAX_SAMPLES:]
+
+    if len(samples) >= 2:
+        (t0, first), (t1, last) = samples[0], samples[-1]
+        if t1 > t0:
+            line += f" | {(last - first) * 60 / (t1 - t0) / 1000:.1f}k/min"
+        # Average growth per turn against what is left before compaction
+        per_turn = (last - first) / (len(samples) - 1)
+        remaining = ctx_size * COMPACT_PCT / 100 - current
+        if per_turn > 0 and remaining > 0:
+            line += f" | ~{int(remaining // per_turn)} turns"
 else:
-    print(f"{model} | {dir_name} | {style} | Ready")
+    line = f"{model} | {dir_name} | {style} | Ready"
+
+print(line)
+
+try:
+    if not state:
+        prune(time.time())
+    os.makedirs(state_dir, exist_ok=True)
+    tmp = f"{state_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        history = " ".join(f"{t:.3f}:{n}" for t, n in samples)
+        f.write("\n".join([line, session_id, history]).encode("utf-8") + b"\n" + raw)
+    os.replace(tmp, state_file)
+except OSError:
+    pass
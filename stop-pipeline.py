@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Stop Pipeline - type-checks and service build checks as one Stop hook.
+Does in a single pass what stop-build-check-enhanced.py and
+trigger-build-resolver.py did back to back: the session's changed repos are
+read once, the type-checks and the service git statuses run concurrently on
+one asyncio loop, and a single resolver instruction names each repo once.
+A service that was type-checked this turn is covered by the error report and
+is not also sent to "build and fix". With a change watcher running
+(change-watcher.py) no git status is needed at all: its dirty set says which
+services have changes. Todo changes that TodoWrite bursts left unreported
+(taskmaster-sync.py) are flushed here, at the end of the turn.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from hooklib import journal, services, spans, stop_checks, todo_sync, watch
+
+laps = spans.Laps("stop-pipeline")
+
+# Read event information from stdin
+try:
+    event_info = json.load(sys.stdin)
+except ValueError:
+    sys.exit(0)
+laps.lap("parse input")
+
+session_id = event_info.get("session_id", "default")
+project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+
+checks = stop_checks.StopChecks(project_dir, session_id, "stop-pipeline")
+has_session = checks.load()
+if has_session:
+    checks.add_dependents()
+laps.lap("read edits")
+
+if checks.watch_state is not None:
+    changed_services = watch.dirty_dirs(checks.watch_state, services.SERVICES)
+    to_scan = []
+else:
+    # Cheapest signal first: a service edited this turn has changes, so only
+    # the other service git repos need a git status
+    edited_services, to_scan, _ = services.partition(
+        project_dir, journal.files_since_mark(checks.cache_dir, "stop-pipeline"))
+    changed_services = {service for service, _ in edited_services}
+laps.lap("services")
+
+
+async def run_check(loop, pool, target: str) -> None:
+    try:
+        outcome = await loop.run_in_executor(pool, checks.check, target)
+    except Exception as e:
+        checks.fail(target, e)
+        return
+    checks.record(target, outcome)
+
+
+async def run_status(limit, service: str, path) -> None:
+    async with limit:
+        changed, _ = await services.git_status_async(path)
+    if changed:
+        changed_services.add(service)
+
+
+async def main() -> None:
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(services.max_workers())
+    # Checkers are blocking subprocess pipelines with their own cache steps,
+    # so each runs on a worker thread; git status runs on the loop itself
+    with ThreadPoolExecutor(max_workers=min(checks.max_workers, len(checks.affected_repos) or 1)) as pool:
+        await asyncio.gather(
+            *(run_check(loop, pool, target) for target in checks.affected_repos),
+            *(run_status(limit, service, path) for service, path in to_scan),
+        )
+
+
+wall_start = time.monotonic()
+asyncio.run(main())
+laps.lap("checks")
+
+if has_session:
+    checks.summarize(time.monotonic() - wall_start)
+# Repos whose check ran to the end are covered by the type-check report
+checked = {checks.targets[t][0] for t in checks.repo_results
+           if t not in checks.incomplete and t not in checks.partial}
+to_build = [s for s in services.SERVICES if s in changed_services and s not in checked]
+laps.lap("summary")
+
+if checks.has_errors:
+    code = checks.report(also_build=to_build)
+    laps.lap("report")
+    if code:
+        sys.exit(code)
+    # Only unfinished checks: a warning, and the session is kept for the next Stop
+elif has_session:
+    checks.cleanup()
+context = []
+if to_build:
+    print(f"Changes detected in: {', '.join(to_build)} — triggering build-error-resolver...", file=sys.stderr)
+    context.append(services.build_instruction(to_build))
+pending_todos = todo_sync.flush(project_dir, session_id)
+if pending_todos:
+    context.append(todo_sync.message(*pending_todos))
+if context:
+    output = {
+        "hookSpecificOutput": {
+            "hookEventName": "Stop",
+            "additionalContext": "\n".join(context),
+        }
+    }
+    print(json.dumps(output))
+laps.lap("output")
+sys.exit(0)
@@ -2,10 +2,18 @@
 """
 TaskMaster Sync Hook (PostToolUse)
 Syncs TodoWrite operations to TaskMaster MCP for persistent task tracking.
+Only what changed since the last sync message is reported (added, removed,
+status changes), and bursts of TodoWrite calls are coalesced into one message;
+stop-pipeline.py reports what is still pending when the turn ends.
 """
 import json
+import os
 import sys
 
+from hooklib import digest, spans, todo_sync
+
+laps = spans.Laps("taskmaster-sync")
+
 # Load input from stdin
 try:
     input_data = json.load(sys.stdin)
@@ -15,6 +23,7 @@ except json.JSONDecodeError as e:
 tool_name = input_data.get("tool_name", "")
 tool_input = input_data.get("tool_input", {})
 tool_output = input_data.get("tool_output", "")
+laps.lap("parse input")
 
 def output_json(instructions):
     """Output instructions for Claude"""
@@ -30,35 +39,26 @@ def output_json(instructions):
 if tool_name != "TodoWrite":
     sys.exit(0)
 
-# Extract todos from the tool input
-todos = tool_input.get("todos", [])
+# Extract todos from the tool input; an empty list means every todo was removed
+todos = tool_input.get("todos")
 
-if not todos:
+if not isinstance(todos, list):
     sys.exit(0)
 
-# Build sync instruction
-in_progress = [t for t in todos if t.get("status") == "in_progress"]
-pending = [t for t in todos if t.get("status") == "pending"]
-completed = [t for t in todos if t.get("status") == "completed"]
+# Latest todo status feeds the session digest used by the compaction handoff
+project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
+digest.record_todos(project_dir, input_data.get("session_id", "default"), todos)
+laps.lap("digest")
 
-instruction = """
-TASKMASTER SYNC (Optional):
-To persist these todos across sessions, consider using TaskMaster MCP:
-- mcp__taskmaster-ai__get_tasks - Check existing tasks
-- mcp__taskmaster-ai__set_task_status - Update task status
+# Diff against the todos as of the last sync message
+sync = todo_sync.record(project_dir, input_data.get("session_id", "default"), todos)
+laps.lap("diff")
 
-Current todos:
-"""
-
-if in_progress:
-    instruction += f"- In Progress: {len(in_progress)}\n"
-if pending:
-    instruction += f"- Pending: {len(pending)}\n"
-if completed:
-    instruction += f"- Completed: {len(completed)}\n"
+# Only output when a sync message is due (record() skips tiny lists)
+if sync is None:
+    sys.exit(0)
 
-# Only output if there are meaningful todos
-if len(todos) > 2:
-    output_json(instruction)
+output_json(todo_sync.message(*sync))
+laps.lap("output")
 
 sys.exit(0)
@@ -6,15 +6,26 @@ Checks for git changes in service directories and triggers build-error-resolver.
 import json
 import sys
 import os
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Debug log
+from hooklib import journal, services, spans, watch
+
+# Debug log, buffered and written once per invocation
 debug_log = Path(os.environ.get("TEMP", "/tmp")) / "claude-hook-debug.log"
+log_lines = []
 
 def log(msg):
-    with open(debug_log, "a") as f:
-        f.write(f"{msg}\n")
+    log_lines.append(f"{msg}\n")
+
+def flush_log():
+    try:
+        with open(debug_log, "a") as f:
+            f.writelines(log_lines)
+    except OSError:
+        pass
+
+laps = spans.Laps("trigger-build-resolver")
 
 # Read stdin
 try:
@@ -27,39 +38,58 @@ except:
 project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
 log(f"CLAUDE_PROJECT_DIR: {project_dir}")
 
-# Service directories to check
-services_dirs = ["email", "exports", "form", "frontend", "projects", 
-                 "uploads", "users", "utilities", "events", "database"]
 services_with_changes = []
 
-# Check each service directory for git changes
-for service in services_dirs:
-    service_path = Path(project_dir) / service
-    git_dir = service_path / ".git"
-    
+def journal_edits() -> list:
+    """Files edited since the last Stop according to the edit journal, if it exists."""
+    try:
+        session_id = json.loads(stdin_data).get("session_id", "default")
+    except (ValueError, AttributeError):
+        return []
+    cache_dir = Path(project_dir) / ".claude" / "tsc-cache" / session_id
+    if not journal.exists(cache_dir):
+        return []
+    return journal.files_since_mark(cache_dir, "trigger-build-resolver")
+
+# Cheapest signal first: a service edited this turn has changes. Note
+# that index/HEAD mtimes cannot prove a service clean (editing a tracked file
+# touches neither), so every other git service still gets a git status.
+laps.lap("read input")
+state = watch.load(project_dir)
+if state is not None:
+    # A running change watcher already knows which services are dirty
+    for service in sorted(watch.dirty_dirs(state, services.SERVICES)):
+        log(f"Checking service: {service}")
+        log("  -> Has changes (change watcher)")
+        services_with_changes.append(service)
+    edited_services, to_scan, missing = [], [], []
+else:
+    watch.autostart(project_dir)
+    edited_services, to_scan, missing = services.partition(project_dir, journal_edits())
+for service, service_path in edited_services:
     log(f"Checking service: {service} at {service_path}")
-    
-    if service_path.is_dir() and git_dir.is_dir():
-        log(f"  -> Is a git repository")
-        
-        try:
-            result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=str(service_path),
-                capture_output=True,
-                text=True
-            )
-            git_status = result.stdout.strip()
-            
-            if git_status:
-                log(f"  -> Has changes:\n{git_status}")
-                services_with_changes.append(service)
-            else:
-                log(f"  -> No changes")
-        except Exception as e:
-            log(f"  -> Error checking git: {e}")
-    else:
-        log(f"  -> Not a git repository or doesn't exist")
+    log("  -> Edited this turn (journal)")
+    services_with_changes.append(service)
+for service, service_path in missing:
+    log(f"Checking service: {service} at {service_path}")
+    log("  -> Not a git repository or doesn't exist")
+
+laps.lap("journal and probes")
+
+# Remaining services: one git status each, all at once
+if to_scan:
+    with ThreadPoolExecutor(max_workers=min(services.max_workers(), len(to_scan))) as pool:
+        statuses = list(pool.map(services.git_status, [path for _, path in to_scan]))
+    for (service, service_path), (changed, lines) in zip(to_scan, statuses):
+        log(f"Checking service: {service} at {service_path}")
+        for line in lines:
+            log(line)
+        if changed:
+            services_with_changes.append(service)
+
+# Report in the configured order
+services_with_changes.sort(key=services.SERVICES.index)
+laps.lap("git status")
 
 log(f"Services with changes: {services_with_changes}")
 
@@ -73,16 +103,7 @@ if services_with_changes:
     output = {
         "hookSpecificOutput": {
             "hookEventName": "Stop",
-            "additionalContext": f"""
-BUILD CHECK TRIGGERED
-
-Changes detected in: {services_list}
-
-Please use the auto-error-resolver agent to build and fix any errors in these services:
-- Task(subagent_type='auto-error-resolver', description='Fix build errors', prompt='Build and fix errors in: {services_list}')
-
-Focus on these services in the monorepo structure. Each service has its own build process.
-"""
+            "additionalContext": services.build_instruction(services_with_changes),
         }
     }
     print(json.dumps(output))
@@ -91,4 +112,6 @@ else:
     print("No services with changes detected — skipping build-error-resolver.", file=sys.stderr)
 
 log("=== END ===")
+flush_log()
+laps.lap("output and log")
 sys.exit(0)
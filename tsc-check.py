@@ -1,17 +1,27 @@
 #!/usr/bin/env python3
 """
-TSC Hook - TypeScript check after file modifications.
-Runs after Edit, Write, MultiEdit tools.
+TSC Hook - type check after file modifications.
+Runs after Edit, Write, MultiEdit tools. TypeScript edits run tsc; Python,
+Rust and C# edits run the checker hooklib.checkers finds for their project.
 """
 import json
 import sys
 import os
-import subprocess
 import re
+import shutil
 from pathlib import Path
 
+from hooklib import check_scheduler, checkers, discovery, error_index, incremental, project_graph, result_cache, shared_store, spans, tsc_daemon
+from hooklib.diagnostics import DiagnosticCollector, feed_file, feed_text, run_streaming
+
+laps = spans.Laps("tsc-check")
 project_dir = os.environ.get("CLAUDE_PROJECT_DIR", os.getcwd())
 home_dir = os.environ.get("USERPROFILE", os.environ.get("HOME", ""))
+# Set TSC_DAEMON_AUTOSTART=1 to launch a tsc-daemon.py server on first edit of a repo
+daemon_autostart = os.environ.get("TSC_DAEMON_AUTOSTART", "") == "1"
+# Set TSC_CHECK_BACKGROUND=1 to queue checks with check-scheduler.py instead
+# of running them here; the Stop hook reports their results
+background = os.environ.get("TSC_CHECK_BACKGROUND", "") == "1"
 session_id = os.environ.get("SESSION_ID", "default")
 cache_dir = Path(home_dir) / ".claude" / "tsc-cache" / session_id
 cache_dir.mkdir(parents=True, exist_ok=True)
@@ -21,6 +31,7 @@ try:
     hook_input = json.load(sys.stdin)
 except:
     sys.exit(0)
+laps.lap("parse input")
 
 tool_name = hook_input.get("tool_name", "")
 tool_input = hook_input.get("tool_input", {})
@@ -31,7 +42,11 @@ KNOWN_REPOS = {"email", "exports", "form", "frontend", "projects", "uploads",
                "api", "src", "services", "client", "web", "app", "ui"}
 
 def get_repo_for_file(file_path: str) -> str:
-    """Get repo name from file path."""
+    """Get repo name from file path: the enclosing workspace project, or a
+    known top-level directory."""
+    owner = project_graph.load(project_dir).owner(project_dir, file_path)
+    if owner:
+        return owner
     try:
         relative = os.path.relpath(file_path, project_dir).replace("\\", "/")
         parts = relative.split("/")
@@ -41,48 +56,84 @@ def get_repo_for_file(file_path: str) -> str:
         pass
     return ""
 
-def get_tsc_command(repo_path: Path) -> str:
+def get_tsc_command(repo: str) -> str:
     """Detect the correct TSC command for a repo."""
-    if (repo_path / "tsconfig.app.json").exists():
-        return "npx tsc --project tsconfig.app.json --noEmit"
-    elif (repo_path / "tsconfig.build.json").exists():
-        return "npx tsc --project tsconfig.build.json --noEmit"
-    elif (repo_path / "tsconfig.json").exists():
-        tsconfig = (repo_path / "tsconfig.json").read_text()
-        if '"references"' in tsconfig:
-            if (repo_path / "tsconfig.app.json").exists():
-                return "npx tsc --project tsconfig.app.json --noEmit"
-            elif (repo_path / "tsconfig.src.json").exists():
-                return "npx tsc --project tsconfig.src.json --noEmit"
-            return "npx tsc --build --noEmit"
-        return "npx tsc --noEmit"
-    return "npx tsc --noEmit"
-
-def run_tsc_check(repo: str) -> tuple:
-    """Run TSC check for a repo. Returns (success, output)."""
+    return discovery.tsc_command(discovery.repo_facts(project_dir, repo))
+
+# Checks to run: label -> (repo, checker name, command); see checkers.label()
+targets = {}
+
+def output_file(target: str) -> Path:
+    """Where a check's raw output is spilled (workspace repos flattened)."""
+    repo, kind, _ = targets[target]
+    return cache_dir / f"{checkers.file_stem(repo, kind)}-output.txt"
+
+def records_file(target: str) -> Path:
+    """Where a check's parsed diagnostics are spilled."""
+    repo, kind, _ = targets[target]
+    return cache_dir / f"{checkers.file_stem(repo, kind)}-diagnostics.jsonl"
+
+# label -> (rechecked files, total files) of incremental runs
+rechecked = {}
+# (project, repo) -> source state for the caches, computed once per run
+source_states = {}
+
+def run_tsc_check(target: str, files: list) -> tuple:
+    """Run one repo's checker. Returns (success, collector).
+    For tsc, uses the repo's tsc-daemon.py server when one is running;
+    otherwise the check runs once and its output is parsed as it streams
+    (tsc runs incrementally with TSC_INCREMENTAL=1). Results are cached by
+    content fingerprint."""
+    repo, kind, tsc_cmd = targets[target]
+    checker = checkers.CHECKERS[kind]
     repo_path = Path(project_dir) / repo
-    cache_file = cache_dir / f"{repo}-tsc-cmd.cache"
+    collector = DiagnosticCollector(output_file(target), records_file(target), preview_size=10, parse=checker.parse)
+    
+    # Nothing the checker reads has changed since the last run: reuse its result
+    with spans.span("tsc-check", "cache lookup"):
+        fp = result_cache.fingerprint(project_dir, repo_path, tsc_cmd, files, checker.inputs,
+                                      shared_store.source_state(project_dir, repo, source_states))
+        cached = result_cache.lookup_entry(project_dir, repo_path, fp)
+    if cached is not None:
+        feed_file(cached[1], collector)
+        return (cached[0], collector)
     
-    # Get or cache TSC command
-    if cache_file.exists():
-        tsc_cmd = cache_file.read_text().strip()
+    # Another session or worktree may have checked the same content
+    with spans.span("tsc-check", "shared store"):
+        key = shared_store.tree_key(project_dir, repo, tsc_cmd, source_states)
+        shared = shared_store.lookup(key)
+    if shared is not None:
+        feed_file(shared[1], collector)
+        result_cache.store_file(project_dir, repo_path, fp, shared[0], shared[1])
+        return (shared[0], collector)
+    
+    # Fast path: incremental result from a resident tsc --watch server
+    result = None
+    if kind == "tsc":
+        with spans.span("tsc-check", "daemon"):
+            result = tsc_daemon.check_files(repo_path, files)
+    if result is not None:
+        feed_text(result[1], collector)
+        success = result[0]
     else:
-        tsc_cmd = get_tsc_command(repo_path)
-        cache_file.write_text(tsc_cmd)
+        if daemon_autostart and kind == "tsc":
+            tsc_daemon.spawn(repo_path, tsc_cmd)
+        run = incremental.IncrementalRun(project_dir, repo, tsc_cmd, session_id)
+        try:
+            with spans.span("tsc-check", kind):
+                returncode, _, _ = run_streaming(run.command, str(repo_path), collector)
+        except Exception:
+            collector.close()
+            run.finish(False)
+            return (True, collector)  # Assume OK on exception
+        success = returncode == 0 and collector.count == 0
+        counts = run.finish(returncode is not None)
+        if counts:
+            rechecked[target] = counts
     
-    try:
-        result = subprocess.run(
-            tsc_cmd,
-            shell=True,
-            capture_output=True,
-            text=True,
-            cwd=str(repo_path)
-        )
-        output = result.stdout + result.stderr
-        has_errors = result.returncode != 0 or "error TS" in output
-        return (not has_errors, output)
-    except Exception as e:
-        return (True, str(e))  # Assume OK on exception
+    result_cache.store_file(project_dir, repo_path, fp, success, output_file(target))
+    shared_store.store(key, success, output_file(target), repo)
+    return (success, collector)
 
 # Only process file modification tools
 if tool_name not in ("Write", "Edit", "MultiEdit"):
@@ -98,60 +149,102 @@ else:
     if fp:
         file_paths = [fp]
 
-# Filter to TS/JS files only
+# Filter to files a checker covers
 ts_files = [f for f in file_paths if f and re.search(r'\.(ts|tsx|js|jsx)$', f)]
+other_files = [f for f in file_paths if f and f not in ts_files and checkers.is_checked(f)]
 
-if not ts_files:
+if not ts_files and not other_files:
     sys.exit(0)
 
-# Get unique repos to check
-repos_to_check = set()
+# Get repos to check, with the edited files that can affect each: the
+# owning projects plus their dependents, dependencies first
+graph_repos = dict(project_graph.load(project_dir).affected(project_dir, ts_files))
+repos_to_check = dict(graph_repos)
 for f in ts_files:
     repo = get_repo_for_file(f)
-    if repo:
-        repos_to_check.add(repo)
+    if repo and repo not in graph_repos:
+        repos_to_check.setdefault(repo, []).append(f)
+for repo in list(repos_to_check):
+    tsc_cmd = get_tsc_command(repo)
+    if tsc_cmd:
+        targets[repo] = (repo, "tsc", tsc_cmd)
+    else:
+        del repos_to_check[repo]  # no tsconfig: nothing for tsc to check
+
+# Other languages: the nearest project their checker recognizes
+for f in other_files:
+    owned = checkers.for_file(project_dir, f)
+    if owned:
+        target = checkers.label(owned[0], owned[1])
+        targets[target] = owned
+        repos_to_check.setdefault(target, []).append(f)
+
+laps.lap("repo detection")
 
 if not repos_to_check:
     sys.exit(0)
 
+check_name = "TypeScript" if all(kind == "tsc" for _, kind, _ in targets.values()) else "Type"
+
+# Background mode: mark the repos dirty and return without waiting
+if background:
+    for target, files in repos_to_check.items():
+        repo, kind, cmd = targets[target]
+        check_scheduler.enqueue(project_dir, repo, Path(project_dir) / repo, cmd, files, session_id, kind)
+    print(f"⏳ {check_name} check queued for: {' '.join(repos_to_check)}", file=sys.stderr)
+    laps.lap("enqueue")
+    sys.exit(0)
+
 # Run checks
 error_count = 0
-error_output = []
 failed_repos = []
+preview = []
+total_errors = 0
 
-print(f"⚡ TypeScript check on: {' '.join(repos_to_check)}", file=sys.stderr)
+print(f"⚡ {check_name} check on: {' '.join(repos_to_check)}", file=sys.stderr)
 
 for repo in repos_to_check:
     print(f"  Checking {repo}... ", end="", file=sys.stderr)
     
-    success, output = run_tsc_check(repo)
+    success, collector = run_tsc_check(repo, repos_to_check[repo])
+    note = f" (rechecked {rechecked[repo][0]}/{rechecked[repo][1]} files)" if repo in rechecked else ""
     
     if not success:
-        print("❌ Errors found", file=sys.stderr)
+        print(f"❌ Errors found{note}", file=sys.stderr)
         error_count += 1
         failed_repos.append(repo)
-        error_output.append(f"\n=== Errors in {repo} ===\n{output}")
+        total_errors += collector.count
+        preview += collector.preview[:10 - len(preview)]
     else:
-        print("✅ OK", file=sys.stderr)
+        print(f"✅ OK{note}", file=sys.stderr)
+laps.lap("checks")
 
 # If errors found, report them
 if error_count > 0:
-    # Save for agent
-    (cache_dir / "last-errors.txt").write_text("\n".join(error_output))
+    # Save for agent, copying each repo's spilled output
+    with open(cache_dir / "last-errors.txt", "w", encoding="utf-8") as out:
+        for repo in failed_repos:
+            out.write(f"\n=== Errors in {repo} ===\n")
+            with open(output_file(repo), encoding="utf-8", errors="replace") as f:
+                shutil.copyfileobj(f, out)
     (cache_dir / "affected-repos.txt").write_text("\n".join(failed_repos))
+    # Indexed by file and code for error-query.py
+    try:
+        error_index.build(cache_dir / error_index.DB_NAME, project_dir,
+                          [(targets[repo][0], targets[repo][1], records_file(repo)) for repo in failed_repos])
+    except Exception:
+        pass
     
     # Save TSC commands
     tsc_cmds = ["# TSC Commands by Repo"]
     for repo in failed_repos:
-        cmd_file = cache_dir / f"{repo}-tsc-cmd.cache"
-        cmd = cmd_file.read_text().strip() if cmd_file.exists() else "npx tsc --noEmit"
-        tsc_cmds.append(f"{repo}: {cmd}")
+        tsc_cmds.append(f"{repo}: {targets[repo][2]}")
     (cache_dir / "tsc-commands.txt").write_text("\n".join(tsc_cmds))
     
     # Output to stderr
     print("", file=sys.stderr)
     print("━" * 60, file=sys.stderr)
-    print(f"🚨 TypeScript errors found in {error_count} repo(s): {' '.join(failed_repos)}", file=sys.stderr)
+    print(f"🚨 {check_name} errors found in {error_count} repo(s): {' '.join(failed_repos)}", file=sys.stderr)
     print("━" * 60, file=sys.stderr)
     print("", file=sys.stderr)
     print("👉 IMPORTANT: Use the auto-error-resolver agent to fix the errors", file=sys.stderr)
@@ -159,25 +252,24 @@ if error_count > 0:
     print("WE DO NOT LEAVE A MESS BEHIND", file=sys.stderr)
     print("Error Preview:", file=sys.stderr)
     
-    all_errors = "\n".join(error_output)
-    ts_errors = [line for line in all_errors.split("\n") if "error TS" in line]
-    for line in ts_errors[:10]:
+    for line in preview:
         print(line, file=sys.stderr)
     
-    if len(ts_errors) > 10:
-        print(f"... and {len(ts_errors) - 10} more errors", file=sys.stderr)
+    if total_errors > len(preview):
+        print(f"... and {total_errors - len(preview)} more errors", file=sys.stderr)
     
+    laps.lap("report")
     sys.exit(1)
 
-# Cleanup old cache (older than 7 days)
-import time
+# Trim cached results and old session dirs, least recently used first
 try:
-    tsc_cache_root = Path(home_dir) / ".claude" / "tsc-cache"
-    for d in tsc_cache_root.iterdir():
-        if d.is_dir() and (time.time() - d.stat().st_mtime) > 7 * 86400:
-            import shutil
-            shutil.rmtree(d, ignore_errors=True)
-except:
+    result_cache.evict(Path(home_dir) / ".claude" / "tsc-cache", keep=[cache_dir])
+    # The session's project dir holds its edit journal, which the Stop hook reads
+    result_cache.evict(Path(project_dir) / ".claude" / "tsc-cache",
+                       keep=[Path(project_dir) / ".claude" / "tsc-cache" / session_id])
+    incremental.cleanup(project_dir, keep=[incremental.scope(project_dir, session_id)])
+except Exception:
     pass
+laps.lap("evict")
 
 sys.exit(0)
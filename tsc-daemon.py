@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+TSC Daemon - long-lived per-repo type-check server for tsc-check.py.
+Usage:
+  python3 tsc-daemon.py start <repo_dir> [--cmd "npx tsc --noEmit"]
+  python3 tsc-daemon.py stop <repo_dir>
+  python3 tsc-daemon.py status <repo_dir>
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from hooklib import tsc_daemon
+
+parser = argparse.ArgumentParser(description="Per-repo tsc --watch server")
+parser.add_argument("action", choices=("start", "stop", "status", "serve"))
+parser.add_argument("repo", help="Repo directory containing tsconfig.json")
+parser.add_argument("--cmd", default="npx tsc --noEmit", help="One-shot tsc command for the repo")
+args = parser.parse_args()
+
+repo_path = Path(args.repo).resolve()
+
+if args.action == "serve":
+    sys.exit(tsc_daemon.serve(str(repo_path), args.cmd))
+
+if args.action == "start":
+    if tsc_daemon.is_running(repo_path):
+        print(f"Already running for {repo_path}")
+    else:
+        tsc_daemon.spawn(repo_path, args.cmd)
+        print(f"Started tsc daemon for {repo_path}")
+    sys.exit(0)
+
+if args.action == "stop":
+    reply = tsc_daemon.request(repo_path, {"op": "stop"}, timeout=5.0)
+    print("Stopped" if reply else "Not running")
+    sys.exit(0)
+
+reply = tsc_daemon.request(repo_path, {"op": "status"}, timeout=5.0)
+print(json.dumps(reply, indent=2) if reply else "Not running")
+sys.exit(0 if reply else 1)